@@ -0,0 +1,21 @@
+"""Stand-in for `pxr`, used by the benchmarks only if usd-core isn't
+installed. Any attribute, call or index of it returns the stand-in itself,
+which is enough to import `stripe_kit`, but not to bake or swap scenes."""
+
+from typing import Any
+
+
+class _StandIn:
+    def __getattr__(self, name: str) -> "_StandIn":
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self
+
+    def __call__(self, *args: Any, **kwargs: Any) -> "_StandIn":
+        return self
+
+    def __getitem__(self, key: Any) -> "_StandIn":
+        return self
+
+
+Gf = Sdf = Usd = UsdGeom = UsdShade = Vt = _StandIn()
@@ -0,0 +1,228 @@
+"""
+Benchmarks of scene generation and configuration assembly.
+
+Isaac Lab and Isaac Sim are replaced by the lightweight stand-ins in
+`stubs`, so the benchmarks run on any CPU-only machine. `pxr` is only
+replaced if usd-core isn't installed. Each case is timed (the best of
+`--repeat` runs) and its peak memory is measured with `tracemalloc` in a
+separate run. Setup, like generating the scene a case works on, isn't
+measured.
+
+Usage:
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --baseline results.json
+
+With `--baseline`, the cases that got slower or use more memory than the
+baseline (beyond `--tolerance`) are reported, and the exit code is 1.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(_HERE, "stubs"), os.path.dirname(_HERE), _HERE]
+try:
+    import pxr  # noqa: F401
+except ImportError:
+    sys.path.append(os.path.join(_HERE, "fallback"))
+
+from scenes import HeightfieldSceneSpec, ScatterAssetSpec  # noqa: E402
+
+from stripe_kit import SceneCfgFactory, TerrainInstance  # noqa: E402
+from isaaclab.assets import ArticulationCfg  # noqa: E402
+
+
+@dataclass
+class Case:
+    """A benchmark case, the result of `setup` is passed to `run`"""
+
+    name: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+
+
+def _scene(count: int, batch: bool, triangles: int) -> HeightfieldSceneSpec:
+    return HeightfieldSceneSpec(
+        size=(100.0, 100.0),
+        palette=[ScatterAssetSpec("rock", count=count, batch=batch)],
+        seed=0,
+        triangles=triangles,
+    )
+
+
+def _add_assets(factory: SceneCfgFactory, assets: list[Any]) -> SceneCfgFactory:
+    for asset in assets:
+        factory.add_asset(asset)
+    return factory
+
+
+def _factory(count: int) -> SceneCfgFactory:
+    terrain, assets = _scene(count, False, 2).generate_scene()
+    return _add_assets(SceneCfgFactory(terrain), assets)
+
+
+def cases(
+    asset_counts: list[int], triangle_counts: list[int]
+) -> Iterator[Case]:
+    """Create the benchmark cases
+
+    Args:
+        asset_counts (list[int]): The numbers of assets of the scenes
+        triangle_counts (list[int]): The numbers of triangles of the terrains
+
+    Yields:
+        Case: The cases
+    """
+    for n in asset_counts:
+        yield Case(
+            f"create_instance[{n} assets]",
+            lambda n=n: _scene(n, False, 2),
+            lambda spec: spec.create_instance(),
+        )
+        yield Case(
+            f"create_instance[{n} batched assets]",
+            lambda n=n: _scene(n, True, 2),
+            lambda spec: spec.create_instance(),
+        )
+        yield Case(
+            f"AssetInstance.to_cfg[{n} assets]",
+            lambda n=n: _scene(n, False, 2).generate_scene()[1],
+            lambda assets: [a.to_cfg() for a in assets],
+        )
+        yield Case(
+            f"SceneCfgFactory.add_asset[{n} assets]",
+            lambda n=n: _scene(n, False, 2).generate_scene(),
+            lambda scene: _add_assets(SceneCfgFactory(scene[0]), scene[1]),
+        )
+        yield Case(
+            f"SceneCfgFactory.get_scene[{n} assets]",
+            lambda n=n: _factory(n),
+            lambda factory: factory.get_scene(ArticulationCfg()),
+        )
+    for t in triangle_counts:
+        yield Case(
+            f"generate_terrain[{t} triangles]",
+            lambda t=t: _scene(0, False, t),
+            lambda spec: spec.generate_terrain(),
+        )
+        yield Case(
+            f"TerrainInstance.to_asset_cfg[{t} triangles]",
+            lambda t=t: _scene(0, False, t).generate_terrain(),
+            lambda terrain: terrain.to_asset_cfg(),
+        )
+        yield Case(
+            f"TerrainInstance.to_asset_cfg[{t} triangles, chunked]",
+            lambda t=t: _chunked(_scene(0, False, t).generate_terrain()),
+            lambda terrain: terrain.to_asset_cfg(),
+        )
+
+
+def _chunked(terrain: TerrainInstance) -> TerrainInstance:
+    terrain.chunk_size = 10.0
+    return terrain
+
+
+def measure(case: Case, repeat: int) -> dict[str, float]:
+    """Measure the time and the peak memory of a case
+
+    Args:
+        case (Case): The case
+        repeat (int): The number of timed runs
+
+    Returns:
+        dict[str, float]: The best time in seconds, and the peak memory in bytes
+    """
+    times: list[float] = []
+    for _ in range(repeat):
+        state = case.setup()
+        gc.collect()
+        start = time.perf_counter()
+        case.run(state)
+        times.append(time.perf_counter() - start)
+        del state
+
+    state = case.setup()
+    gc.collect()
+    tracemalloc.start()
+    case.run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"time": min(times), "peak_memory": float(peak)}
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Find the regressions against a baseline
+
+    Args:
+        results (dict[str, dict[str, float]]): The results, by case
+        baseline (dict[str, dict[str, float]]): The baseline results, by case
+        tolerance (float): The allowed relative increase
+
+    Returns:
+        list[str]: A description of each regression
+    """
+    res: list[str] = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, value in result.items():
+            before = baseline[name].get(metric)
+            if before and value > before * (1 + tolerance):
+                res.append(
+                    f"{name}: {metric} {before:.4g} -> {value:.4g} "
+                    f"(+{(value / before - 1) * 100:.0f}%)"
+                )
+    return res
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--assets", type=int, nargs="*", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--triangles", type=int, nargs="*", default=[1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", default="", help="Only run matching cases")
+    parser.add_argument("--output", help="Save the results to a JSON file")
+    parser.add_argument("--baseline", help="Compare to saved results")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    for case in cases(args.assets, args.triangles):
+        if args.filter not in case.name:
+            continue
+        results[case.name] = measure(case, args.repeat)
+        print(
+            f"{case.name:<55} {results[case.name]['time']:>9.3f} s "
+            f"{results[case.name]['peak_memory'] / 2**20:>9.1f} MiB",
+            flush=True,
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Synthetic scenes for the benchmarks"""
+
+from dataclasses import dataclass, field
+from math import ceil, sqrt
+
+import numpy as np
+from trimesh import Trimesh, creation
+
+from stripe_kit import (
+    AssetInstance,
+    AssetInstanceBatch,
+    AssetSpec,
+    DynamicMesh,
+    HeightfieldTerrain,
+    SceneSpec,
+    TerrainInstance,
+)
+
+
+def rock_shapes(count: int, seed: int = 0) -> list[Trimesh]:
+    """Create randomly deformed spheres, standing in for procedural rocks
+
+    Args:
+        count (int): The number of shapes
+        seed (int, optional): The seed of the deformations. Defaults to 0.
+
+    Returns:
+        list[Trimesh]: The shapes, of 320 triangles each
+    """
+    rng = np.random.default_rng(seed)
+    shapes: list[Trimesh] = []
+    for _ in range(count):
+        sphere = creation.icosphere(subdivisions=2, radius=0.5)
+        scale = rng.uniform(0.8, 1.2, size=(len(sphere.vertices), 1))
+        shapes.append(
+            Trimesh(sphere.vertices * scale, sphere.faces, process=False)
+        )
+    return shapes
+
+
+@dataclass
+class ScatterAssetSpec(AssetSpec):
+    """Scatters instances uniformly over the terrain, drawing their meshes
+    from a small set of shapes, with a new `DynamicMesh` per instance unless
+    a batch is created"""
+
+    count: int = 1000
+    """The number of instances"""
+    batch: bool = False
+    """Whether to create a batch, instead of individual instances"""
+    shapes: list[Trimesh] = field(default_factory=lambda: rock_shapes(8))
+    """The shapes the meshes are drawn from"""
+
+    def generate(
+        self, terrain: TerrainInstance
+    ) -> list[AssetInstance] | AssetInstanceBatch:
+        rng = np.random.default_rng(self.count)
+        positions = np.zeros((self.count, 3))
+        positions[:, :2] = rng.uniform(0, terrain.size, size=(self.count, 2))
+        mesh_ids = rng.integers(len(self.shapes), size=self.count)
+        if self.batch:
+            return self.create_batch(
+                [DynamicMesh(shape) for shape in self.shapes],
+                positions,
+                (1.0, 0.0, 0.0, 0.0),
+                mesh_ids,
+            )
+        return [
+            self.create_instance(
+                f"{self.name}_{i}",
+                DynamicMesh(self.shapes[mesh_ids[i]]),
+                tuple(positions[i]),
+                (1.0, 0.0, 0.0, 0.0),
+                {"shape": str(mesh_ids[i])},
+            )
+            for i in range(self.count)
+        ]
+
+
+@dataclass
+class HeightfieldSceneSpec(SceneSpec):
+    """A scene on a random heightfield of about the given triangle count"""
+
+    triangles: int = 1_000_000
+    """The number of triangles of the terrain"""
+
+    def generate(self) -> TerrainInstance:
+        # a grid of n x n points has 2 (n - 1)^2 triangles
+        n = ceil(sqrt(self.triangles / 2)) + 1
+        rng = np.random.default_rng(self.seed)
+        return HeightfieldTerrain.from_heights(
+            rng.uniform(0.0, 0.5, size=(n, n)), self.size, (0.3, 0.3, 0.3)
+        )
@@ -0,0 +1,5 @@
+"""Lightweight stand-in for Isaac Lab, for benchmarking without Isaac Sim.
+
+Only the configuration classes and functions used by `stripe_kit` are
+provided. Configurations are plain dataclasses, and spawning does nothing.
+"""
@@ -0,0 +1,26 @@
+from isaaclab.sim.spawners import SpawnerCfg
+from isaaclab.utils import configclass
+
+
+@configclass
+class AssetBaseCfg:
+    @configclass
+    class InitialStateCfg:
+        pos: tuple[float, float, float] = (0.0, 0.0, 0.0)
+        rot: tuple[float, float, float, float] = (1.0, 0.0, 0.0, 0.0)
+
+    prim_path: str = ""
+    spawn: SpawnerCfg | None = None
+    init_state: InitialStateCfg = InitialStateCfg()
+    collision_group: int = 0
+    debug_vis: bool = False
+
+
+@configclass
+class RigidObjectCfg(AssetBaseCfg):
+    pass
+
+
+@configclass
+class ArticulationCfg(AssetBaseCfg):
+    pass
@@ -0,0 +1,10 @@
+from isaaclab.utils import configclass
+
+
+@configclass
+class InteractiveSceneCfg:
+    num_envs: int = 1
+    env_spacing: float = 0.0
+    lazy_sensor_update: bool = True
+    replicate_physics: bool = True
+    filter_collisions: bool = True
@@ -0,0 +1,6 @@
+from isaaclab.utils import configclass
+
+
+@configclass
+class SensorBaseCfg:
+    prim_path: str = ""
@@ -0,0 +1,6 @@
+def bind_visual_material(prim_path: str, material_path: str) -> None:
+    pass
+
+
+def bind_physics_material(prim_path: str, material_path: str) -> None:
+    pass
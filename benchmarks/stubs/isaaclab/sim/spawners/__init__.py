@@ -0,0 +1,49 @@
+from collections.abc import Callable
+from typing import Any
+
+from isaaclab.utils import configclass
+
+
+def _spawn(prim_path: str, cfg: Any, *args: Any, **kwargs: Any) -> None:
+    pass
+
+
+@configclass
+class SpawnerCfg:
+    func: Callable[..., Any] = _spawn
+    visible: bool = True
+    semantic_tags: list[tuple[str, str]] | None = None
+    copy_from_source: bool = True
+
+
+@configclass
+class UsdFileCfg(SpawnerCfg):
+    usd_path: str = ""
+    scale: tuple[float, float, float] | None = None
+
+
+@configclass
+class VisualMaterialCfg:
+    func: Callable[..., Any] = _spawn
+
+
+@configclass
+class PreviewSurfaceCfg(VisualMaterialCfg):
+    diffuse_color: tuple[float, float, float] = (0.18, 0.18, 0.18)
+    emissive_color: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    roughness: float = 0.5
+    metallic: float = 0.0
+    opacity: float = 1.0
+
+
+@configclass
+class MdlFileCfg(VisualMaterialCfg):
+    mdl_path: str = ""
+
+
+@configclass
+class RigidBodyMaterialCfg:
+    func: Callable[..., Any] = _spawn
+    static_friction: float = 0.5
+    dynamic_friction: float = 0.5
+    restitution: float = 0.0
@@ -0,0 +1,19 @@
+from isaaclab.sim.spawners import SpawnerCfg
+from isaaclab.utils import configclass
+
+
+@configclass
+class LightCfg(SpawnerCfg):
+    color: tuple[float, float, float] = (1.0, 1.0, 1.0)
+    intensity: float = 1.0
+    exposure: float = 0.0
+
+
+@configclass
+class DistantLightCfg(LightCfg):
+    angle: float = 0.53
+
+
+@configclass
+class DomeLightCfg(LightCfg):
+    texture_file: str | None = None
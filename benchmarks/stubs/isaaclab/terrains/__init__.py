@@ -0,0 +1,35 @@
+from collections.abc import Callable
+from typing import Any
+
+from isaaclab.utils import configclass
+
+
+@configclass
+class SubTerrainBaseCfg:
+    function: Callable[..., Any] | None = None
+    proportion: float = 1.0
+    size: tuple[float, float] = (10.0, 10.0)
+
+
+@configclass
+class TerrainGeneratorCfg:
+    sub_terrains: dict[str, SubTerrainBaseCfg] = {}
+    size: tuple[float, float] = (10.0, 10.0)
+    num_rows: int = 1
+    num_cols: int = 1
+    curriculum: bool = False
+    difficulty_range: tuple[float, float] = (0.0, 1.0)
+    use_cache: bool = False
+    border_width: float = 0.0
+
+
+@configclass
+class TerrainImporterCfg:
+    prim_path: str = ""
+    terrain_type: str = "generator"
+    terrain_generator: TerrainGeneratorCfg | None = None
+    max_init_terrain_level: int | None = None
+    collision_group: int = -1
+    visual_material: Any = None
+    env_spacing: float | None = None
+    num_envs: int = 1
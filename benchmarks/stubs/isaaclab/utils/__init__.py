@@ -0,0 +1,35 @@
+from dataclasses import MISSING, dataclass, field, fields, replace
+from typing import Any
+
+
+def _replace(self: Any, **changes: Any) -> Any:
+    return replace(self, **changes)
+
+
+def configclass(cls: type) -> type:
+    """Turn a class into a dataclass, like Isaac Lab's `configclass`
+
+    Mutable defaults are copied for each instance, and `MISSING` defaults
+    become None, so that configurations can be created without arguments.
+    """
+    for name in getattr(cls, "__annotations__", {}):
+        value = cls.__dict__.get(name, MISSING)
+        if value is MISSING:
+            setattr(cls, name, None)
+        elif isinstance(value, (list, dict, set)):
+            setattr(
+                cls, name, field(default_factory=lambda v=value: type(v)(v))
+            )
+        elif hasattr(type(value), "__dataclass_fields__"):
+            setattr(
+                cls,
+                name,
+                field(default_factory=lambda v=value: replace(v)),
+            )
+    cls = dataclass(cls)
+    cls.replace = _replace
+    cls.copy = lambda self: replace(self)
+    cls.to_dict = lambda self: {
+        f.name: getattr(self, f.name) for f in fields(self)
+    }
+    return cls
@@ -0,0 +1,17 @@
+"""Stand-in for the prim utilities of Isaac Sim, without a stage"""
+
+from typing import Any
+
+
+def create_prim(
+    prim_path: str, prim_type: str = "Xform", **kwargs: Any
+) -> None:
+    pass
+
+
+def get_prim_at_path(prim_path: str) -> None:
+    pass
+
+
+def is_prim_path_valid(prim_path: str) -> bool:
+    return False
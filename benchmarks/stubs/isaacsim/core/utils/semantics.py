@@ -0,0 +1,5 @@
+from typing import Any
+
+
+def add_update_semantics(prim: Any, value: str, type: str) -> None:
+    pass
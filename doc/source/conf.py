@@ -32,7 +32,14 @@ intersphinx_mapping = {
 templates_path = ["_templates"]
 exclude_patterns = []
 
-autodoc_mock_imports = ["isaaclab", "isaacsim", "pxr", "trimesh", "gymnasium"]
+autodoc_mock_imports = [
+    "isaaclab",
+    "isaacsim",
+    "pxr",
+    "trimesh",
+    "gymnasium",
+    "torch",
+]
 
 latex_elements = {"extraclassoptions": "openany,oneside"}
 
@@ -39,25 +39,167 @@ module.
 
 """
 
-from .asset import AssetInstance, AssetSpec, IdenticalAssetSpec
-from .env import TaskEnvCfg, TrainingSpec
-from .factory import SceneCfgFactory
-from .mesh import AssetMesh, DynamicMesh, UniversalMesh, USDMesh, instancable
-from .scene_spec import SceneSpec
-from .terrain import TerrainInstance
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+# The package is loaded lazily, so that the generation side (scene, asset and
+# terrain specifications) can be imported without Isaac Sim, for example in
+# generation worker processes. Modules that depend on Isaac Lab are only
+# imported once one of their attributes is accessed.
+_LAZY_ATTRIBUTES = {
+    "TerrainAnalysis": ".analysis",
+    "AssetInstance": ".asset",
+    "AssetInstanceBatch": ".asset",
+    "AssetSpec": ".asset",
+    "IdenticalAssetSpec": ".asset",
+    "bake_scene": ".bake",
+    "MeshConversionCache": ".cache",
+    "GeometryRegistry": ".dedup",
+    "TerrainCache": ".cache",
+    "TaskEnvCfg": ".env",
+    "TrainingSpec": ".env",
+    "reset_root_state_from_table": ".env",
+    "SceneCfgFactory": ".factory",
+    "VariantSceneCfgFactory": ".factory",
+    "TiledSceneCfgFactory": ".factory",
+    "HeightfieldTerrain": ".heightfield",
+    "ScenePregenerator": ".hotswap",
+    "swap_scene": ".hotswap",
+    "PointInstancerCfg": ".instancer",
+    "CollisionLOD": ".lod",
+    "MaterialRegistry": ".materials",
+    "load_scene": ".manifest",
+    "save_scene": ".manifest",
+    "Profiler": ".profiling",
+    "profiler": ".profiling",
+    "SceneBudget": ".stats",
+    "SceneStats": ".stats",
+    "MeshProxy": ".proxy",
+    "OverlapPolicy": ".overlap",
+    "find_overlaps": ".overlap",
+    "resolve_overlaps": ".overlap",
+    "PoissonDiskAssetSpec": ".placement",
+    "drop_to_surface": ".placement",
+    "poisson_disk_sample": ".placement",
+    "AssetMesh": ".mesh",
+    "DynamicMesh": ".mesh",
+    "UniversalMesh": ".mesh",
+    "USDMesh": ".mesh",
+    "convert_meshes": ".mesh",
+    "instancable": ".mesh",
+    "SceneSpec": ".scene_spec",
+    "SemanticTable": ".semantics",
+    "SpawnPoseTable": ".spawn",
+    "spawn_positions": ".spawn",
+    "TerrainInstance": ".terrain",
+    "TerrainPool": ".tiling",
+}
+
+if TYPE_CHECKING:
+    from .analysis import TerrainAnalysis
+    from .asset import (
+        AssetInstance,
+        AssetInstanceBatch,
+        AssetSpec,
+        IdenticalAssetSpec,
+    )
+    from .bake import bake_scene
+    from .cache import MeshConversionCache, TerrainCache
+    from .dedup import GeometryRegistry
+    from .env import TaskEnvCfg, TrainingSpec, reset_root_state_from_table
+    from .factory import (
+        SceneCfgFactory,
+        TiledSceneCfgFactory,
+        VariantSceneCfgFactory,
+    )
+    from .heightfield import HeightfieldTerrain
+    from .hotswap import ScenePregenerator, swap_scene
+    from .instancer import PointInstancerCfg
+    from .lod import CollisionLOD
+    from .materials import MaterialRegistry
+    from .manifest import load_scene, save_scene
+    from .mesh import (
+        AssetMesh,
+        DynamicMesh,
+        UniversalMesh,
+        USDMesh,
+        convert_meshes,
+        instancable,
+    )
+    from .overlap import OverlapPolicy, find_overlaps, resolve_overlaps
+    from .placement import (
+        PoissonDiskAssetSpec,
+        drop_to_surface,
+        poisson_disk_sample,
+    )
+    from .profiling import Profiler, profiler
+    from .proxy import MeshProxy
+    from .scene_spec import SceneSpec
+    from .semantics import SemanticTable
+    from .spawn import SpawnPoseTable, spawn_positions
+    from .stats import SceneBudget, SceneStats
+    from .terrain import TerrainInstance
+    from .tiling import TerrainPool
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
+
 
 __all__ = [
     "SceneCfgFactory",
+    "VariantSceneCfgFactory",
+    "TiledSceneCfgFactory",
     "AssetSpec",
     "IdenticalAssetSpec",
+    "PoissonDiskAssetSpec",
+    "poisson_disk_sample",
+    "drop_to_surface",
     "TerrainInstance",
+    "HeightfieldTerrain",
+    "TerrainPool",
+    "TerrainAnalysis",
+    "TerrainCache",
     "AssetInstance",
+    "AssetInstanceBatch",
     "SceneSpec",
+    "SemanticTable",
     "AssetMesh",
     "DynamicMesh",
     "USDMesh",
     "UniversalMesh",
+    "MeshConversionCache",
+    "CollisionLOD",
+    "GeometryRegistry",
+    "MaterialRegistry",
+    "Profiler",
+    "profiler",
+    "MeshProxy",
+    "OverlapPolicy",
+    "find_overlaps",
+    "resolve_overlaps",
+    "SceneStats",
+    "SceneBudget",
+    "convert_meshes",
     "TrainingSpec",
     "TaskEnvCfg",
+    "SpawnPoseTable",
+    "spawn_positions",
+    "reset_root_state_from_table",
     "instancable",
+    "PointInstancerCfg",
+    "save_scene",
+    "load_scene",
+    "bake_scene",
+    "ScenePregenerator",
+    "swap_scene",
 ]
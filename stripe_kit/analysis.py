@@ -0,0 +1,178 @@
+from functools import cached_property
+from logging import getLogger
+from math import ceil, radians
+
+import numpy as np
+
+from .heightfield import HeightfieldTerrain
+from .placement import surface_grid
+from .terrain import TerrainInstance
+
+logger = getLogger(__name__)
+
+
+class TerrainAnalysis:
+    """Rasters of data derived from a terrain, shared by all asset specs.
+
+    The rasters cover the whole terrain, with square cells of `resolution`
+    meters, rows along the y axis, and the values sampled at the cell
+    centers, like a `Density` grid. Each layer is computed with array
+    operations on first access, and then kept. Cells without any terrain
+    surface hold NaN or False.
+
+    Use `TerrainInstance.analysis` to get the analysis shared by the whole
+    palette, rather than creating one directly.
+    """
+
+    def __init__(self, terrain: TerrainInstance, resolution: float):
+        """Create a new TerrainAnalysis object, nothing is computed yet
+
+        Args:
+            terrain (TerrainInstance): The terrain to analyze
+            resolution (float): The size of the raster cells in meters
+        """
+        self.terrain = terrain
+        self.resolution = resolution
+        self.shape = (
+            ceil(terrain.size[1] / resolution),
+            ceil(terrain.size[0] / resolution),
+        )
+        """The shape of the rasters, as (rows, cols)"""
+        self._masks: dict[tuple[object, ...], np.ndarray] = {}
+
+    @cached_property
+    def points(self) -> np.ndarray:
+        """The centers of the cells, of shape (rows, cols, 2)"""
+        rows, cols = self.shape
+        x = (np.arange(cols) + 0.5) * self.resolution
+        y = (np.arange(rows) + 0.5) * self.resolution
+        return np.stack(np.meshgrid(x, y), axis=-1)
+
+    @cached_property
+    def _surface(self) -> tuple[np.ndarray, np.ndarray]:
+        xy = self.points.reshape(-1, 2)
+        heights = np.full(len(xy), np.nan)
+        mesh_ids = np.full(len(xy), -1, dtype=np.intp)
+        if isinstance(self.terrain, HeightfieldTerrain):
+            heights = self.terrain.height_at(xy)
+            mesh_ids[:] = 0
+        else:
+            index, locations, faces = surface_grid(self.terrain).raycast(xy)
+            heights[index] = locations[:, 2]
+            # the faces of the combined mesh are in the order of the meshes
+            ends = np.cumsum([len(mesh.faces) for mesh, _ in self.terrain.mesh])
+            mesh_ids[index] = np.searchsorted(ends, faces, side="right")
+        return heights.reshape(self.shape), mesh_ids.reshape(self.shape)
+
+    @property
+    def heights(self) -> np.ndarray:
+        """The height of the topmost surface"""
+        return self._surface[0]
+
+    @property
+    def mesh_ids(self) -> np.ndarray:
+        """Index into `TerrainInstance.mesh` of the topmost surface, -1
+        where there's none"""
+        return self._surface[1]
+
+    @cached_property
+    def _gradient(self) -> tuple[np.ndarray, np.ndarray]:
+        dzdy, dzdx = np.gradient(self.heights, self.resolution)
+        return dzdx, dzdy
+
+    @cached_property
+    def slope(self) -> np.ndarray:
+        """The angle between the surface and the horizontal plane in
+        radians"""
+        return np.arctan(np.hypot(*self._gradient))
+
+    @cached_property
+    def curvature(self) -> np.ndarray:
+        """The Laplacian of the heights, positive in hollows and negative on
+        ridges"""
+        dzdx, dzdy = self._gradient
+        return np.gradient(dzdx, self.resolution, axis=1) + np.gradient(
+            dzdy, self.resolution, axis=0
+        )
+
+    @cached_property
+    def roughness(self) -> np.ndarray:
+        """The root mean square deviation of the heights within the 3x3
+        cells around each cell from the plane of the local slope"""
+        dzdx, dzdy = self._gradient
+        # cells outside of the terrain are left out of the window
+        padded = np.pad(self.heights, 1, constant_values=np.nan)
+        rows, cols = self.shape
+        squares = np.zeros(self.shape)
+        counts = np.zeros(self.shape)
+        for i in range(3):
+            for j in range(3):
+                plane = (
+                    self.heights
+                    + ((j - 1) * dzdx + (i - 1) * dzdy) * self.resolution
+                )
+                square = (padded[i : i + rows, j : j + cols] - plane) ** 2
+                valid = ~np.isnan(square)
+                squares[valid] += square[valid]
+                counts += valid
+        with np.errstate(invalid="ignore"):
+            return np.sqrt(squares / counts)
+
+    def tag_mask(self, tag: str, value: str) -> np.ndarray:
+        """Get the cells, where the topmost surface belongs to a terrain
+        mesh with the given semantic tag, like a water mask
+
+        Args:
+            tag (str): The semantic type
+            value (str): The semantic value
+
+        Returns:
+            np.ndarray: A boolean raster
+        """
+        key = ("tag", tag, value)
+        if key not in self._masks:
+            tagged = np.array(
+                [(tag, value) in tags for _, tags in self.terrain.mesh]
+                + [False]
+            )
+            # -1 picks the trailing False
+            self._masks[key] = tagged[self.mesh_ids]
+        return self._masks[key]
+
+    def traversable(
+        self,
+        max_slope: float = radians(30),
+        max_roughness: float = np.inf,
+    ) -> np.ndarray:
+        """Get the cells, where the surface is flat and smooth enough
+
+        Args:
+            max_slope (float, optional): The maximum slope in radians. Defaults to 30 degrees.
+            max_roughness (float, optional): The maximum roughness in meters. Defaults to no limit.
+
+        Returns:
+            np.ndarray: A boolean raster
+        """
+        key = ("traversable", max_slope, max_roughness)
+        if key not in self._masks:
+            mask = self.slope <= max_slope
+            if max_roughness < np.inf:
+                mask &= self.roughness <= max_roughness
+            self._masks[key] = mask
+        return self._masks[key]
+
+    def sample(self, raster: np.ndarray, xy: np.ndarray) -> np.ndarray:
+        """Look up the values of a raster at many points
+
+        Args:
+            raster (np.ndarray): One of the rasters
+            xy (np.ndarray): The points, of shape (N, 2)
+
+        Returns:
+            np.ndarray: The values of the cells containing the points, of shape (N,)
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        rows, cols = self.shape
+        i = np.clip((xy[:, 1] / self.resolution).astype(np.intp), 0, rows - 1)
+        j = np.clip((xy[:, 0] / self.resolution).astype(np.intp), 0, cols - 1)
+        return raster[i, j]
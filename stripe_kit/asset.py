@@ -1,13 +1,19 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Container, Iterator, Sequence
+from copy import copy
+from dataclasses import dataclass, field, replace
 from logging import getLogger
+from typing import TYPE_CHECKING
 
-from isaaclab.assets import AssetBaseCfg
-from isaaclab.sim.spawners.lights import DistantLightCfg, DomeLightCfg
+import numpy as np
 
 from .mesh import CLASS_TAG, AssetMesh
+from .semantics import SemanticTable
 from .terrain import TerrainInstance
 
+if TYPE_CHECKING:
+    from isaaclab.assets import AssetBaseCfg
+
 logger = getLogger(__name__)
 
 @dataclass
@@ -18,21 +24,30 @@ class AssetSpec(ABC):
 
     name: str
     """The name of the asset. For example, "Tree" or "Rock"."""
-    asset_cfg_class: type[AssetBaseCfg] = AssetBaseCfg
-    """The configuration class for the asset."""
+    asset_cfg_class: "type[AssetBaseCfg] | None" = None
+    """The configuration class for the asset. Defaults to AssetBaseCfg."""
+    point_instancer: bool = False
+    """Whether batches of this asset should be spawned as point instancers,
+    see `AssetInstanceBatch.point_instancer`"""
+    priority: int = field(default=0, compare=False)
+    """The importance of the asset, when a scene exceeds its `SceneBudget`,
+    the assets of the lowest priority are degraded first"""
 
     @abstractmethod
     def generate(
         self,
         terrain: TerrainInstance,
-    ) -> list["AssetInstance"]:
+    ) -> "list[AssetInstance] | AssetInstanceBatch":
         """Generate instances of the asset to be placed on the terrain
 
+        For large numbers of instances, prefer returning an
+        `AssetInstanceBatch`, see `create_batch`.
+
         Args:
             terrain (TerrainInstance): The terrain to place the asset on
 
         Returns:
-            list[AssetInstance]: A list of instances of the asset to be placed on the terrain
+            list[AssetInstance] | AssetInstanceBatch: Instances of the asset to be placed on the terrain
         """
         ...
 
@@ -68,6 +83,46 @@ class AssetSpec(ABC):
             asset_cfg_class=self.asset_cfg_class,
         )
 
+    def create_batch(
+        self,
+        meshes: Sequence[AssetMesh],
+        positions: "np.ndarray | Sequence[tuple[float, float, float]]",
+        rotations: "np.ndarray | Sequence[tuple[float, float, float, float]]",
+        mesh_ids: "np.ndarray | Sequence[int] | None" = None,
+        tags: Sequence[dict[str, str]] | None = None,
+    ) -> "AssetInstanceBatch":
+        """Create an AssetInstanceBatch object from an AssetSpec object
+
+        Args:
+            meshes (Sequence[AssetMesh]): The meshes used by the instances
+            positions (np.ndarray | Sequence[tuple[float, float, float]]): The positions of the instances, of shape (N, 3)
+            rotations (np.ndarray | Sequence[tuple[float, float, float, float]]): The rotations of the instances, of shape (N, 4) or (4,) if shared
+            mesh_ids (np.ndarray | Sequence[int] | None, optional): Index into `meshes` for each instance. Defaults to None, meaning the first mesh.
+            tags (Sequence[dict[str, str]] | None, optional): Additional tags for each instance. Defaults to None.
+
+        Returns:
+            AssetInstanceBatch: The AssetInstanceBatch object
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        n = len(positions)
+        rotations = np.asarray(rotations, dtype=np.float64)
+        if rotations.ndim == 1:
+            rotations = np.broadcast_to(rotations, (n, 4))
+        if mesh_ids is None:
+            mesh_ids = np.zeros(n, dtype=np.int32)
+        batch = AssetInstanceBatch(
+            self,
+            list(meshes),
+            positions,
+            rotations,
+            np.asarray(mesh_ids, dtype=np.int32),
+            asset_cfg_class=self.asset_cfg_class,
+            point_instancer=self.point_instancer,
+        )
+        if tags is not None:
+            batch.set_tags(tags)
+        return batch
+
 
 class IdenticalAssetSpec(AssetSpec, ABC):
     """A specification for an asset class, that will be identical across all instances"""
@@ -76,24 +131,29 @@ class IdenticalAssetSpec(AssetSpec, ABC):
         self,
         name: str,
         mesh: AssetMesh,
-        asset_cfg_class: type[AssetBaseCfg] = AssetBaseCfg,
+        asset_cfg_class: "type[AssetBaseCfg] | None" = None,
         rotation: tuple[float, float, float, float] = (0, 0, 0, 1),
+        point_instancer: bool = False,
+        priority: int = 0,
     ):
         """Create a new IdenticalAssetSpec object
 
         Args:
             name (str): The name of the asset
             mesh (AssetMesh): The mesh of the asset
-            asset_cfg_class (type[AssetBaseCfg], optional): The configuration class for the asset. Defaults to AssetBaseCfg.
+            asset_cfg_class (type[AssetBaseCfg] | None, optional): The configuration class for the asset. Defaults to None, meaning AssetBaseCfg.
+            rotation (tuple[float, float, float, float], optional): The rotation of all instances. Defaults to (0, 0, 0, 1).
+            point_instancer (bool, optional): Whether to spawn all instances as a single point instancer. Defaults to False.
+            priority (int, optional): The importance of the asset, see `AssetSpec.priority`. Defaults to 0.
         """
-        super().__init__(name, asset_cfg_class)
+        super().__init__(name, asset_cfg_class, point_instancer, priority)
         self.mesh = mesh
         self.rotation = rotation
 
     @abstractmethod
     def find_positions(
         self, terrain: TerrainInstance
-    ) -> list[tuple[float, float, float]]:
+    ) -> "list[tuple[float, float, float]] | np.ndarray":
         """Find positions to place the asset on the terrain.
         This is essentially a devolved generate() that returns a list of positions instead of creating instances.
 
@@ -101,31 +161,44 @@ class IdenticalAssetSpec(AssetSpec, ABC):
             terrain (TerrainInstance): The terrain to place the asset on
 
         Returns:
-            list[tuple[float, float, float]]: A list of positions to place the asset on the terrain
+            list[tuple[float, float, float]] | np.ndarray: Positions to place the asset on the terrain, either as a list or an array of shape (N, 3)
         """
         ...
 
-    def generate(self, terrain: TerrainInstance) -> list["AssetInstance"]:
+    def generate(self, terrain: TerrainInstance) -> "AssetInstanceBatch":
         """Generate instances of the asset to be placed on the terrain
 
         Internally, this method calls `self.find_positions(terrain)` to find
         positions to place the asset on the terrain, and then
-        `self.create_instance(name, position, rotation)` to create instances of the asset.
+        `self.create_identical_batch(positions)` to create a batch of instances.
 
         Args:
             terrain (TerrainInstance): The terrain to place the asset on
 
         Returns:
-            list[AssetInstance]: A list of instances of the asset to be placed on the terrain
+            AssetInstanceBatch: A batch of instances of the asset to be placed on the terrain
         """
-        return [
-            self.create_identical_instance(
-                f"{self.name}_{i}",
-                position,
-                self.rotation,
-            )
-            for i, position in enumerate(self.find_positions(terrain))
-        ]
+        return self.create_identical_batch(self.find_positions(terrain))
+
+    def create_identical_batch(
+        self,
+        positions: "np.ndarray | Sequence[tuple[float, float, float]]",
+        rotations: "np.ndarray | Sequence[tuple[float, float, float, float]] | None" = None,
+        tags: Sequence[dict[str, str]] | None = None,
+    ) -> "AssetInstanceBatch":
+        """Create an AssetInstanceBatch object, where all instances share the mesh
+
+        Args:
+            positions (np.ndarray | Sequence[tuple[float, float, float]]): The positions of the instances, of shape (N, 3)
+            rotations (np.ndarray | Sequence[tuple[float, float, float, float]] | None, optional): The rotations of the instances. Defaults to None, meaning `self.rotation`.
+            tags (Sequence[dict[str, str]] | None, optional): Additional tags for each instance. Defaults to None.
+
+        Returns:
+            AssetInstanceBatch: The AssetInstanceBatch object
+        """
+        if rotations is None:
+            rotations = self.rotation
+        return self.create_batch([self.mesh], positions, rotations, tags=tags)
 
     def create_identical_instance(
         self,
@@ -154,7 +227,7 @@ class SceneAsset(ABC):
     """A scene asset that can be placed in a scene"""
 
     @abstractmethod
-    def to_cfg(self) -> AssetBaseCfg:
+    def to_cfg(self) -> "AssetBaseCfg":
         """Create a RigidObjectCfg object from an AssetInstance object
 
         Returns:
@@ -188,15 +261,32 @@ class AssetInstance(SceneAsset):
     """The rotation of the asset"""
     additional_tags: dict[str, str]
     """Additional tags for the asset"""
-    asset_cfg_class: type[AssetBaseCfg] = AssetBaseCfg
-    """The configuration class for the asset"""
+    asset_cfg_class: "type[AssetBaseCfg] | None" = None
+    """The configuration class for the asset, defaults to AssetBaseCfg"""
+
+    def get_semantic_tags(self) -> list[tuple[str, str]]:
+        """Get the semantic tags specific to this instance
 
-    def to_cfg(self) -> AssetBaseCfg:
+        Returns:
+            list[tuple[str, str]]: The class tag, followed by the additional tags
+        """
+        tags: list[tuple[str, str]] = []
+        if self.asset_class is not None:
+            tags.append((CLASS_TAG, self.asset_class.name))
+        tags.extend(self.additional_tags.items())
+        return tags
+
+    def to_cfg(self, semantics: SemanticTable | None = None) -> "AssetBaseCfg":
         """Create a config class object from an AssetInstance object.
         The returned type is determined by the asset_cfg_class attribute.
 
+        The spawner returned by the mesh may be shared between instances
+        (see `instancable`), so it's never modified. If a semantic table is
+        given, the tags of this instance are recorded there, to be applied
+        after spawning. Otherwise, they're set on a copy of the spawner.
+
         Args:
-            scene_name (str, optional): The name of the scene to place the asset into. Defaults to "World".
+            semantics (SemanticTable | None, optional): The table to record the semantic tags in. Defaults to None.
 
         Returns:
             asset_cfg_class: The IsaacLab cfg object
@@ -207,16 +297,21 @@ class AssetInstance(SceneAsset):
         else:
             prim_path = f"/{self.asset_class.name}/{self.name}"
 
-        obj = self.asset_cfg_class(prim_path=prim_path)
+        from isaaclab.assets import AssetBaseCfg
 
-        spawner = self.mesh.to_cfg()
+        cfg_class = self.asset_cfg_class or AssetBaseCfg
+        obj = cfg_class(prim_path=prim_path)
 
-        if spawner.semantic_tags is None:
-            spawner.semantic_tags = []
+        spawner = self.mesh.to_cfg()
 
-        if self.asset_class is not None:
-            spawner.semantic_tags.append((CLASS_TAG, self.asset_class.name))
-        spawner.semantic_tags.extend(self.additional_tags.items())
+        if semantics is not None:
+            semantics.add(prim_path, self.get_semantic_tags())
+        else:
+            spawner = copy(spawner)
+            spawner.semantic_tags = [
+                *(spawner.semantic_tags or []),
+                *self.get_semantic_tags(),
+            ]
 
         obj.spawn = spawner
 
@@ -236,6 +331,302 @@ class AssetInstance(SceneAsset):
         return self.name
 
 
+def unique_name(name: str, taken: Container[str]) -> str:
+    """Make a name unique, by appending the first free suffix `_1`, `_2`...
+
+    Used to tell apart batches of the same name, like two batches generated
+    by asset specs of the same name.
+
+    Args:
+        name (str): The name
+        taken (Container[str]): The names already in use
+
+    Returns:
+        str: The name itself if it's free, otherwise the name with a suffix
+    """
+    res = name
+    i = 1
+    while res in taken:
+        res = f"{name}_{i}"
+        i += 1
+    return res
+
+
+@dataclass
+class AssetInstanceBatch:
+    """A batch of asset instances, stored as a struct of arrays.
+
+    Instead of holding a Python object per instance, the poses are stored in
+    NumPy arrays, the meshes in a shared table indexed by `mesh_ids`, and the
+    additional tags as interned ids into `tag_table`, laid out in CSR format
+    (the tags of instance `i` are `tag_ids[tag_offsets[i]:tag_offsets[i + 1]]`).
+
+    Individual instances can still be accessed by indexing or iterating,
+    which creates `AssetInstance` objects on the fly.
+    """
+
+    asset_class: AssetSpec | None
+    """The class of the assets"""
+    meshes: list[AssetMesh]
+    """The table of meshes used by the instances"""
+    positions: np.ndarray
+    """The positions of the instances, of shape (N, 3)"""
+    rotations: np.ndarray
+    """The rotations of the instances, of shape (N, 4)"""
+    mesh_ids: np.ndarray
+    """Index into `meshes` for each instance, of shape (N,)"""
+    tag_table: list[tuple[str, str]] = field(default_factory=list)
+    """The table of interned additional tags"""
+    tag_ids: np.ndarray = field(
+        default_factory=lambda: np.zeros(0, dtype=np.int32)
+    )
+    """Index into `tag_table` for each tag of each instance"""
+    tag_offsets: np.ndarray | None = None
+    """Offsets into `tag_ids` for each instance, of shape (N + 1,)"""
+    names: list[str] | None = None
+    """Names of the instances, by default derived from the asset class name"""
+    asset_cfg_class: "type[AssetBaseCfg] | None" = None
+    """The configuration class for the assets, defaults to AssetBaseCfg"""
+    point_instancer: bool = False
+    """Whether to spawn the batch as a single `UsdGeom.PointInstancer` prim
+    per mesh, instead of a prim per instance. Point instancers are static,
+    thus `asset_cfg_class` is ignored in that case."""
+
+    def __post_init__(self):
+        if self.tag_offsets is None:
+            self.tag_offsets = np.zeros(len(self) + 1, dtype=np.int64)
+
+    @property
+    def name(self) -> str:
+        """The name of the batch, the name of the asset class if set"""
+        return "asset" if self.asset_class is None else self.asset_class.name
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator["AssetInstance"]:
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, i: int) -> "AssetInstance":
+        return AssetInstance(
+            self.asset_class,
+            self.meshes[self.mesh_ids[i]],
+            self.get_name(i),
+            tuple(self.positions[i].tolist()),
+            tuple(self.rotations[i].tolist()),
+            self.get_tags(i),
+            asset_cfg_class=self.asset_cfg_class,
+        )
+
+    def get_name(self, i: int, name: str | None = None) -> str:
+        """Get the name of an instance
+
+        Args:
+            i (int): The index of the instance
+            name (str | None, optional): The name the batch was added to the scene under, see `to_cfgs`. Defaults to None, meaning `name`.
+
+        Returns:
+            str: The name of the instance
+        """
+        if self.names is not None:
+            return self.names[i]
+        return f"{self.name if name is None else name}_{i}"
+
+    def get_tags(self, i: int) -> dict[str, str]:
+        """Get the additional tags of an instance
+
+        Args:
+            i (int): The index of the instance
+
+        Returns:
+            dict[str, str]: The additional tags of the instance
+        """
+        assert self.tag_offsets is not None
+        ids = self.tag_ids[self.tag_offsets[i] : self.tag_offsets[i + 1]]
+        return dict(self.tag_table[j] for j in ids)
+
+    def set_tags(self, tags: Sequence[dict[str, str]]) -> None:
+        """Set the additional tags of all instances, interning them
+
+        Args:
+            tags (Sequence[dict[str, str]]): The additional tags of each instance
+        """
+        if len(tags) != len(self):
+            raise ValueError(
+                f"Expected tags for {len(self)} instances, got {len(tags)}"
+            )
+        interned: dict[tuple[str, str], int] = {}
+        ids: list[int] = []
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        for i, instance_tags in enumerate(tags):
+            for tag in instance_tags.items():
+                ids.append(interned.setdefault(tag, len(interned)))
+            offsets[i + 1] = len(ids)
+        self.tag_table = list(interned)
+        self.tag_ids = np.asarray(ids, dtype=np.int32)
+        self.tag_offsets = offsets
+
+    @classmethod
+    def from_instances(
+        cls, instances: Sequence["AssetInstance"]
+    ) -> "AssetInstanceBatch":
+        """Create a batch out of individual instances
+
+        The instances must share the asset class and the configuration class.
+
+        Args:
+            instances (Sequence[AssetInstance]): The instances
+
+        Raises:
+            ValueError: If the instances don't share the asset or configuration class
+
+        Returns:
+            AssetInstanceBatch: The AssetInstanceBatch object
+        """
+        if not instances:
+            raise ValueError("At least one instance is required")
+        first = instances[0]
+        mesh_table: dict[int, int] = {}
+        meshes: list[AssetMesh] = []
+        mesh_ids = np.empty(len(instances), dtype=np.int32)
+        for i, instance in enumerate(instances):
+            if (
+                instance.asset_class is not first.asset_class
+                or instance.asset_cfg_class is not first.asset_cfg_class
+            ):
+                raise ValueError(
+                    "Instances must share the asset and configuration class"
+                )
+            if id(instance.mesh) not in mesh_table:
+                mesh_table[id(instance.mesh)] = len(meshes)
+                meshes.append(instance.mesh)
+            mesh_ids[i] = mesh_table[id(instance.mesh)]
+        batch = cls(
+            first.asset_class,
+            meshes,
+            np.array([i.position for i in instances], dtype=np.float64),
+            np.array([i.rotation for i in instances], dtype=np.float64),
+            mesh_ids,
+            names=[i.name for i in instances],
+            asset_cfg_class=first.asset_cfg_class,
+        )
+        batch.set_tags([i.additional_tags for i in instances])
+        return batch
+
+    def select(self, index: np.ndarray) -> "AssetInstanceBatch":
+        """Create a batch of a subset of the instances
+
+        Args:
+            index (np.ndarray): The indices of the instances to keep, or a boolean mask of shape (N,)
+
+        Returns:
+            AssetInstanceBatch: The subset, sharing the mesh and tag tables with this batch
+        """
+        assert self.tag_offsets is not None
+        index = np.arange(len(self))[index]
+        starts = self.tag_offsets[index]
+        lengths = self.tag_offsets[index + 1] - starts
+        offsets = np.zeros(len(index) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        tag_ids = self.tag_ids[
+            np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        ]
+        return replace(
+            self,
+            positions=self.positions[index],
+            rotations=self.rotations[index],
+            mesh_ids=self.mesh_ids[index],
+            tag_ids=tag_ids,
+            tag_offsets=offsets,
+            names=(
+                None
+                if self.names is None
+                else [self.names[i] for i in index.tolist()]
+            ),
+        )
+
+    def tag_sets(self) -> tuple[np.ndarray, list[dict[str, str]]]:
+        """Intern the complete sets of additional tags of the instances
+
+        Returns:
+            tuple[np.ndarray, list[dict[str, str]]]: Index into the table of tag sets for each instance, and the table itself
+        """
+        assert self.tag_offsets is not None
+        interned: dict[tuple[int, ...], int] = {}
+        ids = np.empty(len(self), dtype=np.int32)
+        for i in range(len(self)):
+            start, end = self.tag_offsets[i], self.tag_offsets[i + 1]
+            key = tuple(self.tag_ids[start:end].tolist())
+            ids[i] = interned.setdefault(key, len(interned))
+        return ids, [dict(self.tag_table[j] for j in key) for key in interned]
+
+    def semantic_labels(self) -> tuple[np.ndarray, list[str]]:
+        """Encode the sets of additional tags as labels, the way point
+        instancers store them, see `tag_sets`
+
+        Returns:
+            tuple[np.ndarray, list[str]]: Index into the labels for each instance, and the labels as `tag=value` pairs separated by `;`
+        """
+        set_ids, sets = self.tag_sets()
+        labels = [
+            ";".join(f"{tag}={value}" for tag, value in sorted(tags.items()))
+            for tags in sets
+        ]
+        return set_ids, labels
+
+    def to_cfgs(
+        self, semantics: SemanticTable | None = None, name: str | None = None
+    ) -> "dict[str, AssetBaseCfg]":
+        """Create config class objects for all instances
+
+        If `point_instancer` is set, a single point instancer is created per
+        mesh instead, named `{name}_instancer_{mesh_id}`, holding its own
+        per-instance semantics.
+
+        Args:
+            semantics (SemanticTable | None, optional): The table to record the semantic tags in, see `AssetInstance.to_cfg`. Defaults to None.
+            name (str | None, optional): The name the batch is added to the scene under, used to name the instances, so that batches of the same name don't collide, see `SceneCfgFactory.add_batch`. Defaults to None, meaning `name`.
+
+        Returns:
+            dict[str, AssetBaseCfg]: The IsaacLab cfg objects, by name
+        """
+        if name is None:
+            name = self.name
+        if not self.point_instancer:
+            res: dict[str, AssetBaseCfg] = {}
+            for i, instance in enumerate(self):
+                instance.name = self.get_name(i, name)
+                res[instance.name] = instance.to_cfg(semantics)
+            return res
+
+        from isaaclab.assets import AssetBaseCfg
+
+        from .instancer import PointInstancerCfg
+
+        set_ids, labels = self.semantic_labels()
+        res = {}
+        for mesh_id, mesh in enumerate(self.meshes):
+            mask = self.mesh_ids == mesh_id
+            if not mask.any():
+                continue
+            instancer = f"{name}_instancer_{mesh_id}"
+            spawner = PointInstancerCfg(
+                prototype=mesh.to_cfg(),
+                positions=self.positions[mask],
+                orientations=self.rotations[mask],
+                semantic_ids=set_ids[mask],
+                semantic_labels=labels,
+            )
+            if self.asset_class is not None:
+                spawner.semantic_tags = [(CLASS_TAG, self.asset_class.name)]
+            cfg = AssetBaseCfg(
+                prim_path=f"/{self.name}/{instancer}", spawn=spawner
+            )
+            cfg.init_state = cfg.InitialStateCfg()
+            res[instancer] = cfg
+        return res
+
+
 @dataclass
 class DistantLightSpec(SceneAsset):
     """Specification for a scene distant light in which
@@ -246,7 +637,9 @@ class DistantLightSpec(SceneAsset):
     intensity: float = 1.0
     color: tuple[float, float, float] = (0.988, 0.957, 0.645)
 
-    def to_cfg(self, scene_name: str = "World") -> AssetBaseCfg:
+    def to_cfg(self, scene_name: str = "World") -> "AssetBaseCfg":
+        from isaaclab.assets import AssetBaseCfg
+        from isaaclab.sim.spawners.lights import DistantLightCfg
 
         logger.debug("Creating distant light cfg")
 
@@ -277,7 +670,9 @@ class DomeLightSpec(SceneAsset):
     intensity: float = 1000.0
     color: tuple[float, float, float] = (0.988, 0.957, 0.645)
 
-    def to_cfg(self, scene_name: str = "World") -> AssetBaseCfg:
+    def to_cfg(self, scene_name: str = "World") -> "AssetBaseCfg":
+        from isaaclab.assets import AssetBaseCfg
+        from isaaclab.sim.spawners.lights import DomeLightCfg
 
         logger.debug("Creating dome light cfg")
 
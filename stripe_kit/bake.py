@@ -0,0 +1,664 @@
+"""
+Baking of generated scenes into a single USD layer.
+
+Spawning a scene through Isaac Lab runs a spawner per asset and per terrain
+mesh, each of them editing the stage on its own. Baking writes the static
+part of the scene (the terrain, the static assets, their materials and
+semantics) into one USD file up front, which can then be spawned as a single
+asset, and reused as long as the scene doesn't change, see `scene_key`.
+
+Only `pxr` is needed, so scenes can be baked without Isaac Sim.
+"""
+
+import os
+from collections.abc import Callable, Iterable, Sequence
+from logging import getLogger
+from typing import Any
+
+import numpy as np
+from pxr import (
+    Gf,
+    Sdf,
+    Usd,
+    UsdGeom,
+    Vt,
+)  # pyright: ignore[reportMissingImports]
+from trimesh import Trimesh
+
+from .asset import AssetInstance, AssetInstanceBatch, unique_name
+from .cache import stable_hash
+from .dedup import geometry_key
+from .lod import COLLISION_NAME, CollisionLOD
+from .materials import MATERIALS_NAME, material_key
+from .mesh import CLASS_TAG, AssetMesh, DynamicMesh, UniversalMesh, USDMesh
+from .terrain import TERRAIN_NAME, TerrainInstance
+
+logger = getLogger(__name__)
+
+BAKED_NAME = "scene"
+PROTOTYPES_NAME = "prototypes"
+SEMANTIC_IDS_PRIMVAR = "semanticIds"
+SEMANTIC_LABELS_ATTR = "semanticLabels"
+KEY_SUFFIX = ".key"
+BAKE_FORMAT = 1
+
+# defaults of `PreviewSurfaceCfg` and `RigidBodyMaterialCfg`
+_PREVIEW_SURFACE_INPUTS = {
+    "diffuse_color": (
+        "diffuseColor",
+        Sdf.ValueTypeNames.Color3f,
+        (0.18, 0.18, 0.18),
+    ),
+    "emissive_color": (
+        "emissiveColor",
+        Sdf.ValueTypeNames.Color3f,
+        (0.0, 0.0, 0.0),
+    ),
+    "roughness": ("roughness", Sdf.ValueTypeNames.Float, 0.5),
+    "metallic": ("metallic", Sdf.ValueTypeNames.Float, 0.0),
+    "opacity": ("opacity", Sdf.ValueTypeNames.Float, 1.0),
+}
+_PHYSICS_MATERIAL_ATTRS = {
+    "static_friction": ("physics:staticFriction", 0.5),
+    "dynamic_friction": ("physics:dynamicFriction", 0.5),
+    "restitution": ("physics:restitution", 0.0),
+}
+
+
+def build_point_instancer(
+    instancer: UsdGeom.PointInstancer,
+    prototypes: Sequence[str],
+    positions: np.ndarray,
+    orientations: np.ndarray,
+    proto_indices: np.ndarray | None = None,
+    semantic_ids: np.ndarray | None = None,
+    semantic_labels: Sequence[str] | None = None,
+) -> None:
+    """Fill a point instancer with prototypes and per-instance data.
+
+    This only depends on `pxr`, so it works on any USD stage.
+
+    Args:
+        instancer (UsdGeom.PointInstancer): The point instancer to fill
+        prototypes (Sequence[str]): Paths to the prototype prims
+        positions (np.ndarray): The positions of the instances, of shape (N, 3)
+        orientations (np.ndarray): The orientations of the instances as (w, x, y, z), of shape (N, 4)
+        proto_indices (np.ndarray | None, optional): Index into `prototypes` for each instance. Defaults to None, meaning the first prototype.
+        semantic_ids (np.ndarray | None, optional): Index into `semantic_labels` for each instance. Defaults to None.
+        semantic_labels (Sequence[str] | None, optional): The table of semantic labels. Defaults to None.
+    """
+    rel = instancer.CreatePrototypesRel()
+    for path in prototypes:
+        rel.AddTarget(Sdf.Path(path))
+    set_instances(
+        instancer,
+        positions,
+        orientations,
+        proto_indices,
+        semantic_ids,
+        semantic_labels,
+    )
+
+
+def set_instances(
+    instancer: UsdGeom.PointInstancer,
+    positions: np.ndarray,
+    orientations: np.ndarray,
+    proto_indices: np.ndarray | None = None,
+    semantic_ids: np.ndarray | None = None,
+    semantic_labels: Sequence[str] | None = None,
+) -> None:
+    """Set the per-instance data of a point instancer, replacing the
+    previous instances, see `build_point_instancer`
+
+    Args:
+        instancer (UsdGeom.PointInstancer): The point instancer
+        positions (np.ndarray): The positions of the instances, of shape (N, 3)
+        orientations (np.ndarray): The orientations of the instances as (w, x, y, z), of shape (N, 4)
+        proto_indices (np.ndarray | None, optional): Index into the prototypes for each instance. Defaults to None, meaning the first prototype.
+        semantic_ids (np.ndarray | None, optional): Index into `semantic_labels` for each instance. Defaults to None.
+        semantic_labels (Sequence[str] | None, optional): The table of semantic labels. Defaults to None.
+    """
+    n = len(positions)
+    if proto_indices is None:
+        proto_indices = np.zeros(n, dtype=np.int32)
+
+    instancer.CreatePositionsAttr().Set(
+        Vt.Vec3fArray.FromNumpy(
+            np.ascontiguousarray(positions, dtype=np.float32)
+        )
+    )
+    # Gf.Quath is laid out as (x, y, z, w)
+    instancer.CreateOrientationsAttr().Set(
+        Vt.QuathArray.FromNumpy(
+            np.ascontiguousarray(
+                np.roll(orientations, -1, axis=1), dtype=np.float16
+            )
+        )
+    )
+    instancer.CreateProtoIndicesAttr().Set(
+        Vt.IntArray.FromNumpy(
+            np.ascontiguousarray(proto_indices, dtype=np.int32)
+        )
+    )
+    instancer.CreateIdsAttr().Set(
+        Vt.Int64Array.FromNumpy(np.arange(n, dtype=np.int64))
+    )
+
+    if semantic_ids is not None:
+        primvar = UsdGeom.PrimvarsAPI(instancer.GetPrim()).CreatePrimvar(
+            SEMANTIC_IDS_PRIMVAR,
+            Sdf.ValueTypeNames.IntArray,
+            UsdGeom.Tokens.vertex,
+        )
+        primvar.Set(
+            Vt.IntArray.FromNumpy(
+                np.ascontiguousarray(semantic_ids, dtype=np.int32)
+            )
+        )
+        instancer.GetPrim().CreateAttribute(
+            SEMANTIC_LABELS_ATTR, Sdf.ValueTypeNames.StringArray, custom=True
+        ).Set(list(semantic_labels or []))
+
+
+def _supported(mesh: AssetMesh) -> bool:
+    return isinstance(mesh, (DynamicMesh, USDMesh, UniversalMesh))
+
+
+def bakeable(asset: Any) -> bool:
+    """Check whether an asset can be baked, see `bake_scene`
+
+    Args:
+        asset (Any): The asset, typically a `SceneAsset` or `AssetInstanceBatch`
+
+    Returns:
+        bool: True if the asset is static and all of its meshes are supported
+    """
+    if isinstance(asset, AssetInstance):
+        return asset.asset_cfg_class is None and _supported(asset.mesh)
+    if isinstance(asset, AssetInstanceBatch):
+        return (asset.asset_cfg_class is None or asset.point_instancer) and all(
+            _supported(mesh) for mesh in asset.meshes
+        )
+    return False
+
+
+def _define(
+    layer: Sdf.Layer,
+    path: str,
+    type_name: str = "Xform",
+    specifier: Sdf.Specifier = Sdf.SpecifierDef,
+) -> Sdf.PrimSpec:
+    spec = Sdf.CreatePrimInLayer(layer, path)
+    spec.specifier = specifier
+    spec.typeName = type_name
+    return spec
+
+
+def _set(
+    spec: Sdf.PrimSpec,
+    name: str,
+    type_name: Sdf.ValueTypeName,
+    value: Any,
+    uniform: bool = False,
+    custom: bool = False,
+) -> None:
+    attr = spec.attributes.get(name)
+    if attr is None:
+        variability = (
+            Sdf.VariabilityUniform if uniform else Sdf.VariabilityVarying
+        )
+        attr = Sdf.AttributeSpec(spec, name, type_name, variability, custom)
+    attr.default = value
+
+
+def _apply_schemas(spec: Sdf.PrimSpec, *schemas: str) -> None:
+    current = spec.GetInfo("apiSchemas")
+    items = list(current.prependedItems) if current else []
+    spec.SetInfo(
+        "apiSchemas", Sdf.TokenListOp.Create(prependedItems=[*items, *schemas])
+    )
+
+
+def _bind(
+    spec: Sdf.PrimSpec, material: str, purpose: str | None = None
+) -> None:
+    name = (
+        "material:binding" if purpose is None else f"material:binding:{purpose}"
+    )
+    rel = Sdf.RelationshipSpec(spec, name, False)
+    rel.targetPathList.Prepend(Sdf.Path(material))
+    if "MaterialBindingAPI" not in spec.GetInfo("apiSchemas").prependedItems:
+        _apply_schemas(spec, "MaterialBindingAPI")
+
+
+def _set_semantics(spec: Sdf.PrimSpec, tags: Iterable[tuple[str, str]]) -> None:
+    """Author the same attributes as `apply_semantics`, without Isaac Sim"""
+    schemas: list[str] = []
+    for i, (tag, value) in enumerate(tags):
+        instance = "Semantics" if i == 0 else f"Semantics_{i}"
+        schemas.append(f"SemanticsAPI:{instance}")
+        prefix = f"semantic:{instance}:params"
+        _set(spec, f"{prefix}:semanticType", Sdf.ValueTypeNames.String, tag)
+        _set(spec, f"{prefix}:semanticData", Sdf.ValueTypeNames.String, value)
+    if schemas:
+        _apply_schemas(spec, *schemas)
+
+
+def _set_pose(
+    spec: Sdf.PrimSpec, position: Sequence[float], rotation: Sequence[float]
+) -> None:
+    _set(
+        spec,
+        "xformOp:translate",
+        Sdf.ValueTypeNames.Double3,
+        Gf.Vec3d(*map(float, position)),
+    )
+    w, x, y, z = map(float, rotation)
+    _set(spec, "xformOp:orient", Sdf.ValueTypeNames.Quatd, Gf.Quatd(w, x, y, z))
+    _set(
+        spec,
+        "xformOpOrder",
+        Sdf.ValueTypeNames.TokenArray,
+        Vt.TokenArray(["xformOp:translate", "xformOp:orient"]),
+        uniform=True,
+    )
+
+
+def set_mesh_geometry(spec: Sdf.PrimSpec, mesh: Trimesh) -> None:
+    """Write the geometry of a triangle mesh into a `Mesh` prim spec,
+    replacing the previous geometry
+
+    Args:
+        spec (Sdf.PrimSpec): The mesh prim spec
+        mesh (Trimesh): The mesh
+    """
+    vertices = np.ascontiguousarray(mesh.vertices, dtype=np.float32)
+    faces = np.ascontiguousarray(mesh.faces, dtype=np.int32)
+    _set(
+        spec,
+        "points",
+        Sdf.ValueTypeNames.Point3fArray,
+        Vt.Vec3fArray.FromNumpy(vertices),
+    )
+    _set(
+        spec,
+        "faceVertexIndices",
+        Sdf.ValueTypeNames.IntArray,
+        Vt.IntArray.FromNumpy(faces.ravel()),
+    )
+    _set(
+        spec,
+        "faceVertexCounts",
+        Sdf.ValueTypeNames.IntArray,
+        Vt.IntArray.FromNumpy(np.full(len(faces), 3, dtype=np.int32)),
+    )
+    if len(vertices):
+        _set(
+            spec,
+            "extent",
+            Sdf.ValueTypeNames.Float3Array,
+            Vt.Vec3fArray.FromNumpy(
+                np.stack([vertices.min(0), vertices.max(0)])
+            ),
+        )
+
+
+def set_collision_mesh(
+    layer: Sdf.Layer,
+    path: str,
+    mesh: Trimesh,
+    lod: CollisionLOD,
+    physics_material: str | None = None,
+) -> None:
+    """Give a mesh spawned by `create_prim_from_mesh` a collision LOD
+
+    Collisions are disabled on the full mesh, and a `collision` mesh prim
+    with the simplified geometry is added next to it, hidden from the
+    renderer and bound to the physics material of the full mesh. Calling
+    this again replaces the simplified geometry.
+
+    Args:
+        layer (Sdf.Layer): The layer to write to
+        path (str): The prim path the mesh was spawned at
+        mesh (Trimesh): The full mesh
+        lod (CollisionLOD): How to simplify the mesh
+        physics_material (str | None, optional): The path of the physics material to bind. Defaults to None, meaning the one spawned beneath the prim.
+    """
+    visual = Sdf.CreatePrimInLayer(layer, f"{path}/mesh")
+    _set(visual, "physics:collisionEnabled", Sdf.ValueTypeNames.Bool, False)
+
+    collision = f"{path}/{COLLISION_NAME}"
+    spec = layer.GetPrimAtPath(collision)
+    if spec is None:
+        spec = _define(layer, collision, "Mesh")
+        _set(spec, "purpose", Sdf.ValueTypeNames.Token, "guide", uniform=True)
+        _apply_schemas(spec, "PhysicsCollisionAPI", "PhysicsMeshCollisionAPI")
+        _set(spec, "physics:collisionEnabled", Sdf.ValueTypeNames.Bool, True)
+        _set(
+            spec,
+            "physics:approximation",
+            Sdf.ValueTypeNames.Token,
+            lod.approximation,
+            uniform=True,
+        )
+        _bind(spec, physics_material or f"{path}/physicsMaterial", "physics")
+    set_mesh_geometry(spec, lod.simplify(mesh))
+
+
+class _Baker:
+    """Writes the scene into a layer, keeping track of the prototypes"""
+
+    def __init__(self, layer: Sdf.Layer, root: str):
+        self.layer = layer
+        self.root = root
+        self.prototypes: dict[int | str, tuple[str, str | None]] = {}
+        """The prototype of each mesh, as a prim path or an asset path, by id,
+        or by `geometry_key` for dynamic meshes"""
+        self.instancers: list[tuple[str, AssetInstanceBatch, np.ndarray]] = []
+        """The point instancers to fill once the layer is composed"""
+        self.materials: set[str] = set()
+        """The paths of the shared materials written so far"""
+        _define(
+            layer, f"{root}/{PROTOTYPES_NAME}", specifier=Sdf.SpecifierClass
+        )
+        _define(layer, f"{root}/{MATERIALS_NAME}", "Scope")
+
+    def shared_material(
+        self, kind: str, content: Any, write: Callable[[str], None]
+    ) -> str:
+        """Write a material once per content, see `MaterialRegistry`"""
+        key = material_key(content)[:16]
+        path = f"{self.root}/{MATERIALS_NAME}/{kind}_{key}"
+        if path not in self.materials:
+            write(path)
+            self.materials.add(path)
+        return path
+
+    def visual_material(self, path: str, mesh: DynamicMesh, color: Any) -> None:
+        spec = _define(self.layer, path, "Material")
+        shader = _define(self.layer, f"{path}/Shader", "Shader")
+        if mesh.visual_material_path:
+            # same as `MdlFileCfg`, the material is named after the file
+            name = os.path.splitext(
+                os.path.basename(mesh.visual_material_path)
+            )[0]
+            _set(
+                shader,
+                "info:implementationSource",
+                Sdf.ValueTypeNames.Token,
+                "sourceAsset",
+                uniform=True,
+            )
+            _set(
+                shader,
+                "info:mdl:sourceAsset",
+                Sdf.ValueTypeNames.Asset,
+                mesh.visual_material_path,
+                uniform=True,
+            )
+            _set(
+                shader,
+                "info:mdl:sourceAsset:subIdentifier",
+                Sdf.ValueTypeNames.Token,
+                name,
+                uniform=True,
+            )
+            output, shader_output = "outputs:mdl:surface", "outputs:out"
+        else:
+            _set(
+                shader,
+                "info:id",
+                Sdf.ValueTypeNames.Token,
+                "UsdPreviewSurface",
+                uniform=True,
+            )
+            for key, (
+                name,
+                type_name,
+                default,
+            ) in _PREVIEW_SURFACE_INPUTS.items():
+                value = getattr(mesh.visual_material, key, default)
+                if key == "diffuse_color" and color is not None:
+                    value = color
+                _set(shader, f"inputs:{name}", type_name, value)
+            output, shader_output = "outputs:surface", "outputs:surface"
+        Sdf.AttributeSpec(shader, shader_output, Sdf.ValueTypeNames.Token)
+        attr = Sdf.AttributeSpec(spec, output, Sdf.ValueTypeNames.Token)
+        attr.connectionPathList.Prepend(
+            Sdf.Path(f"{path}/Shader.{shader_output}")
+        )
+
+    def physics_material(self, path: str, mesh: DynamicMesh) -> None:
+        spec = _define(self.layer, path, "Material")
+        _apply_schemas(spec, "PhysicsMaterialAPI")
+        for key, (name, default) in _PHYSICS_MATERIAL_ATTRS.items():
+            value = getattr(mesh.physics_material, key, default)
+            _set(spec, name, Sdf.ValueTypeNames.Float, float(value))
+
+    def dynamic_mesh(
+        self, path: str, mesh: DynamicMesh, color: Any = None
+    ) -> None:
+        """Write a mesh the way `create_prim_from_mesh` spawns it"""
+        _define(self.layer, path)
+        spec = _define(self.layer, f"{path}/mesh", "Mesh")
+        set_mesh_geometry(spec, mesh.mesh)
+        _set(
+            spec,
+            "subdivisionScheme",
+            Sdf.ValueTypeNames.Token,
+            "bilinear",
+            uniform=True,
+        )
+        _apply_schemas(spec, "PhysicsCollisionAPI")
+        _set(spec, "physics:collisionEnabled", Sdf.ValueTypeNames.Bool, True)
+
+        if mesh.share_materials:
+            visual = self.shared_material(
+                "visual",
+                (mesh.visual_material_path, mesh.visual_material, color),
+                lambda p: self.visual_material(p, mesh, color),
+            )
+            physics = self.shared_material(
+                "physics",
+                mesh.physics_material,
+                lambda p: self.physics_material(p, mesh),
+            )
+        else:
+            visual = f"{path}/visualMaterial"
+            physics = f"{path}/physicsMaterial"
+            self.visual_material(visual, mesh, color)
+            self.physics_material(physics, mesh)
+        _bind(spec, visual)
+        _bind(spec, physics, "physics")
+        if mesh.collision_lod is not None:
+            set_collision_mesh(
+                self.layer, path, mesh.mesh, mesh.collision_lod, physics
+            )
+
+    def terrain(self, terrain: TerrainInstance) -> None:
+        _define(self.layer, f"{self.root}/{TERRAIN_NAME}")
+        for name, mesh, tags in terrain.chunks():
+            path = f"{self.root}/{TERRAIN_NAME}/{name}"
+            self.dynamic_mesh(
+                path,
+                DynamicMesh(
+                    mesh, terrain.material, collision_lod=terrain.collision_lod
+                ),
+                terrain.color,
+            )
+            _set_semantics(self.layer.GetPrimAtPath(path), tags)
+
+    def prototype(self, mesh: AssetMesh) -> tuple[str, str | None]:
+        """Get the prim path or the asset path to reference for a mesh"""
+        key = geometry_key(mesh) if isinstance(mesh, DynamicMesh) else id(mesh)
+        if key in self.prototypes:
+            return self.prototypes[key]
+        if isinstance(mesh, (USDMesh, UniversalMesh)):
+            res = ("", mesh.usd_path)
+        else:
+            assert isinstance(mesh, DynamicMesh)
+            path = f"{self.root}/{PROTOTYPES_NAME}/prototype_{len(self.prototypes)}"
+            self.dynamic_mesh(path, mesh)
+            res = (path, None)
+        self.prototypes[key] = res
+        return res
+
+    def instance(
+        self,
+        path: str,
+        mesh: AssetMesh,
+        position: Sequence[float],
+        rotation: Sequence[float],
+        tags: Iterable[tuple[str, str]],
+    ) -> None:
+        prim_path, asset_path = self.prototype(mesh)
+        spec = _define(self.layer, path)
+        if asset_path is None:
+            spec.referenceList.Prepend(Sdf.Reference(primPath=prim_path))
+        else:
+            spec.referenceList.Prepend(Sdf.Reference(asset_path))
+        spec.instanceable = True
+        _set_pose(spec, position, rotation)
+        _set_semantics(spec, tags)
+
+    def batch(self, batch: AssetInstanceBatch, name: str) -> None:
+        parent = f"{self.root}/{batch.name}"
+        _define(self.layer, parent)
+        class_tags = (
+            [] if batch.asset_class is None else [(CLASS_TAG, batch.name)]
+        )
+
+        if batch.point_instancer:
+            for mesh_id, mesh in enumerate(batch.meshes):
+                if not (batch.mesh_ids == mesh_id).any():
+                    continue
+                path = f"{parent}/{name}_instancer_{mesh_id}"
+                spec = _define(self.layer, path, "PointInstancer")
+                _set_semantics(spec, class_tags)
+                _define(self.layer, f"{path}/{PROTOTYPES_NAME}")
+                self.instance(
+                    f"{path}/{PROTOTYPES_NAME}/prototype",
+                    mesh,
+                    (0.0, 0.0, 0.0),
+                    (1.0, 0.0, 0.0, 0.0),
+                    (),
+                )
+                self.instancers.append((path, batch, batch.mesh_ids == mesh_id))
+            return
+
+        for i in range(len(batch)):
+            self.instance(
+                f"{parent}/{batch.get_name(i, name)}",
+                batch.meshes[batch.mesh_ids[i]],
+                batch.positions[i],
+                batch.rotations[i],
+                [*class_tags, *batch.get_tags(i).items()],
+            )
+
+    def fill_instancers(self, stage: Usd.Stage) -> None:
+        labels: dict[int, tuple[np.ndarray, list[str]]] = {}
+        for path, batch, mask in self.instancers:
+            if id(batch) not in labels:
+                labels[id(batch)] = batch.semantic_labels()
+            set_ids, set_labels = labels[id(batch)]
+            build_point_instancer(
+                UsdGeom.PointInstancer(stage.GetPrimAtPath(path)),
+                [f"{path}/{PROTOTYPES_NAME}/prototype"],
+                batch.positions[mask],
+                batch.rotations[mask],
+                semantic_ids=set_ids[mask],
+                semantic_labels=set_labels,
+            )
+
+
+def bake_scene(
+    path: str,
+    terrain: TerrainInstance,
+    assets: Iterable[AssetInstance | AssetInstanceBatch],
+) -> None:
+    """Bake the terrain and static assets of a scene into a single USD file
+
+    The prims are laid out like `SceneCfgFactory` spawns them, under a single
+    default prim named `BAKED_NAME`. Meshes shared by multiple instances are
+    written once, and referenced by instanceable prims. Semantic tags are
+    written along with the prims, so they don't need to be applied later.
+
+    Args:
+        path (str): Path to the USD file, the format is chosen by the extension
+        terrain (TerrainInstance): The terrain of the scene
+        assets (Iterable[AssetInstance | AssetInstanceBatch]): The assets to bake
+
+    Raises:
+        ValueError: If an asset cannot be baked, see `bakeable`
+    """
+    layer = Sdf.Layer.CreateAnonymous()
+    root = f"/{BAKED_NAME}"
+
+    with Sdf.ChangeBlock():
+        _define(layer, root)
+        layer.defaultPrim = BAKED_NAME
+        layer.pseudoRoot.SetInfo(UsdGeom.Tokens.upAxis, UsdGeom.Tokens.z)
+        layer.pseudoRoot.SetInfo(UsdGeom.Tokens.metersPerUnit, 1.0)
+        baker = _Baker(layer, root)
+        baker.terrain(terrain)
+        # batches of the same name are told apart like by the factory
+        batch_names: set[str] = set()
+        for asset in assets:
+            if not bakeable(asset):
+                raise ValueError(f"Cannot bake asset {asset}")
+            if isinstance(asset, AssetInstanceBatch):
+                name = unique_name(asset.name, batch_names)
+                batch_names.add(name)
+                baker.batch(asset, name)
+                continue
+            parent = root
+            if asset.asset_class is not None:
+                parent = f"{root}/{asset.asset_class.name}"
+                if not layer.GetPrimAtPath(parent):
+                    _define(layer, parent)
+            baker.instance(
+                f"{parent}/{asset.name}",
+                asset.mesh,
+                asset.position,
+                asset.rotation,
+                asset.get_semantic_tags(),
+            )
+
+    if baker.instancers:
+        # point instancers are filled through the schema, so they need a
+        # stage, which is only composed once everything else is written
+        baker.fill_instancers(Usd.Stage.Open(layer, Usd.Stage.LoadNone))
+
+    root_name, ext = os.path.splitext(path)
+    tmp = f"{root_name}.{os.getpid()}.tmp{ext}"
+    layer.Export(tmp)
+    os.replace(tmp, path)
+
+    logger.debug(f"Baked scene to {path}")
+
+
+def scene_key(
+    terrain: TerrainInstance,
+    assets: Iterable[AssetInstance | AssetInstanceBatch],
+) -> str:
+    """Compute a key of the content of a baked scene
+
+    The key covers the meshes, poses, materials and semantic tags of the
+    terrain and the assets, so a scene generated with a different spec or
+    seed gets a different key. It's stored next to the baked file (with
+    `KEY_SUFFIX` appended to its path), see `SceneCfgFactory.bake`.
+
+    Args:
+        terrain (TerrainInstance): The terrain of the scene
+        assets (Iterable[AssetInstance | AssetInstanceBatch]): The assets to bake
+
+    Raises:
+        TypeError: If an asset can't be hashed, see `stable_hash`
+
+    Returns:
+        str: The key
+    """
+    return stable_hash(
+        {"format": BAKE_FORMAT, "terrain": terrain, "assets": list(assets)}
+    )
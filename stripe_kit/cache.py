@@ -0,0 +1,552 @@
+import json
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import asdict, fields, is_dataclass
+from enum import Enum
+from functools import partial
+from hashlib import sha256
+from importlib import import_module
+from logging import getLogger
+from types import (
+    BuiltinFunctionType,
+    FunctionType,
+    MethodType,
+    ModuleType,
+)
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+import numpy as np
+from trimesh import Trimesh
+
+if TYPE_CHECKING:
+    from .scene_spec import SceneSpec
+    from .terrain import TerrainInstance
+
+logger = getLogger(__name__)
+
+META_FILE = "terrain.json"
+FORMAT_VERSION = 1
+SCENE_ONLY_FIELDS = ("palette", "distant_light", "dome_light", "num_variants")
+"""Fields of `SceneSpec` that don't affect the generated terrain, and so are
+left out of the `TerrainCache` keys"""
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def mesh_hash(mesh: Trimesh) -> str:
+    """Compute a stable hash of the geometry of a mesh
+
+    Only the vertex and face buffers are taken into account, so two meshes
+    with identical geometry will hash identically, regardless of their
+    visuals or metadata.
+
+    Args:
+        mesh (Trimesh): The mesh to hash
+
+    Returns:
+        str: Hex digest of the mesh geometry
+    """
+    h = sha256()
+    for arr in (mesh.vertices, mesh.faces):
+        arr = np.ascontiguousarray(arr)
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.data)
+    return h.hexdigest()
+
+
+def class_path(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+class BoundedCache(Generic[K, V]):
+    """An in-memory cache, evicting the least recently used entries once it
+    holds more than `max_size` of them"""
+
+    def __init__(self, max_size: int):
+        """Create a new BoundedCache object
+
+        Args:
+            max_size (int): The maximum number of entries
+        """
+        if max_size < 1:
+            raise ValueError("The cache must hold at least one entry")
+        self.max_size = max_size
+        self._entries: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K, compute: Callable[[], V]) -> V:
+        """Get an entry, computing it on a cache miss
+
+        Args:
+            key (K): The key of the entry
+            compute (Callable[[], V]): Computes the entry
+
+        Returns:
+            V: The cached or computed entry
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        value = self._entries[key] = compute()
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Remove all the entries"""
+        self._entries.clear()
+
+
+def _canonical(obj: Any) -> Any:
+    """Convert an object into a JSON serializable, deterministic structure.
+
+    Dataclasses are traversed field by field (skipping fields declared with
+    `compare=False`), and other objects attribute by attribute (skipping
+    private attributes), using their `__getstate__` if they define one.
+    Arrays and meshes are replaced by their content hashes, path-like objects
+    by their paths, and random generators by their state. Classes and
+    functions are replaced by their qualified names, while partials and
+    bound methods are hashed along with their arguments and their object.
+
+    Raises:
+        TypeError: If an object has neither fields nor attributes, so that it
+            can't be told apart from other objects of its type
+    """
+    if obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+    if isinstance(obj, float):
+        return repr(obj)
+    if isinstance(obj, Enum):
+        return f"{class_path(type(obj))}.{obj.name}"
+    if isinstance(obj, os.PathLike):
+        return {"path": os.fspath(obj)}
+    if isinstance(obj, bytes):
+        return {"bytes": sha256(obj).hexdigest()}
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        return {
+            "ndarray": sha256(arr.data).hexdigest(),
+            "dtype": arr.dtype.str,
+            "shape": list(arr.shape),
+        }
+    if isinstance(obj, np.generic):
+        return _canonical(obj.item())
+    if isinstance(obj, Trimesh):
+        return {"trimesh": mesh_hash(obj)}
+    if isinstance(obj, np.random.Generator):
+        return {"generator": _canonical(obj.bit_generator.state)}
+    if isinstance(obj, np.random.BitGenerator):
+        return {"bit_generator": _canonical(obj.state)}
+    if isinstance(obj, np.random.SeedSequence):
+        return {
+            "seed_sequence": _canonical(
+                [obj.entropy, obj.spawn_key, obj.pool_size]
+            ),
+            "spawned": obj.n_children_spawned,
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(o) for o in obj]
+    if isinstance(obj, (set, frozenset)):
+        items = [_canonical(o) for o in obj]
+        return sorted(items, key=lambda o: json.dumps(o, sort_keys=True))
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in sorted(obj.items())}
+    if isinstance(obj, (MethodType, BuiltinFunctionType)) and not isinstance(
+        obj.__self__, (ModuleType, type(None))
+    ):
+        return {"method": obj.__name__, "self": _canonical(obj.__self__)}
+    if isinstance(obj, (type, FunctionType, BuiltinFunctionType)):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    if isinstance(obj, partial):
+        return {
+            "partial": _canonical(obj.func),
+            "args": _canonical(obj.args),
+            "keywords": _canonical(obj.keywords),
+        }
+
+    getstate = getattr(obj, "__getstate__", None)
+    state = getstate() if getstate else getattr(obj, "__dict__", None)
+    if is_dataclass(obj):
+        excluded = {f.name for f in fields(obj) if not f.compare}
+        values = {
+            f.name: getattr(obj, f.name) for f in fields(obj) if f.compare
+        }
+    elif isinstance(state, dict):
+        excluded = set()
+        values = {}
+    else:
+        raise TypeError(
+            f"{class_path(type(obj))} objects can't be hashed, they have no "
+            "fields or attributes"
+        )
+    # attributes set outside of the dataclass fields, e.g. by a custom init
+    if isinstance(state, dict):
+        for name, value in state.items():
+            if not name.startswith("_") and name not in excluded:
+                values.setdefault(name, value)
+    return {
+        "__class__": class_path(type(obj)),
+        **{name: _canonical(value) for name, value in values.items()},
+    }
+
+
+def stable_hash(obj: Any) -> str:
+    """Compute a hash of an object, that is stable across processes and runs
+
+    Args:
+        obj (Any): The object to hash, see `_canonical` for supported types
+
+    Raises:
+        TypeError: If the object, or an object within it, can't be hashed
+
+    Returns:
+        str: Hex digest of the object
+    """
+    encoded = json.dumps(_canonical(obj), sort_keys=True, separators=(",", ":"))
+    return sha256(encoded.encode()).hexdigest()
+
+
+def load_class(path: str) -> type:
+    module, qualname = path.split(":")
+    obj: Any = import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def split_terrain_fields(
+    terrain: "TerrainInstance",
+) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    """Split the fields of a terrain (apart from the meshes) into JSON
+    serializable values and NumPy arrays
+
+    Args:
+        terrain (TerrainInstance): The terrain
+
+    Raises:
+        TypeError: If a field is neither JSON serializable nor an array
+
+    Returns:
+        tuple[dict[str, Any], dict[str, np.ndarray]]: The values and the arrays, by field name
+    """
+    arrays: dict[str, np.ndarray] = {}
+    values: dict[str, Any] = {}
+    for f in fields(terrain):
+        if not f.init or f.name == "mesh":
+            continue
+        value = getattr(terrain, f.name)
+        if f.name == "collision_lod" and value is not None:
+            value = asdict(value)
+        if isinstance(value, np.ndarray):
+            arrays[f.name] = value
+            continue
+        try:
+            json.dumps(value)
+        except TypeError:
+            raise TypeError(f"field {f.name} is not serializable") from None
+        values[f.name] = value
+    return values, arrays
+
+
+def build_terrain(
+    class_path: str,
+    mesh: list[tuple[np.ndarray, np.ndarray, list[list[str]]]],
+    values: dict[str, Any],
+    arrays: dict[str, np.ndarray],
+) -> "TerrainInstance":
+    """Rebuild a terrain from its serialized parts, see `split_terrain_fields`
+
+    The meshes are built on top of the given arrays, without copying them.
+
+    Args:
+        class_path (str): The class of the terrain, as `module:qualname`
+        mesh (list[tuple[np.ndarray, np.ndarray, list[list[str]]]]): The vertices, faces and tags of each mesh
+        values (dict[str, Any]): The JSON serializable fields
+        arrays (dict[str, np.ndarray]): The array fields
+
+    Returns:
+        TerrainInstance: The terrain
+    """
+    kwargs = {**values, **arrays}
+    for name in ("origin", "size", "color"):
+        kwargs[name] = tuple(kwargs[name])
+    if kwargs.get("collision_lod") is not None:
+        from .lod import CollisionLOD
+
+        kwargs["collision_lod"] = CollisionLOD(**kwargs["collision_lod"])
+    cls = load_class(class_path)
+    return cls(
+        mesh=[
+            (
+                Trimesh(
+                    vertices=vertices,
+                    faces=faces,
+                    process=False,
+                    validate=False,
+                ),
+                [(tag, value) for tag, value in tags],
+            )
+            for vertices, faces, tags in mesh
+        ],
+        **kwargs,
+    )
+
+
+def file_hash(path: str) -> str:
+    """Compute a hash of the contents of a file
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    h = sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class MeshConversionCache:
+    """A persistent, content addressed cache of meshes converted to USD.
+
+    Entries are keyed by the contents of the source file and the converter
+    keyword arguments, thus moving or renaming the source doesn't invalidate
+    them, while editing it does. This class only manages the layout of the
+    cache, the conversion itself is done by `UniversalMesh`.
+    """
+
+    def __init__(self, directory: str, version: str = "0"):
+        """Create a new MeshConversionCache object
+
+        Args:
+            directory (str): The directory to store the converted meshes in
+            version (str, optional): User version tag, mixed into every key. Defaults to "0".
+        """
+        self.directory = directory
+        self.version = version
+        self._file_hashes: dict[tuple[str, int, int], str] = {}
+
+    def key(self, path: str, kwargs: dict[str, Any]) -> str:
+        """Compute the cache key of a conversion
+
+        Args:
+            path (str): Path to the source mesh file
+            kwargs (dict[str, Any]): The converter keyword arguments
+
+        Raises:
+            TypeError: If an argument can't be hashed, see `stable_hash`
+
+        Returns:
+            str: The cache key
+        """
+        stat = os.stat(path)
+        file_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        content = self._file_hashes.get(file_key)
+        if content is None:
+            content = self._file_hashes[file_key] = file_hash(path)
+        return stable_hash(
+            {"version": self.version, "file": content, "kwargs": kwargs}
+        )
+
+    def usd_dir(self, key: str) -> str:
+        """Get the directory of a cache entry
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            str: The directory to convert the mesh into
+        """
+        return os.path.join(self.directory, key)
+
+    def usd_path(self, key: str, path: str) -> str:
+        """Get the path of the converted USD file of a cache entry
+
+        Args:
+            key (str): The cache key
+            path (str): Path to the source mesh file
+
+        Returns:
+            str: Path to the USD file, which may not exist yet
+        """
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.usd_dir(key), f"{name}.usd")
+
+    def lookup(self, key: str, path: str) -> str | None:
+        """Look up a converted mesh
+
+        Args:
+            key (str): The cache key
+            path (str): Path to the source mesh file
+
+        Returns:
+            str | None: Path to the USD file, or None on a cache miss
+        """
+        usd_path = self.usd_path(key, path)
+        return usd_path if os.path.isfile(usd_path) else None
+
+
+class TerrainCache:
+    """A persistent, content addressed cache of generated terrains.
+
+    Each entry is a directory named after the cache key, holding the raw
+    vertex and face arrays of every terrain mesh as `.npy` files, alongside
+    a JSON file with the remaining attributes of the `TerrainInstance`. On
+    a cache hit the arrays are memory-mapped, and the meshes are rebuilt on
+    top of them without copying.
+
+    Attributes of `TerrainInstance` subclasses are stored as well, as long as
+    they are either NumPy arrays or JSON serializable. Otherwise the terrain
+    simply isn't cached.
+    """
+
+    def __init__(self, directory: str, version: str = "0", mmap: bool = True):
+        """Create a new TerrainCache object
+
+        Args:
+            directory (str): The directory to store the cache in
+            version (str, optional): User version tag, mixed into every key. Bump it whenever the generation code changes. Defaults to "0".
+            mmap (bool, optional): Whether to memory-map the cached arrays. Defaults to True.
+        """
+        self.directory = directory
+        self.version = version
+        self.mmap = mmap
+
+    def key(self, spec: "SceneSpec") -> str:
+        """Compute the cache key of a scene specification
+
+        The key covers the type of the spec, all of its attributes, including
+        the seed, and the version tag of this cache. The dataclass fields
+        declared with `compare=False` (such as the cache itself) and the
+        fields that only affect the assets and lights of the scene (see
+        `SCENE_ONLY_FIELDS`) are left out, so editing the palette keeps the
+        cached terrain.
+
+        Args:
+            spec (SceneSpec): The scene specification
+
+        Raises:
+            TypeError: If an attribute can't be hashed, see `stable_hash`
+
+        Returns:
+            str: The cache key
+        """
+        excluded = set(SCENE_ONLY_FIELDS)
+        if is_dataclass(spec):
+            excluded.update(f.name for f in fields(spec) if not f.compare)
+        state = {k: v for k, v in vars(spec).items() if k not in excluded}
+        return stable_hash(
+            {
+                "format": FORMAT_VERSION,
+                "version": self.version,
+                "class": class_path(type(spec)),
+                "state": state,
+            }
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def load(self, key: str) -> "TerrainInstance | None":
+        """Load a terrain from the cache
+
+        Args:
+            key (str): The cache key, see `key`
+
+        Returns:
+            TerrainInstance | None: The cached terrain, or None on a cache miss
+        """
+        path = self._path(key)
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.isfile(meta_path):
+            logger.debug(f"Terrain cache miss {key}")
+            return None
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        mmap_mode = "r" if self.mmap else None
+
+        def load_array(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+
+        mesh = [
+            (
+                load_array(f"mesh_{i}_vertices.npy"),
+                load_array(f"mesh_{i}_faces.npy"),
+                tags,
+            )
+            for i, tags in enumerate(meta["tags"])
+        ]
+        arrays = {
+            name: load_array(f"field_{name}.npy") for name in meta["arrays"]
+        }
+        logger.debug(f"Terrain cache hit {key}")
+        return build_terrain(meta["class"], mesh, meta["fields"], arrays)
+
+    def store(self, key: str, terrain: "TerrainInstance") -> bool:
+        """Store a terrain in the cache
+
+        The entry is written to a temporary directory first, and then moved
+        in place, so concurrent readers never see a partial entry.
+
+        Args:
+            key (str): The cache key, see `key`
+            terrain (TerrainInstance): The terrain to store
+
+        Returns:
+            bool: Whether the terrain has been stored
+        """
+        try:
+            values, arrays = split_terrain_fields(terrain)
+        except TypeError as e:
+            logger.warning(f"Not caching terrain, {e}")
+            return False
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=self.directory, prefix=".tmp_")
+        try:
+            for i, (mesh, _) in enumerate(terrain.mesh):
+                np.save(
+                    os.path.join(tmp, f"mesh_{i}_vertices.npy"),
+                    np.ascontiguousarray(mesh.vertices),
+                )
+                np.save(
+                    os.path.join(tmp, f"mesh_{i}_faces.npy"),
+                    np.ascontiguousarray(mesh.faces),
+                )
+            for name, value in arrays.items():
+                np.save(os.path.join(tmp, f"field_{name}.npy"), value)
+            with open(os.path.join(tmp, META_FILE), "w") as f:
+                json.dump(
+                    {
+                        "format": FORMAT_VERSION,
+                        "class": class_path(type(terrain)),
+                        "tags": [list(tags) for _, tags in terrain.mesh],
+                        "fields": values,
+                        "arrays": list(arrays),
+                    },
+                    f,
+                )
+            try:
+                os.replace(tmp, self._path(key))
+            except OSError:
+                # another process has stored the same entry in the meantime
+                shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        logger.debug(f"Stored terrain in cache {key}")
+        return True
+
+    def clear(self) -> None:
+        """Remove all entries from the cache"""
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,217 @@
+from dataclasses import dataclass, field, replace
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from .asset import AssetInstance, AssetInstanceBatch, SceneAsset
+from .cache import mesh_hash, stable_hash
+from .materials import material_key
+from .mesh import AssetMesh, DynamicMesh, apply_semantics, instancable
+from .profiling import profiled
+
+if TYPE_CHECKING:
+    from isaaclab.sim.spawners import SpawnerCfg
+    from pxr.Usd import Prim  # pyright: ignore[reportMissingImports]
+
+logger = getLogger(__name__)
+
+PROTOTYPES_ROOT = "/prototypes"
+
+
+def geometry_key(mesh: DynamicMesh) -> str:
+    """Compute the key under which meshes share a prototype
+
+    Besides the geometry (see `mesh_hash`), the materials (by content, see
+    `material_key`) and the collision LOD are taken into account, since a
+    prototype is spawned with them.
+
+    Args:
+        mesh (DynamicMesh): The mesh
+
+    Returns:
+        str: Hex digest of the mesh and its spawn options
+    """
+    return stable_hash(
+        [
+            mesh_hash(mesh.mesh),
+            mesh.visual_material_path,
+            material_key(mesh.visual_material),
+            material_key(mesh.physics_material),
+            mesh.collision_lod,
+            mesh.share_materials,
+        ]
+    )
+
+
+@instancable
+@dataclass
+class PrototypeMesh(DynamicMesh):
+    """A dynamic mesh spawned once, as a prototype referenced by all of its
+    prims, see `GeometryRegistry`
+
+    The prototype is spawned beneath `PROTOTYPES_ROOT`, which is a class
+    prim, so it's neither rendered nor simulated on its own. Every prim
+    references it and is made instanceable, so the geometry is held by the
+    stage once, however many prims use it. A mesh used by a single prim is
+    spawned as a plain dynamic mesh instead, see `shared`.
+    """
+
+    prototype_path: str = ""
+    """The prim path of the prototype"""
+    users: int = field(default=0, compare=False)
+    """The number of prims using the mesh, counted by `GeometryRegistry`"""
+
+    @property
+    def shared(self) -> bool:
+        """Whether the mesh is used by more than one prim, and so is spawned
+        as a prototype"""
+        return self.users > 1
+
+    def to_cfg(self, **kwargs: Any) -> "SpawnerCfg":
+        """Converts the mesh to a SpawnerCfg object, referencing the prototype
+
+        Args:
+            **kwargs: Additional keyword arguments, passed to the SpawnerCfg constructor
+
+        Returns:
+            SpawnerCfg: A SpawnerCfg object representing the mesh
+        """
+        import isaacsim.core.utils.prims as prim_utils  # pyright: ignore[reportMissingImports]
+        from isaaclab.sim.spawners import SpawnerCfg
+
+        logger.debug(f"Creating prototype mesh cfg {self.prototype_path}")
+        prototype = DynamicMesh.to_cfg(self)
+
+        @profiled("PrototypeMesh.spawn")
+        def func_wrapper(  # pyright: ignore[reportUnknownParameterType]
+            prim: str,
+            cfg: SpawnerCfg,
+            translation: Any = None,
+            orientation: Any = None,
+            **kwargs: Any,
+        ) -> "Prim":
+            if not self.shared:
+                return prototype.func(
+                    prim, cfg, translation=translation, orientation=orientation
+                )
+            p: "Prim" = prim_utils.create_prim(
+                prim, "Xform", translation=translation, orientation=orientation
+            )
+            stage = p.GetStage()
+            if not stage.GetPrimAtPath(self.prototype_path):
+                logger.debug(f"Spawning prototype {self.prototype_path}")
+                stage.CreateClassPrim(PROTOTYPES_ROOT)
+                prototype.func(self.prototype_path, prototype)
+            p.GetReferences().AddInternalReference(self.prototype_path)
+            p.SetInstanceable(True)
+            if cfg.semantic_tags is not None:
+                for tag, value in cfg.semantic_tags:
+                    apply_semantics(p, tag, value)
+            return p
+
+        return SpawnerCfg(func=func_wrapper, **kwargs)
+
+
+class GeometryRegistry:
+    """Collapses dynamic meshes with identical geometry into shared
+    prototypes
+
+    Procedural assets often draw their meshes from a small set of shapes,
+    but create a new `DynamicMesh` for each instance, which would be spawned
+    as a full mesh prim of its own. The registry hashes the vertex and face
+    buffers (see `geometry_key`), and replaces every mesh with the
+    `PrototypeMesh` of its geometry, so the stage holds each geometry once.
+    The prims using each geometry are counted, and geometry used by a
+    single prim is spawned without a prototype, see `PrototypeMesh.shared`.
+    """
+
+    def __init__(self):
+        self.prototypes: dict[str, PrototypeMesh] = {}
+        """The prototype of each geometry, by `geometry_key`"""
+        self.num_meshes = 0
+        """The number of distinct mesh objects seen"""
+        self._seen: dict[int, tuple[AssetMesh, AssetMesh]] = {}
+
+    @property
+    def duplication_ratio(self) -> float:
+        """The number of meshes seen per prototype"""
+        return self.num_meshes / max(len(self.prototypes), 1)
+
+    def dedupe(self, mesh: AssetMesh, users: int = 1) -> AssetMesh:
+        """Get the prototype of a mesh
+
+        Args:
+            mesh (AssetMesh): The mesh
+            users (int, optional): The number of prims using the mesh. Defaults to 1.
+
+        Returns:
+            AssetMesh: The prototype of a dynamic mesh, or the mesh itself if it isn't dynamic or is a prototype already
+        """
+        if not isinstance(mesh, DynamicMesh) or isinstance(mesh, PrototypeMesh):
+            return mesh
+        if id(mesh) in self._seen:
+            res = self._seen[id(mesh)][1]
+            res.users += users
+            return res
+        key = geometry_key(mesh)
+        if key not in self.prototypes:
+            self.prototypes[key] = PrototypeMesh(
+                mesh.mesh,
+                mesh.visual_material_path,
+                mesh.visual_material,
+                mesh.physics_material,
+                mesh.collision_lod,
+                mesh.share_materials,
+                prototype_path=f"{PROTOTYPES_ROOT}/mesh_{key[:16]}",
+            )
+        res = self.prototypes[key]
+        res.users += users
+        # keep the mesh alive, so that its id isn't reused
+        self._seen[id(mesh)] = (mesh, res)
+        self.num_meshes += 1
+        return res
+
+    def dedupe_batch(self, batch: AssetInstanceBatch) -> AssetInstanceBatch:
+        """Replace the meshes of a batch with their prototypes, merging the
+        entries of the mesh table that share one
+
+        Args:
+            batch (AssetInstanceBatch): The batch
+
+        Returns:
+            AssetInstanceBatch: A batch sharing the arrays of the original one
+        """
+        meshes: list[AssetMesh] = []
+        table: dict[int, int] = {}
+        mapping = np.empty(len(batch.meshes), dtype=batch.mesh_ids.dtype)
+        # a point instancer spawns each of its meshes once
+        users = (
+            np.ones(len(batch.meshes), dtype=np.int64)
+            if batch.point_instancer
+            else np.bincount(batch.mesh_ids, minlength=len(batch.meshes))
+        )
+        for i, mesh in enumerate(batch.meshes):
+            prototype = self.dedupe(mesh, int(users[i]))
+            if id(prototype) not in table:
+                table[id(prototype)] = len(meshes)
+                meshes.append(prototype)
+            mapping[i] = table[id(prototype)]
+        return replace(batch, meshes=meshes, mesh_ids=mapping[batch.mesh_ids])
+
+    def dedupe_asset(
+        self, asset: SceneAsset | AssetInstanceBatch
+    ) -> SceneAsset | AssetInstanceBatch:
+        """Replace the meshes of an asset or a batch with their prototypes
+
+        Args:
+            asset (SceneAsset | AssetInstanceBatch): The asset or the batch
+
+        Returns:
+            SceneAsset | AssetInstanceBatch: A copy using the prototypes, or the asset itself if it has no mesh
+        """
+        if isinstance(asset, AssetInstanceBatch):
+            return self.dedupe_batch(asset)
+        if isinstance(asset, AssetInstance):
+            return replace(asset, mesh=self.dedupe(asset.mesh))
+        return asset
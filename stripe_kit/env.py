@@ -1,14 +1,19 @@
 from collections.abc import Mapping
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Any
 
 import gymnasium as gym
+import torch
 from isaaclab.assets import ArticulationCfg
 from isaaclab.envs import ManagerBasedRLEnv, ManagerBasedRLEnvCfg, ViewerCfg
 from isaaclab.sensors import SensorBaseCfg
 
 from .factory import NFLInteractiveSceneCfg
+from .hotswap import ScenePregenerator
+from .profiling import profiler
 from .scene_spec import SceneSpec
+from .spawn import SpawnPoseTable
 
 
 class TaskEnvCfg(ManagerBasedRLEnvCfg):
@@ -126,9 +131,113 @@ class TrainingSpec:
 
 class NflEnvMixin(ManagerBasedRLEnv):
     def __init__(self, cfg: TaskEnvCfg, **kwargs: Any):
-        factory = cfg.spec.create_instance(cfg.scene.num_envs, cfg.scene.env_spacing)
+        with profiler.span(
+            "SceneSpec.create_instance", type(cfg.spec).__name__
+        ):
+            factory = cfg.spec.create_instance(
+                cfg.scene.num_envs, cfg.scene.env_spacing
+            )
         for name, sensor in cfg.sensors.items():
             factory.add_sensor(name, sensor)
         cfg.scene = factory.get_scene(cfg.scene.robot)
+        self.factory = factory
         self.terrain = factory.terrain
-        super().__init__(cfg, **kwargs)
+        self.pregenerator: ScenePregenerator | None = None
+        # the scene is spawned by Isaac Lab here
+        with profiler.span("ManagerBasedRLEnv.__init__"):
+            super().__init__(cfg, **kwargs)
+        factory.scene_semantics.apply()
+        origins = factory.env_origins()
+        if origins is not None:
+            # the scene has no terrain importer, so these are used as the
+            # environment origins by reset events, the attribute is private
+            # to Isaac Lab, hence setattr
+            setattr(
+                self.scene,
+                "_default_env_origins",
+                torch.as_tensor(
+                    origins, dtype=torch.float32, device=self.device
+                ),
+            )
+
+    @cached_property
+    def spawn_poses(self) -> SpawnPoseTable:
+        """The spawn poses of the robots, built on first use with the default
+        options of `SceneCfgFactory.spawn_pose_table`. Assign a table to use
+        different options, they're kept when the scene is swapped."""
+        return self.factory.spawn_pose_table().to(self.device)
+
+    def start_pregeneration(self, prefetch: int = 1, **kwargs: Any) -> None:
+        """Start generating the next scene variants in the background, to be
+        swapped in by `swap_scene`
+
+        Args:
+            prefetch (int, optional): The number of variants to generate ahead. Defaults to 1.
+            **kwargs (Any): Additional arguments of `ScenePregenerator`, like `mp_context`
+        """
+        if self.pregenerator is None:
+            self.pregenerator = ScenePregenerator(
+                self.cfg.spec,  # pyright: ignore[reportAttributeAccessIssue]
+                prefetch,
+                **kwargs,
+            )
+
+    def swap_scene(self, block: bool = False) -> bool:
+        """Swap in the next pregenerated scene variant, see
+        `SceneCfgFactory.swap`
+
+        Meant to be called at a reset boundary, like between rollouts, as
+        the robots aren't moved. Unless `block` is set, nothing happens if
+        the variant isn't ready yet, so the simulation never waits for the
+        generation.
+
+        Args:
+            block (bool, optional): Whether to wait for the variant. Defaults to False.
+
+        Raises:
+            ValueError: If `start_pregeneration` wasn't called
+
+        Returns:
+            bool: Whether the scene was swapped
+        """
+        if self.pregenerator is None:
+            raise ValueError("Call start_pregeneration first")
+        scene = self.pregenerator.take(block)
+        if scene is None:
+            return False
+        self.factory.swap(self.sim.stage, *scene)
+        self.terrain = self.factory.terrain
+        # the spawn poses of the old scene are no longer valid, rebuild them
+        # with the same options
+        table: SpawnPoseTable | None = self.__dict__.get("spawn_poses")
+        if table is not None:
+            self.spawn_poses = self.factory.spawn_pose_table(
+                table.random_yaw, table.seed, **table.spawn_options
+            ).to(table.device or self.device)
+        return True
+
+    def close(self) -> None:
+        if self.pregenerator is not None:
+            self.pregenerator.close()
+        super().close()
+
+
+def reset_root_state_from_table(
+    env: NflEnvMixin, env_ids: torch.Tensor, asset_name: str = "robot"
+) -> None:
+    """Reset event term, that moves the robots to poses sampled from
+    `NflEnvMixin.spawn_poses`, at rest
+
+    Args:
+        env (NflEnvMixin): The environment
+        env_ids (torch.Tensor): The environments to reset
+        asset_name (str, optional): The name of the robot in the scene. Defaults to "robot".
+    """
+    asset = env.scene[asset_name]
+    positions, rotations = env.spawn_poses.sample_spawn_poses(env_ids)
+    asset.write_root_pose_to_sim(
+        torch.cat([positions, rotations], dim=-1), env_ids=env_ids
+    )
+    asset.write_root_velocity_to_sim(
+        torch.zeros((len(env_ids), 6), device=env.device), env_ids=env_ids
+    )
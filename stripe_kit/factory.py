@@ -1,15 +1,31 @@
+import os
+from collections.abc import Callable
 from copy import deepcopy
 from dataclasses import MISSING
 from logging import getLogger
+from math import ceil, sqrt
+
+import numpy as np
 
 # isaaclab imports
 from isaaclab.assets import AssetBaseCfg
 from isaaclab.scene import InteractiveSceneCfg
 from isaaclab.sensors import SensorBaseCfg
+from isaaclab.sim.spawners import UsdFileCfg
 from isaaclab.utils import configclass
+from pxr import Usd  # pyright: ignore[reportMissingImports]
 
-from .asset import SceneAsset
+from .asset import AssetInstance, AssetInstanceBatch, SceneAsset, unique_name
+from .bake import BAKED_NAME, KEY_SUFFIX, bake_scene, bakeable, scene_key
+from .dedup import GeometryRegistry
+from .hotswap import swap_scene
+from .profiling import profiler
+from .proxy import proxy_assets
+from .semantics import SemanticTable
+from .spawn import SpawnPoseTable, spawn_positions
+from .stats import SceneBudget, SceneStats, describe_exceeded, scene_stats
 from .terrain import TERRAIN_NAME, TerrainInstance
+from .tiling import TerrainPool
 
 logger = getLogger(__name__)
 
@@ -28,6 +44,9 @@ class SceneCfgFactory:
     """
 
     robot_name: str = "robot"
+    dedupe_geometry: bool = True
+    """Whether dynamic meshes with identical geometry are spawned as a
+    shared prototype, see `GeometryRegistry`"""
 
     def __init__(
         self,
@@ -49,21 +68,69 @@ class SceneCfgFactory:
         self.terrain = terrain
 
         self.assets: dict[str, AssetBaseCfg] = {}
+        self.batches: dict[str, AssetInstanceBatch] = {}
+        self.sources: dict[str, SceneAsset] = {}
+        """The objects the cfgs in `assets` were created from"""
         self.sensors: dict[str, SensorBaseCfg] = {}
 
-    def add_asset(self, asset: SceneAsset) -> None:
+        self.semantics = SemanticTable()
+        """Semantic tags of the assets in `assets`"""
+        self.scene_semantics = SemanticTable()
+        """Semantic tags of the last scene created by `get_scene`, to be
+        applied once the scene has been spawned"""
+        self.baked_usd: str | None = None
+        """Path to the USD file the static part of the scene was baked into,
+        see `bake`"""
+        self.spawned_batches: dict[str, AssetInstanceBatch] | None = None
+        """The batches the spawned prims were created from, kept once the
+        scene is swapped, see `swap`"""
+        self.geometry = GeometryRegistry()
+        """The prototypes of the dynamic meshes of the added assets"""
+
+    def add_asset(self, asset: SceneAsset | AssetInstanceBatch) -> None:
         """Add an AssetInstance object to the factory
 
         Args:
-            asset (AssetInstance): The AssetInstance object to add
+            asset (SceneAsset | AssetInstanceBatch): The AssetInstance object, or a batch of them to add
 
         Raises:
             ValueError: If an asset with the same name already exists
         """
-        self.assets[asset.get_name()] = asset.to_cfg()
+        if isinstance(asset, AssetInstanceBatch):
+            self.add_batch(asset)
+            return
+        if self.dedupe_geometry:
+            asset = self.geometry.dedupe_asset(asset)
+
+        self.sources[asset.get_name()] = asset
+        if isinstance(asset, AssetInstance):
+            label = (
+                None if asset.asset_class is None else asset.asset_class.name
+            )
+            with profiler.span("AssetInstance.to_cfg", label):
+                self.assets[asset.get_name()] = asset.to_cfg(self.semantics)
+        else:
+            self.assets[asset.get_name()] = asset.to_cfg()
 
         logger.debug(f"Added asset {asset.get_name()}")
 
+    def add_batch(self, batch: AssetInstanceBatch) -> None:
+        """Add a batch of asset instances to the factory
+
+        The batch is stored as is (apart from deduplicating its meshes), the
+        individual asset configurations are only created once the scene is
+        requested.
+
+        Args:
+            batch (AssetInstanceBatch): The batch to add
+        """
+        if self.dedupe_geometry:
+            batch = self.geometry.dedupe_batch(batch)
+        name = unique_name(batch.name, self.batches)
+        self.batches[name] = batch
+
+        logger.debug(f"Added batch {name} of {len(batch)} assets")
+
     def add_sensor(self, name: str, sensor: SensorBaseCfg) -> None:
         """Add sensors to the scene
 
@@ -73,6 +140,292 @@ class SceneCfgFactory:
         """
         self.sensors[name] = sensor
 
+    def save(self, path: str) -> None:
+        """Save the generated scene to a manifest file, see `load_scene`
+
+        Sensors and assets added as cfgs aren't saved.
+
+        Args:
+            path (str): Path to the manifest file
+        """
+        from .manifest import save_scene
+
+        instances = [
+            a for a in self.sources.values() if isinstance(a, AssetInstance)
+        ]
+        lights = [
+            a for a in self.sources.values() if not isinstance(a, AssetInstance)
+        ]
+        save_scene(
+            path,
+            self.terrain,
+            [*instances, *self.batches.values()],
+            lights,
+        )
+
+    def bake(self, path: str, reuse: bool = False) -> None:
+        """Bake the terrain and the static assets into a single USD file
+
+        Afterwards, `get_scene` spawns the baked file as a single asset,
+        instead of a spawner per asset and terrain mesh. Assets that can't be
+        baked (see `bakeable`), lights and sensors are still spawned
+        separately.
+
+        Args:
+            path (str): Path to the USD file, like `scene.usdc`
+            reuse (bool, optional): Whether to use the file as is if it was baked from the same scene, for example by a previous run, see `scene_key`. Defaults to False.
+        """
+        assets = [
+            *(a for a in self.sources.values() if bakeable(a)),
+            *(b for b in self.batches.values() if bakeable(b)),
+        ]
+        key = None
+        if reuse:
+            try:
+                key = scene_key(self.terrain, assets)
+            except TypeError as e:
+                logger.warning(f"Not reusing the baked scene {path}: {e}")
+        if key is not None and _read_key(path + KEY_SUFFIX) == key:
+            logger.debug(f"Reusing baked scene {path}")
+        else:
+            with profiler.span("bake_scene"):
+                bake_scene(path, self.terrain, assets)
+            if key is not None:
+                with open(path + KEY_SUFFIX, "w") as f:
+                    f.write(key)
+        self.baked_usd = path
+
+    def swap(
+        self,
+        stage: Usd.Stage,
+        terrain: TerrainInstance,
+        assets: list[AssetInstance | AssetInstanceBatch],
+    ) -> None:
+        """Replace the spawned scene with another one generated from the same
+        spec, in place, see `swap_scene`
+
+        Args:
+            stage (Usd.Stage): The stage the scene was spawned on
+            terrain (TerrainInstance): The new terrain
+            assets (list[AssetInstance | AssetInstanceBatch]): The new assets
+        """
+        if self.dedupe_geometry:
+            assets = [self.geometry.dedupe_asset(a) for a in assets]
+        swap_scene(stage, self, terrain, assets)
+
+    def scene_assets(self) -> list[SceneAsset | AssetInstanceBatch]:
+        """Get the assets and batches added to the factory
+
+        Returns:
+            list[SceneAsset | AssetInstanceBatch]: The assets, followed by the batches
+        """
+        return [*self.sources.values(), *self.batches.values()]
+
+    def stats(self) -> SceneStats:
+        """Compute the stats of the scene, without creating any
+        configuration, see `scene_stats`
+
+        Returns:
+            SceneStats: The stats
+        """
+        return scene_stats([self.terrain], self.scene_assets())
+
+    def map_assets(
+        self,
+        func: Callable[
+            [SceneAsset | AssetInstanceBatch],
+            SceneAsset | AssetInstanceBatch | None,
+        ],
+    ) -> None:
+        """Replace the assets and batches added to the factory, adding them
+        anew
+
+        Args:
+            func (Callable[[SceneAsset | AssetInstanceBatch], SceneAsset | AssetInstanceBatch | None]): Maps each asset to its replacement, or None to drop it
+        """
+        assets = [*self.sources.values(), *self.batches.values()]
+        self.assets = {}
+        self.batches = {}
+        self.sources = {}
+        self.semantics = SemanticTable()
+        for asset in assets:
+            replacement = func(asset)
+            if replacement is not None:
+                self.add_asset(replacement)
+
+    def apply_budget(self, budget: SceneBudget) -> SceneStats:
+        """Check the scene against a budget, before anything is spawned
+
+        If the scene exceeds the budget, it's handled according to
+        `SceneBudget.policy`. When degrading, the meshes of the asset
+        specifications are replaced with proxies, and then whole
+        specifications are dropped, lowest `AssetSpec.priority` first (and
+        the last added first among equal priorities), until the scene fits.
+
+        Args:
+            budget (SceneBudget): The budget
+
+        Raises:
+            ValueError: If the scene exceeds the budget under the `raise` policy, or still exceeds it after degrading
+
+        Returns:
+            SceneStats: The stats of the scene, after degrading
+        """
+        stats = self.stats()
+        logger.info(f"Scene stats:\n{stats.report()}")
+        exceeded = budget.exceeded(stats)
+        if not exceeded:
+            return stats
+        message = f"Scene exceeds its budget: {describe_exceeded(exceeded)}"
+        if budget.policy == "warn":
+            logger.warning(message)
+            return stats
+        if budget.policy == "raise":
+            raise ValueError(message)
+
+        specs: dict[str, int] = {}
+        for asset in self.scene_assets():
+            spec = getattr(asset, "asset_class", None)
+            if spec is not None:
+                specs[spec.name] = spec.priority
+        order = sorted(reversed(specs), key=lambda name: specs[name])
+
+        if budget.proxy is not None:
+            proxy = proxy_assets(budget.proxy)
+            for name in order:
+                if not {"triangles", "vertex_memory"} & exceeded.keys():
+                    break
+                logger.warning(f"{message}, replacing {name} with proxies")
+                self.map_assets(
+                    lambda a: proxy(a) if _spec_name(a) == name else a
+                )
+                stats = self.stats()
+                exceeded = budget.exceeded(stats)
+                if not exceeded:
+                    return stats
+                message = (
+                    f"Scene exceeds its budget: {describe_exceeded(exceeded)}"
+                )
+
+        for name in order:
+            logger.warning(f"{message}, dropping {name}")
+            self.map_assets(lambda a: None if _spec_name(a) == name else a)
+            stats = self.stats()
+            exceeded = budget.exceeded(stats)
+            if not exceeded:
+                return stats
+            message = f"Scene exceeds its budget: {describe_exceeded(exceeded)}"
+        raise ValueError(f"{message}, even without any assets")
+
+    def asset_cfgs(
+        self, semantics: SemanticTable | None = None
+    ) -> dict[str, AssetBaseCfg]:
+        """Get the configurations of all assets to be placed in the scene
+
+        Args:
+            semantics (SemanticTable | None, optional): The table to record the semantic tags of the assets in. Defaults to None.
+
+        Returns:
+            dict[str, AssetBaseCfg]: The asset configurations, by name
+        """
+        if self.baked_usd is not None:
+            return self._unbaked_asset_cfgs(semantics)
+        res = dict(self.assets)
+        if semantics is not None:
+            semantics.extend(self.semantics)
+        for name, batch in self.batches.items():
+            with profiler.span(
+                "AssetInstanceBatch.to_cfgs", name, instances=len(batch)
+            ):
+                res.update(batch.to_cfgs(semantics, name))
+        return res
+
+    def _unbaked_asset_cfgs(
+        self, semantics: SemanticTable | None
+    ) -> dict[str, AssetBaseCfg]:
+        res: dict[str, AssetBaseCfg] = {}
+        for name, cfg in self.assets.items():
+            source = self.sources.get(name)
+            if bakeable(source):
+                continue
+            res[name] = cfg
+            if semantics is not None and isinstance(source, AssetInstance):
+                semantics.add(cfg.prim_path, source.get_semantic_tags())
+        for name, batch in self.batches.items():
+            if not bakeable(batch):
+                res.update(batch.to_cfgs(semantics, name))
+        return res
+
+    def terrain_cfgs(self) -> dict[str, AssetBaseCfg]:
+        """Get the configurations of the terrain meshes, or of the baked
+        scene, if the scene was baked
+
+        Returns:
+            dict[str, AssetBaseCfg]: The terrain configurations, by name
+        """
+        if self.baked_usd is not None:
+            cfg = AssetBaseCfg(
+                prim_path=f"/{BAKED_NAME}",
+                spawn=UsdFileCfg(usd_path=self.baked_usd),
+            )
+            cfg.init_state = cfg.InitialStateCfg()
+            cfg.collision_group = -1
+            return {BAKED_NAME: cfg}
+        return {
+            asset.prim_path.rsplit("/", 1)[1]: asset
+            for asset in self.terrain.to_asset_cfg()
+        }
+
+    def env_origins(self) -> np.ndarray | None:
+        """Get the origins of the environments, if they are predetermined by
+        the scene layout rather than the Isaac Lab environment grid
+
+        Returns:
+            np.ndarray | None: An array of shape (num_envs, 3), or None
+        """
+        return None
+
+    def spawn_positions(self, **kwargs: float) -> np.ndarray:
+        """Find the positions, where robots may spawn, clear of the assets
+        added to the factory
+
+        Args:
+            **kwargs (float): Options passed to `spawn_positions`, like `max_slope` or `clearance`
+
+        Returns:
+            np.ndarray: The positions in the world frame, of shape (N, 3), the terrain origin if there are none
+        """
+        positions = spawn_positions(
+            self.terrain,
+            [*self.sources.values(), *self.batches.values()],
+            **kwargs,
+        )
+        if len(positions) == 0:
+            logger.warning("No valid spawn positions, using the terrain origin")
+            positions = np.array([self.terrain.origin])
+        return positions
+
+    def spawn_pose_table(
+        self, random_yaw: bool = True, seed: int | None = None, **kwargs: float
+    ) -> SpawnPoseTable:
+        """Create a table of spawn poses for the environments, see
+        `SpawnPoseTable`
+
+        Args:
+            random_yaw (bool, optional): Whether to rotate the robots randomly around the up axis. Defaults to True.
+            seed (int | None, optional): The seed of the sampling. Defaults to None.
+            **kwargs (float): Options passed to `spawn_positions`
+
+        Returns:
+            SpawnPoseTable: The table, with all environments sharing the positions
+        """
+        return SpawnPoseTable(
+            [self.spawn_positions(**kwargs)],
+            random_yaw=random_yaw,
+            seed=seed,
+            spawn_options=kwargs,
+        )
+
     def get_scene(
         self,
         robot: AssetBaseCfg,
@@ -83,33 +436,365 @@ class SceneCfgFactory:
             NFLInteractiveSceneCfg: Shallow copy of the NFLInteractiveSceneCfg object
         """
         logger.debug("Creating scene cfg")
-        robot = deepcopy(robot)
-        robot.prim_path = "{ENV_REGEX_NS}/robot"
-        robot.init_state.pos = self.terrain.origin
+        with profiler.span("SceneCfgFactory.get_scene", type(self).__name__):
+            with profiler.span("SceneCfgFactory.get_scene.deepcopy"):
+                robot = deepcopy(robot)
+            robot.prim_path = "{ENV_REGEX_NS}/robot"
+            robot.init_state.pos = self.terrain.origin
+
+            cfg = NFLInteractiveSceneCfg(
+                self.num_envs, self.env_spacing, robot=robot, **self.kwargs
+            )
+
+            self.scene_semantics = SemanticTable()
+            for name, asset in self.asset_cfgs(self.scene_semantics).items():
+                setattr(
+                    cfg,
+                    name,
+                    asset,
+                )
+
+            for name, sensor in self.sensors.items():
+                setattr(
+                    cfg,
+                    name,
+                    sensor,
+                )
+
+            for name, asset in self.terrain_cfgs().items():
+                setattr(
+                    cfg,
+                    name,
+                    asset,
+                )
+
+        return cfg
+
+
+class VariantSceneCfgFactory(SceneCfgFactory):
+    """A factory of a scene, that consists of multiple independent variants.
+
+    The variants are laid out on a square grid, and the environments are
+    assigned to them in a round-robin fashion. Assets added directly to this
+    factory (like lights) are shared by all variants. The `terrain` attribute
+    points to the terrain of the first variant.
+    """
+
+    def __init__(
+        self,
+        variants: list[SceneCfgFactory],
+        num_envs: int = 1,
+        env_spacing: float = 0.0,
+        variant_spacing: float = 0.0,
+        **kwargs: bool,
+    ):
+        """Create a new VariantSceneCfgFactory object
 
-        cfg = NFLInteractiveSceneCfg(
-            self.num_envs, self.env_spacing, robot=robot, **self.kwargs
+        Args:
+            variants (list[SceneCfgFactory]): The factories of the variants
+            num_envs (int): The number of environments to create
+            env_spacing (float): The spacing between environments
+            variant_spacing (float): Additional spacing between the variants on the grid
+        """
+        if not variants:
+            raise ValueError("At least one variant is required")
+        super().__init__(variants[0].terrain, num_envs, env_spacing, **kwargs)
+        self.variants = variants
+        self.next_swap = 0
+        """The index of the variant to be replaced by `swap`"""
+
+        cols = ceil(sqrt(len(variants)))
+        pitch_x = max(v.terrain.size[0] for v in variants) + variant_spacing
+        pitch_y = max(v.terrain.size[1] for v in variants) + variant_spacing
+        self.offsets: list[tuple[float, float, float]] = [
+            ((k % cols) * pitch_x, (k // cols) * pitch_y, 0.0)
+            for k in range(len(variants))
+        ]
+
+    def save(self, path: str) -> None:
+        raise ValueError(
+            "Scenes with multiple variants cannot be saved, save the variants"
         )
 
-        for name, asset in self.assets.items():
-            setattr(
-                cfg,
-                name,
-                asset,
-            )
+    def bake(self, path: str, reuse: bool = False) -> None:
+        """Bake each of the variants into its own USD file, see
+        `SceneCfgFactory.bake`
 
-        for name, sensor in self.sensors.items():
-            setattr(
-                cfg,
-                name,
-                sensor,
-            )
+        Args:
+            path (str): Path to the USD file, the index of the variant is appended to the name
+            reuse (bool, optional): Whether to use the files as is if they were baked from the same variants. Defaults to False.
+        """
+        root, ext = os.path.splitext(path)
+        for k, variant in enumerate(self.variants):
+            variant.bake(f"{root}_{k}{ext}", reuse)
 
-        for i, asset in enumerate(self.terrain.to_asset_cfg()):
-            setattr(
-                cfg,
-                TERRAIN_NAME + f"_{i}",
-                asset,
-            )
+    def swap(
+        self,
+        stage: Usd.Stage,
+        terrain: TerrainInstance,
+        assets: list[AssetInstance | AssetInstanceBatch],
+    ) -> None:
+        """Replace one of the variants with another one, in place
+
+        The variants are replaced in turn, starting with the first one, so
+        the environments of the other variants are left untouched.
+
+        Args:
+            stage (Usd.Stage): The stage the scene was spawned on
+            terrain (TerrainInstance): The new terrain
+            assets (list[AssetInstance | AssetInstanceBatch]): The new assets
+        """
+        k = self.next_swap
+        variant = self.variants[k]
+        if variant.dedupe_geometry:
+            assets = [variant.geometry.dedupe_asset(a) for a in assets]
+        swap_scene(
+            stage,
+            variant,
+            terrain,
+            assets,
+            f"/variant_{k}",
+            self.offsets[k],
+        )
+        if k == 0:
+            self.terrain = terrain
+        self.next_swap = (k + 1) % len(self.variants)
+
+    def scene_assets(self) -> list[SceneAsset | AssetInstanceBatch]:
+        """Get the assets and batches added to the factory, and to the
+        variants
+
+        Returns:
+            list[SceneAsset | AssetInstanceBatch]: The assets of this factory, followed by those of each variant
+        """
+        return [
+            *super().scene_assets(),
+            *(a for variant in self.variants for a in variant.scene_assets()),
+        ]
+
+    def stats(self) -> SceneStats:
+        return scene_stats(
+            [variant.terrain for variant in self.variants],
+            self.scene_assets(),
+        )
+
+    def map_assets(
+        self,
+        func: Callable[
+            [SceneAsset | AssetInstanceBatch],
+            SceneAsset | AssetInstanceBatch | None,
+        ],
+    ) -> None:
+        super().map_assets(func)
+        for variant in self.variants:
+            variant.map_assets(func)
+
+    def env_variants(self) -> np.ndarray:
+        """Get the index of the variant each environment is assigned to
+
+        Returns:
+            np.ndarray: An integer array of shape (num_envs,)
+        """
+        return np.arange(self.num_envs) % len(self.variants)
+
+    def env_origins(self) -> np.ndarray:
+        """Get the origins of the environments, which are the origins of the
+        terrains of their variants, offset by the variant's grid position
+
+        Returns:
+            np.ndarray: An array of shape (num_envs, 3)
+        """
+        origins = np.array(
+            [
+                np.add(offset, variant.terrain.origin)
+                for offset, variant in zip(self.offsets, self.variants)
+            ],
+            dtype=np.float32,
+        )
+        return origins[self.env_variants()]
+
+    def spawn_pose_table(
+        self, random_yaw: bool = True, seed: int | None = None, **kwargs: float
+    ) -> SpawnPoseTable:
+        """Create a table of spawn poses, where each environment samples from
+        the positions of its variant, see `env_variants`
+
+        Args:
+            random_yaw (bool, optional): Whether to rotate the robots randomly around the up axis. Defaults to True.
+            seed (int | None, optional): The seed of the sampling. Defaults to None.
+            **kwargs (float): Options passed to `spawn_positions`
+
+        Returns:
+            SpawnPoseTable: The table, with a group per variant
+        """
+        groups = [
+            variant.spawn_positions(**kwargs) + offset
+            for offset, variant in zip(self.offsets, self.variants)
+        ]
+        return SpawnPoseTable(
+            groups, self.env_variants(), random_yaw, seed, kwargs
+        )
+
+    def asset_cfgs(
+        self, semantics: SemanticTable | None = None
+    ) -> dict[str, AssetBaseCfg]:
+        res = super().asset_cfgs(semantics)
+        for k, (offset, variant) in enumerate(zip(self.offsets, self.variants)):
+            prefix = f"variant_{k}"
+            variant_semantics = SemanticTable()
+            for name, asset in variant.asset_cfgs(variant_semantics).items():
+                res[f"{prefix}_{name}"] = _offset(asset, prefix, offset)
+            if semantics is not None:
+                semantics.extend(variant_semantics, f"/{prefix}")
+        return res
+
+    def terrain_cfgs(self) -> dict[str, AssetBaseCfg]:
+        res: dict[str, AssetBaseCfg] = {}
+        for k, (offset, variant) in enumerate(zip(self.offsets, self.variants)):
+            prefix = f"variant_{k}"
+            for name, asset in variant.terrain_cfgs().items():
+                res[f"{prefix}_{name}"] = _offset(asset, prefix, offset)
+        return res
+
+    def get_scene(
+        self,
+        robot: AssetBaseCfg,
+    ) -> NFLInteractiveSceneCfg:
+        """Gets the scene configuration
+
+        The robot is placed at the origin of its environment, see
+        `env_origins`, thus it's up to the environment to apply them.
 
+        Returns:
+            NFLInteractiveSceneCfg: Shallow copy of the NFLInteractiveSceneCfg object
+        """
+        cfg = super().get_scene(robot)
+        cfg.robot.init_state.pos = (0.0, 0.0, 0.0)
+        return cfg
+
+
+class TiledSceneCfgFactory(SceneCfgFactory):
+    """A factory of a scene, where the terrains of a `TerrainPool` are
+    tiled by an Isaac Lab terrain importer.
+
+    The environment origins are the origins of the tiles, managed by the
+    terrain importer, which also moves the environments between the
+    difficulty levels when a terrain curriculum is used. Assets added to this
+    factory (like lights) are placed once, in the world frame. The `terrain`
+    attribute points to the first terrain of the pool.
+    """
+
+    def __init__(
+        self,
+        pool: TerrainPool,
+        num_rows: int,
+        num_cols: int,
+        num_envs: int = 1,
+        env_spacing: float = 0.0,
+        curriculum: bool = True,
+        max_init_terrain_level: int | None = None,
+        **kwargs: bool,
+    ):
+        """Create a new TiledSceneCfgFactory object
+
+        Args:
+            pool (TerrainPool): The terrains to tile
+            num_rows (int): The number of rows of tiles, which are the difficulty levels
+            num_cols (int): The number of columns of tiles
+            num_envs (int): The number of environments to create
+            env_spacing (float): The spacing between environments
+            curriculum (bool, optional): Whether the rows are ordered by difficulty. Defaults to True.
+            max_init_terrain_level (int | None, optional): The highest level the environments start at. Defaults to None, meaning any level.
+        """
+        super().__init__(pool.terrains[0], num_envs, env_spacing, **kwargs)
+        self.pool = pool
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.curriculum = curriculum
+        self.max_init_terrain_level = max_init_terrain_level
+
+    def save(self, path: str) -> None:
+        raise ValueError("Tiled scenes cannot be saved, save the pool terrains")
+
+    def bake(self, path: str, reuse: bool = False) -> None:
+        raise ValueError("Tiled scenes cannot be baked")
+
+    def swap(
+        self,
+        stage: Usd.Stage,
+        terrain: TerrainInstance,
+        assets: list[AssetInstance | AssetInstanceBatch],
+    ) -> None:
+        raise ValueError("Tiled scenes cannot be swapped")
+
+    def spawn_pose_table(
+        self, random_yaw: bool = True, seed: int | None = None, **kwargs: float
+    ) -> SpawnPoseTable:
+        raise ValueError(
+            "The environments of tiled scenes move between the tiles, "
+            "use the reset events of Isaac Lab instead"
+        )
+
+    def terrain_cfgs(self) -> dict[str, AssetBaseCfg]:
+        """Get the configuration of the terrain importer of the tiles
+
+        Returns:
+            dict[str, AssetBaseCfg]: The terrain importer configuration, by name
+        """
+        from isaaclab.sim.spawners import PreviewSurfaceCfg
+        from isaaclab.terrains import TerrainImporterCfg
+
+        cfg = TerrainImporterCfg(
+            prim_path=f"/{TERRAIN_NAME}",
+            terrain_type="generator",
+            terrain_generator=self.pool.to_cfg(
+                self.num_rows, self.num_cols, self.curriculum
+            ),
+            max_init_terrain_level=self.max_init_terrain_level,
+            visual_material=PreviewSurfaceCfg(diffuse_color=self.terrain.color),
+            collision_group=-1,
+        )
+        return {TERRAIN_NAME: cfg}
+
+    def get_scene(
+        self,
+        robot: AssetBaseCfg,
+    ) -> NFLInteractiveSceneCfg:
+        """Gets the scene configuration
+
+        The robot is placed at the origin of its tile, applied by the
+        terrain importer.
+
+        Returns:
+            NFLInteractiveSceneCfg: Shallow copy of the NFLInteractiveSceneCfg object
+        """
+        cfg = super().get_scene(robot)
+        cfg.robot.init_state.pos = (0.0, 0.0, 0.0)
         return cfg
+
+
+def _read_key(path: str) -> str | None:
+    """Read the key of a baked scene, None if there's none"""
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return f.read().strip()
+
+
+def _spec_name(asset: SceneAsset | AssetInstanceBatch) -> str | None:
+    """Get the name of the asset specification of an asset, if it has one"""
+    spec = getattr(asset, "asset_class", None)
+    return None if spec is None else spec.name
+
+
+def _offset(
+    cfg: AssetBaseCfg, prefix: str, offset: tuple[float, float, float]
+) -> AssetBaseCfg:
+    """Create a copy of the asset cfg, moved under a prefix and by an offset"""
+    pos = cfg.init_state.pos
+    init_state = cfg.init_state.replace(
+        pos=(pos[0] + offset[0], pos[1] + offset[1], pos[2] + offset[2])
+    )
+    return cfg.replace(
+        prim_path=f"/{prefix}{cfg.prim_path}", init_state=init_state
+    )
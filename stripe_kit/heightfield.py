@@ -0,0 +1,177 @@
+from dataclasses import dataclass
+from logging import getLogger
+
+import numpy as np
+from trimesh import Trimesh
+
+from .terrain import TerrainInstance
+
+logger = getLogger(__name__)
+
+
+def heights_to_mesh(heights: np.ndarray, size: tuple[float, float]) -> Trimesh:
+    """Triangulate a height grid, spanning `[0, size[0]] x [0, size[1]]`
+
+    Each grid cell is split into two triangles, facing up.
+
+    Args:
+        heights (np.ndarray): The heights, of shape (rows, cols), rows along the y axis
+        size (tuple[float, float]): The size of the grid in meters
+
+    Returns:
+        Trimesh: The mesh, with a vertex per grid point
+    """
+    rows, cols = heights.shape
+    x = np.linspace(0.0, size[0], cols)
+    y = np.linspace(0.0, size[1], rows)
+    xx, yy = np.meshgrid(x, y)
+    vertices = np.stack([xx, yy, heights], axis=-1).reshape(-1, 3)
+
+    a = (np.arange(rows - 1)[:, None] * cols + np.arange(cols - 1)).ravel()
+    b = a + 1
+    c = a + cols
+    d = c + 1
+    faces = np.concatenate(
+        [np.stack([a, b, d], axis=1), np.stack([a, d, c], axis=1)]
+    )
+    return Trimesh(vertices=vertices, faces=faces, process=False)
+
+
+@dataclass(kw_only=True)
+class HeightfieldTerrain(TerrainInstance):
+    """A terrain defined by a regular grid of heights.
+
+    The grid spans `[0, size[0]] x [0, size[1]]`, with the rows along the y
+    axis. Apart from the meshes, the grid itself is kept, so the terrain can
+    be queried for many points at once with a few array operations, instead
+    of raycasting against the meshes. The queries interpolate the grid
+    bilinearly, which may slightly differ from the triangulated meshes within
+    a cell.
+    """
+
+    heights: np.ndarray
+    """The heights of the grid points, of shape (rows, cols)"""
+
+    @classmethod
+    def from_heights(
+        cls,
+        heights: np.ndarray,
+        size: tuple[float, float],
+        color: tuple[float, float, float],
+        tags: list[tuple[str, str]] | None = None,
+        origin: tuple[float, float, float] | None = None,
+        material: str | None = None,
+    ) -> "HeightfieldTerrain":
+        """Create a terrain from a height grid, deriving the mesh from it
+
+        Args:
+            heights (np.ndarray): The heights, of shape (rows, cols)
+            size (tuple[float, float]): The size of the terrain in meters
+            color (tuple[float, float, float]): The color of the terrain
+            tags (list[tuple[str, str]] | None, optional): The semantic tags of the mesh. Defaults to None.
+            origin (tuple[float, float, float] | None, optional): The position where the robot should spawn. Defaults to None, meaning the center of the terrain.
+            material (str | None, optional): Path to the material mdl file. Defaults to None.
+
+        Raises:
+            ValueError: If the heights aren't a grid of at least 2x2 points
+
+        Returns:
+            HeightfieldTerrain: The terrain
+        """
+        heights = np.asarray(heights, dtype=np.float64)
+        if heights.ndim != 2 or min(heights.shape) < 2:
+            raise ValueError(
+                f"Expected a grid of at least 2x2 heights, got {heights.shape}"
+            )
+        logger.debug(f"Creating heightfield terrain of {heights.shape}")
+        terrain = cls(
+            mesh=[(heights_to_mesh(heights, size), tags or [])],
+            origin=(0.0, 0.0, 0.0),
+            size=size,
+            color=color,
+            material=material,
+            heights=heights,
+        )
+        if origin is None:
+            center = np.array([[size[0] / 2, size[1] / 2]])
+            origin = (
+                size[0] / 2,
+                size[1] / 2,
+                float(terrain.height_at(center)[0]),
+            )
+        terrain.origin = origin
+        return terrain
+
+    @property
+    def resolution(self) -> tuple[float, float]:
+        """The spacing of the grid points along the x and y axes"""
+        rows, cols = self.heights.shape
+        return self.size[0] / (cols - 1), self.size[1] / (rows - 1)
+
+    def _interpolate(
+        self, xy: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bilinear interpolation of the heights and their derivatives,
+        points outside of the terrain are clamped to its border"""
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        rows, cols = self.heights.shape
+        dx, dy = self.resolution
+        u = np.clip(xy[:, 0] / dx, 0, cols - 1)
+        v = np.clip(xy[:, 1] / dy, 0, rows - 1)
+        j = np.minimum(u.astype(np.intp), cols - 2)
+        i = np.minimum(v.astype(np.intp), rows - 2)
+        fu = u - j
+        fv = v - i
+
+        h = self.heights
+        h00 = h[i, j]
+        h01 = h[i, j + 1]
+        h10 = h[i + 1, j]
+        h11 = h[i + 1, j + 1]
+
+        height = (
+            h00 * (1 - fu) * (1 - fv)
+            + h01 * fu * (1 - fv)
+            + h10 * (1 - fu) * fv
+            + h11 * fu * fv
+        )
+        dzdx = ((h01 - h00) * (1 - fv) + (h11 - h10) * fv) / dx
+        dzdy = ((h10 - h00) * (1 - fu) + (h11 - h01) * fu) / dy
+        return height, dzdx, dzdy
+
+    def height_at(self, xy: np.ndarray) -> np.ndarray:
+        """Get the height of the terrain at many points
+
+        Args:
+            xy (np.ndarray): The points, of shape (N, 2)
+
+        Returns:
+            np.ndarray: The heights, of shape (N,)
+        """
+        return self._interpolate(xy)[0]
+
+    def normal_at(self, xy: np.ndarray) -> np.ndarray:
+        """Get the upward surface normal of the terrain at many points
+
+        Args:
+            xy (np.ndarray): The points, of shape (N, 2)
+
+        Returns:
+            np.ndarray: The unit normals, of shape (N, 3)
+        """
+        _, dzdx, dzdy = self._interpolate(xy)
+        normals = np.stack([-dzdx, -dzdy, np.ones_like(dzdx)], axis=1)
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        return normals
+
+    def slope_at(self, xy: np.ndarray) -> np.ndarray:
+        """Get the slope of the terrain at many points
+
+        Args:
+            xy (np.ndarray): The points, of shape (N, 2)
+
+        Returns:
+            np.ndarray: The angles between the surface and the horizontal plane in radians, of shape (N,)
+        """
+        _, dzdx, dzdy = self._interpolate(xy)
+        return np.arctan(np.hypot(dzdx, dzdy))
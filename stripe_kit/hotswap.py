@@ -0,0 +1,366 @@
+"""
+Swapping the generated scene of a running simulation.
+
+Generating a scene takes a while, so `ScenePregenerator` keeps generating the
+next scene variants in a background process, while the simulation runs.
+Once a variant is ready, `swap_scene` writes its terrain geometry and asset
+poses into the prims spawned for the current scene, in a single USD change
+block (point instancers are updated right after it), which is meant to be
+done at a reset boundary. No prims are created or removed, so the new scene
+has to fit the structure of the spawned one.
+
+Only `pxr` is needed, so swapping works on any USD stage.
+"""
+
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from logging import getLogger
+from multiprocessing import get_context
+from multiprocessing.context import BaseContext
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from pxr import (
+    Gf,
+    Sdf,
+    Usd,
+    UsdGeom,
+    Vt,
+)  # pyright: ignore[reportMissingImports]
+
+from .asset import AssetInstance, AssetInstanceBatch, unique_name
+from .bake import set_collision_mesh, set_instances, set_mesh_geometry
+from .profiling import Span, profiled_call, profiler
+from .scene_spec import SceneSpec, _generate_variant
+from .terrain import TERRAIN_NAME, TerrainInstance
+
+if TYPE_CHECKING:
+    from .factory import SceneCfgFactory
+
+logger = getLogger(__name__)
+
+PARKING_HEIGHT = -1000.0
+"""The height surplus asset prims are moved to, see `swap_scene`"""
+
+_VECTOR_TYPES = {
+    Sdf.ValueTypeNames.Double3: Gf.Vec3d,
+    Sdf.ValueTypeNames.Float3: Gf.Vec3f,
+    Sdf.ValueTypeNames.Half3: Gf.Vec3h,
+}
+_QUATERNION_TYPES = {
+    Sdf.ValueTypeNames.Quatd: Gf.Quatd,
+    Sdf.ValueTypeNames.Quatf: Gf.Quatf,
+    Sdf.ValueTypeNames.Quath: Gf.Quath,
+}
+
+Scene = tuple[TerrainInstance, list[AssetInstance | AssetInstanceBatch]]
+
+
+class ScenePregenerator:
+    """Generates scene variants in a background process, ahead of time.
+
+    The variants are generated like those of `SceneSpec.create_variants`, on
+    copies of the spec with seeds continuing the sequence of
+    `SceneSpec.variant_seeds`. The worker only imports `scene_spec`, so it
+    doesn't need `pxr`.
+    Up to `prefetch` variants are kept generating or ready at any time, so
+    taking a ready one never waits for the generation.
+    """
+
+    def __init__(
+        self,
+        spec: SceneSpec,
+        prefetch: int = 1,
+        mp_context: BaseContext | None = None,
+    ):
+        """Create a new ScenePregenerator object, and start generating
+
+        Args:
+            spec (SceneSpec): The scene specification, must be picklable
+            prefetch (int, optional): The number of variants to generate ahead. Defaults to 1.
+            mp_context (BaseContext | None, optional): Multiprocessing context used to start the worker. Defaults to None, meaning `spawn`, as forking the running simulator isn't safe.
+        """
+        self.spec = spec
+        self.prefetch = prefetch
+        self._sequence = np.random.SeedSequence(spec.seed)
+        # skip the seeds of the variants created along with the scene
+        self._sequence.spawn(spec.num_variants)
+        self._pool = ProcessPoolExecutor(1, mp_context or get_context("spawn"))
+        self._pending: deque[Future[tuple[Scene, list[Span]]]] = deque()
+        self._fill()
+
+    def _fill(self) -> None:
+        while len(self._pending) < self.prefetch:
+            seed = int(self._sequence.spawn(1)[0].generate_state(1)[0])
+            logger.debug(f"Pregenerating scene variant {seed}")
+            self._pending.append(
+                self._pool.submit(
+                    profiled_call,
+                    profiler.enabled,
+                    _generate_variant,
+                    self.spec,
+                    seed,
+                )
+            )
+
+    def ready(self) -> bool:
+        """Check whether the next variant has been generated
+
+        Returns:
+            bool: True if `take` won't block
+        """
+        return bool(self._pending) and self._pending[0].done()
+
+    def take(self, block: bool = False) -> Scene | None:
+        """Take the next generated variant, and start generating another one
+
+        Args:
+            block (bool, optional): Whether to wait for the variant, if it's not ready yet. Defaults to False.
+
+        Returns:
+            Scene | None: The terrain and the assets of the variant, or None if it's not ready and `block` isn't set
+        """
+        if not block and not self.ready():
+            return None
+        scene, spans = self._pending.popleft().result()
+        profiler.merge(spans)
+        self._fill()
+        return scene
+
+    def close(self) -> None:
+        """Stop generating, and shut the worker down"""
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._pool.shutdown(wait=False)
+
+    def __enter__(self) -> "ScenePregenerator":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def _set_value(
+    spec: Sdf.PrimSpec,
+    name: str,
+    types: dict[Any, Any],
+    default_type: Any,
+    value: Iterable[float],
+) -> None:
+    """Set an attribute, keeping the precision it was authored with"""
+    attr = spec.attributes.get(name)
+    if attr is None:
+        attr = Sdf.AttributeSpec(spec, name, default_type)
+    attr.default = types.get(attr.typeName, types[default_type])(*value)
+
+
+def _write_pose(
+    layer: Sdf.Layer,
+    path: str,
+    position: Iterable[float],
+    rotation: Iterable[float],
+    visible: bool = True,
+) -> None:
+    spec = layer.GetPrimAtPath(path) or Sdf.CreatePrimInLayer(layer, path)
+    authored = "xformOpOrder" in spec.attributes
+    _set_value(
+        spec,
+        "xformOp:translate",
+        _VECTOR_TYPES,
+        Sdf.ValueTypeNames.Double3,
+        map(float, position),
+    )
+    _set_value(
+        spec,
+        "xformOp:orient",
+        _QUATERNION_TYPES,
+        Sdf.ValueTypeNames.Quatd,
+        map(float, rotation),
+    )
+    if not authored:
+        order = Sdf.AttributeSpec(
+            spec,
+            "xformOpOrder",
+            Sdf.ValueTypeNames.TokenArray,
+            Sdf.VariabilityUniform,
+        )
+        order.default = Vt.TokenArray(["xformOp:translate", "xformOp:orient"])
+    visibility = spec.attributes.get("visibility")
+    if visibility is None:
+        if visible:
+            return
+        visibility = Sdf.AttributeSpec(
+            spec, "visibility", Sdf.ValueTypeNames.Token
+        )
+    visibility.default = "inherited" if visible else "invisible"
+
+
+def _batch_names(
+    batches: Iterable[AssetInstanceBatch],
+) -> dict[str, AssetInstanceBatch]:
+    """Name the batches the way `SceneCfgFactory.add_batch` does"""
+    res: dict[str, AssetInstanceBatch] = {}
+    for batch in batches:
+        res[unique_name(batch.name, res)] = batch
+    return res
+
+
+def _instance_path(batch: AssetInstanceBatch, i: int, name: str) -> str:
+    if batch.asset_class is None:
+        return f"/{batch.get_name(i, name)}"
+    return f"/{batch.asset_class.name}/{batch.get_name(i, name)}"
+
+
+def _swap_instancers(
+    stage: Usd.Stage,
+    name: str,
+    old: AssetInstanceBatch,
+    new: AssetInstanceBatch,
+    prefix: str,
+) -> None:
+    set_ids, labels = new.semantic_labels()
+    for mesh_id in range(len(old.meshes)):
+        mask = new.mesh_ids == mesh_id
+        path = f"{prefix}/{old.name}/{name}_instancer_{mesh_id}"
+        prim = stage.GetPrimAtPath(path)
+        if not prim:
+            if mask.any():
+                logger.warning(f"No point instancer at {path}, skipping")
+            continue
+        set_instances(
+            UsdGeom.PointInstancer(prim),
+            new.positions[mask],
+            new.rotations[mask],
+            semantic_ids=set_ids[mask],
+            semantic_labels=labels,
+        )
+
+
+def _swap_batch(
+    layer: Sdf.Layer,
+    name: str,
+    old: AssetInstanceBatch,
+    new: AssetInstanceBatch,
+    prefix: str,
+    offset: np.ndarray,
+) -> None:
+    for mesh_id in range(len(old.meshes)):
+        prims = np.flatnonzero(old.mesh_ids == mesh_id)
+        instances = np.flatnonzero(new.mesh_ids == mesh_id)
+        if len(instances) > len(prims):
+            logger.warning(
+                f"Dropping {len(instances) - len(prims)} instances of "
+                f"{new.name}, only {len(prims)} prims were spawned"
+            )
+        for k, i in enumerate(prims):
+            path = f"{prefix}{_instance_path(old, i, name)}"
+            if k < len(instances):
+                j = instances[k]
+                _write_pose(
+                    layer, path, new.positions[j] + offset, new.rotations[j]
+                )
+            else:
+                parked = (*offset[:2], PARKING_HEIGHT)
+                _write_pose(layer, path, parked, (1, 0, 0, 0), visible=False)
+
+
+def swap_scene(
+    stage: Usd.Stage,
+    factory: "SceneCfgFactory",
+    terrain: TerrainInstance,
+    assets: Iterable[AssetInstance | AssetInstanceBatch],
+    prefix: str = "",
+    offset: tuple[float, float, float] = (0.0, 0.0, 0.0),
+) -> None:
+    """Replace the scene spawned from a factory with another one, in place
+
+    The geometry of the terrain meshes is replaced (the new terrain has to
+    split into the same `TerrainInstance.chunks`), and the asset prims are
+    moved to the poses of the new assets, matched by name. Batches are
+    matched by name as well, and their instances by mesh, against the
+    batches the prims were spawned from. Point instancers take any number of
+    instances, while surplus prims of other batches are hidden and parked
+    below the terrain, and instances without a prim are dropped. Semantic
+    tags and materials of the prims are kept. The factory is then updated to
+    hold the new scene.
+
+    Args:
+        stage (Usd.Stage): The stage the factory's scene was spawned on
+        factory (SceneCfgFactory): The factory of the spawned scene
+        terrain (TerrainInstance): The new terrain
+        assets (Iterable[AssetInstance | AssetInstanceBatch]): The new assets
+        prefix (str, optional): The prefix of the prim paths of the scene, like `/variant_0`. Defaults to "".
+        offset (tuple[float, float, float], optional): The offset of the scene in the world. Defaults to no offset.
+
+    Raises:
+        ValueError: If the new scene doesn't fit the spawned one
+    """
+    if factory.baked_usd is not None:
+        raise ValueError("Baked scenes cannot be swapped")
+    chunks = terrain.chunks()
+    if [c[0] for c in chunks] != [c[0] for c in factory.terrain.chunks()]:
+        raise ValueError("The terrain meshes differ from the spawned ones")
+    instances = [a for a in assets if isinstance(a, AssetInstance)]
+    batches = _batch_names(
+        a for a in assets if isinstance(a, AssetInstanceBatch)
+    )
+    for instance in instances:
+        if instance.get_name() not in factory.sources:
+            raise ValueError(f"No asset {instance.get_name()} was spawned")
+    if factory.spawned_batches is None:
+        factory.spawned_batches = dict(factory.batches)
+    spawned = factory.spawned_batches
+    for name, batch in batches.items():
+        if name not in spawned:
+            raise ValueError(f"No batch {name} was spawned")
+        if len(spawned[name].meshes) != len(batch.meshes):
+            raise ValueError(
+                f"Batch {name} has {len(batch.meshes)} meshes, "
+                f"but {len(spawned[name].meshes)} were spawned"
+            )
+
+    logger.debug(f"Swapping scene {prefix or '/'}")
+    layer = stage.GetEditTarget().GetLayer()
+    shift = np.asarray(offset, dtype=np.float64)
+    with profiler.span("swap_scene", prefix or None):
+        with Sdf.ChangeBlock():
+            for name, mesh, _ in chunks:
+                path = f"{prefix}/{TERRAIN_NAME}/{name}/mesh"
+                spec = layer.GetPrimAtPath(path) or Sdf.CreatePrimInLayer(
+                    layer, path
+                )
+                set_mesh_geometry(spec, mesh)
+                if terrain.collision_lod is not None:
+                    set_collision_mesh(
+                        layer,
+                        f"{prefix}/{TERRAIN_NAME}/{name}",
+                        mesh,
+                        terrain.collision_lod,
+                    )
+            for instance in instances:
+                path = (
+                    f"{prefix}{factory.assets[instance.get_name()].prim_path}"
+                )
+                _write_pose(
+                    layer,
+                    path,
+                    np.asarray(instance.position) + shift,
+                    instance.rotation,
+                )
+            for name, batch in batches.items():
+                if not spawned[name].point_instancer:
+                    _swap_batch(
+                        layer, name, spawned[name], batch, prefix, shift
+                    )
+        # point instancers are updated through the schema, which isn't
+        # allowed within a change block
+        for name, batch in batches.items():
+            if spawned[name].point_instancer:
+                _swap_instancers(stage, name, spawned[name], batch, prefix)
+
+    factory.terrain = terrain
+    for instance in instances:
+        factory.sources[instance.get_name()] = instance
+    factory.batches.update(batches)
@@ -0,0 +1,76 @@
+from collections.abc import Callable
+from dataclasses import MISSING
+from logging import getLogger
+
+import isaacsim.core.utils.prims as prim_utils  # pyright: ignore[reportMissingImports]
+import numpy as np
+from isaaclab.sim.spawners import SpawnerCfg
+from isaaclab.utils import configclass
+from pxr import Usd, UsdGeom  # pyright: ignore[reportMissingImports]
+
+from .bake import PROTOTYPES_NAME, build_point_instancer
+from .mesh import apply_semantics
+from .profiling import profiled
+
+logger = getLogger(__name__)
+
+
+@profiled("PointInstancerCfg.spawn")
+def spawn_point_instancer(
+    prim_path: str,
+    cfg: "PointInstancerCfg",
+    translation: tuple[float, float, float] | None = None,
+    orientation: tuple[float, float, float, float] | None = None,
+) -> Usd.Prim:
+    """Spawn a point instancer, with a single prototype spawned beneath it.
+
+    Args:
+        prim_path (str): The path of the point instancer prim
+        cfg (PointInstancerCfg): The configuration of the point instancer
+        translation (tuple[float, float, float] | None, optional): The translation of the point instancer. Defaults to None.
+        orientation (tuple[float, float, float, float] | None, optional): The orientation of the point instancer. Defaults to None.
+
+    Returns:
+        Usd.Prim: The point instancer prim
+    """
+    logger.debug(f"Spawning point instancer of {len(cfg.positions)} instances")
+    prim = prim_utils.create_prim(
+        prim_path,
+        "PointInstancer",
+        translation=translation,
+        orientation=orientation,
+    )
+    prototype_path = f"{prim_path}/{PROTOTYPES_NAME}/prototype"
+    cfg.prototype.func(prototype_path, cfg.prototype)
+
+    build_point_instancer(
+        UsdGeom.PointInstancer(prim),
+        [prototype_path],
+        cfg.positions,
+        cfg.orientations,
+        semantic_ids=cfg.semantic_ids,
+        semantic_labels=cfg.semantic_labels,
+    )
+    if cfg.semantic_tags is not None:
+        for tag, value in cfg.semantic_tags:
+            apply_semantics(prim, tag, value)
+    return prim
+
+
+@configclass
+class PointInstancerCfg(SpawnerCfg):
+    """Configuration for spawning many instances of a single prototype as
+    one `UsdGeom.PointInstancer` prim"""
+
+    func: Callable = spawn_point_instancer
+
+    prototype: SpawnerCfg = MISSING  # pyright: ignore[reportAssignmentType]
+    """The spawner of the prototype"""
+    positions: np.ndarray = MISSING  # pyright: ignore[reportAssignmentType]
+    """The positions of the instances, of shape (N, 3)"""
+    orientations: np.ndarray = MISSING  # pyright: ignore[reportAssignmentType]
+    """The orientations of the instances as (w, x, y, z), of shape (N, 4)"""
+    semantic_ids: np.ndarray | None = None
+    """Index into `semantic_labels` for each instance"""
+    semantic_labels: list[str] = []
+    """The table of per-instance semantic labels"""
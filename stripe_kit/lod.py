@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+from importlib.util import find_spec
+from logging import getLogger
+from typing import Literal
+
+import numpy as np
+from trimesh import Trimesh
+
+from .cache import BoundedCache, mesh_hash
+
+logger = getLogger(__name__)
+
+COLLISION_NAME = "collision"
+SIMPLIFIED_CACHE_SIZE = 256
+
+_simplified: BoundedCache[tuple[str, "CollisionLOD"], Trimesh] = BoundedCache(
+    SIMPLIFIED_CACHE_SIZE
+)
+
+
+def require_decimation() -> None:
+    """Check that quadric decimation is available
+
+    Raises:
+        ImportError: If the `fast_simplification` package, which trimesh uses for quadric decimation, isn't installed
+    """
+    if find_spec("fast_simplification") is None:
+        raise ImportError(
+            "Quadric decimation requires the fast_simplification package, "
+            "install it with `pip install stripe_kit[decimate]`"
+        )
+
+
+def cluster_vertices(mesh: Trimesh, cell_size: float) -> Trimesh:
+    """Decimate a mesh by merging the vertices within each cell of a grid
+
+    Each cluster is replaced by the mean of its vertices, and the faces that
+    collapse or duplicate another face are dropped. Coarser than quadric
+    decimation, but fast and without additional dependencies.
+
+    Args:
+        mesh (Trimesh): The mesh to decimate
+        cell_size (float): The size of the grid cells in meters
+
+    Returns:
+        Trimesh: The decimated mesh
+    """
+    vertices = np.asarray(mesh.vertices)
+    cells = np.floor((vertices - vertices.min(axis=0)) / cell_size).astype(
+        np.int64
+    )
+    _, inverse, counts = np.unique(
+        cells, axis=0, return_inverse=True, return_counts=True
+    )
+    inverse = inverse.ravel()
+    merged = np.stack(
+        [
+            np.bincount(inverse, vertices[:, i], len(counts)) / counts
+            for i in range(3)
+        ],
+        axis=1,
+    )
+    faces = inverse[np.asarray(mesh.faces)]
+    faces = faces[
+        (faces[:, 0] != faces[:, 1])
+        & (faces[:, 1] != faces[:, 2])
+        & (faces[:, 2] != faces[:, 0])
+    ]
+    _, first = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+    faces = faces[np.sort(first)]
+    res = Trimesh(vertices=merged, faces=faces, process=False, validate=False)
+    res.remove_unreferenced_vertices()
+    return res
+
+
+@dataclass(frozen=True)
+class CollisionLOD:
+    """A simplified version of a mesh, used for collisions only
+
+    PhysX cooks and collides against the collision prim, while the renderer
+    keeps the full mesh. The last `SIMPLIFIED_CACHE_SIZE` simplified meshes
+    are cached by `mesh_hash`, so meshes shared by many prims, or
+    regenerated identically, are simplified once.
+    """
+
+    method: Literal["cluster", "decimate", "convex_hull"] = "cluster"
+    """How the mesh is simplified. `cluster` merges vertices on a grid (see
+    `cluster_vertices`), `decimate` uses quadric decimation, which is finer
+    but requires the `decimate` extra (the `fast_simplification` package),
+    and `convex_hull` replaces the mesh with its convex hull, which PhysX
+    can use on dynamic bodies"""
+    target_faces: int = 5000
+    """The number of faces to decimate to, ignored by `convex_hull`"""
+
+    def __post_init__(self):
+        if self.method not in ("decimate", "cluster", "convex_hull"):
+            raise ValueError(f"Unknown simplification method {self.method}")
+        if self.target_faces < 4:
+            raise ValueError("At least 4 target faces are required")
+        if self.method == "decimate":
+            require_decimation()
+
+    @property
+    def approximation(self) -> str:
+        """The `physics:approximation` PhysX should use on the collision
+        prim"""
+        return "convexHull" if self.method == "convex_hull" else "none"
+
+    def _simplify(self, mesh: Trimesh) -> Trimesh:
+        if self.method == "convex_hull":
+            return mesh.convex_hull
+        if len(mesh.faces) <= self.target_faces:
+            return mesh
+        if self.method == "decimate":
+            return mesh.simplify_quadric_decimation(
+                face_count=self.target_faces
+            )
+        # clustering a surface leaves about one face per cell of this size
+        cell_size = np.sqrt(mesh.area / self.target_faces)
+        return cluster_vertices(mesh, cell_size)
+
+    def simplify(self, mesh: Trimesh) -> Trimesh:
+        """Get the simplified version of a mesh
+
+        Args:
+            mesh (Trimesh): The full mesh
+
+        Returns:
+            Trimesh: The simplified mesh, which is the mesh itself if it's simple enough already
+        """
+
+        def compute() -> Trimesh:
+            res = self._simplify(mesh)
+            logger.debug(
+                f"Simplified mesh from {len(mesh.faces)} to "
+                f"{len(res.faces)} faces with {self.method}"
+            )
+            return res
+
+        return _simplified.get((mesh_hash(mesh), self), compute)
@@ -0,0 +1,443 @@
+"""
+A portable binary format for generated scenes.
+
+A manifest is a single file, consisting of a JSON header, followed by
+aligned binary blocks holding all the arrays of the scene: the terrain
+meshes, the asset poses and tags, and the geometry of dynamic meshes. On
+load, the file is memory-mapped and the arrays are used in place, while the
+assets are kept as `AssetInstanceBatch` objects, which only turn into cfgs
+once the scene is requested.
+
+This allows generating scenes offline, without Isaac Sim, and loading them
+on the training machine without regenerating.
+"""
+
+import json
+import mmap
+import struct
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, fields
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from trimesh import Trimesh
+
+from .asset import (
+    AssetInstance,
+    AssetInstanceBatch,
+    AssetSpec,
+    SceneAsset,
+)
+from .cache import (
+    MeshConversionCache,
+    build_terrain,
+    class_path,
+    load_class,
+    split_terrain_fields,
+)
+from .lod import CollisionLOD
+from .mesh import (
+    AssetMesh,
+    DebugMesh,
+    DynamicMesh,
+    UniversalMesh,
+    USDMesh,
+    instancable,
+)
+from .terrain import TerrainInstance
+
+if TYPE_CHECKING:
+    from .factory import SceneCfgFactory
+
+logger = getLogger(__name__)
+
+MAGIC = b"STRIPEKT"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sIIQ")
+
+
+@dataclass
+class StoredAssetSpec(AssetSpec):
+    """Stand-in for an asset specification of a loaded scene.
+
+    It only preserves the attributes of the original specification that
+    are needed to spawn its instances, and can't generate new ones.
+    """
+
+    def generate(self, terrain: TerrainInstance) -> list[AssetInstance]:
+        raise TypeError(f"Asset {self.name} has been loaded from a manifest")
+
+
+@instancable
+class _InstancableDynamicMesh(DynamicMesh):
+    pass
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class _Writer:
+    """Collects the arrays to be written as blocks"""
+
+    def __init__(self):
+        self.blocks: list[tuple[int, np.ndarray]] = []
+        self.size = 0
+
+    def add(self, array: np.ndarray) -> dict[str, Any]:
+        array = np.ascontiguousarray(array)
+        offset = _align(self.size)
+        self.blocks.append((offset, array))
+        self.size = offset + array.nbytes
+        return {
+            "offset": offset,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+
+
+def _encode_material(material: Any) -> dict[str, Any] | None:
+    """Serialize a material configuration by its class and fields, leaving
+    out callables like the spawn function, which the class restores"""
+    if material is None:
+        return None
+    values = {
+        f.name: getattr(material, f.name)
+        for f in fields(material)
+        if not callable(getattr(material, f.name))
+    }
+    try:
+        json.dumps(values)
+    except TypeError:
+        raise ValueError(
+            f"Cannot serialize material {type(material).__name__}, its "
+            "fields must be JSON serializable"
+        ) from None
+    return {"class": class_path(type(material)), "fields": values}
+
+
+def _decode_material(entry: dict[str, Any] | None) -> Any:
+    if entry is None:
+        return None
+    values = {
+        name: tuple(value) if isinstance(value, list) else value
+        for name, value in entry["fields"].items()
+    }
+    return load_class(entry["class"])(**values)
+
+
+def _encode_mesh(mesh: AssetMesh, writer: _Writer) -> dict[str, Any]:
+    if isinstance(mesh, DebugMesh):
+        return {"type": "debug"}
+    if isinstance(mesh, USDMesh):
+        return {"type": "usd", "usd_path": mesh.usd_path}
+    if isinstance(mesh, UniversalMesh):
+        res: dict[str, Any] = {
+            "type": "universal",
+            "path": mesh.path,
+            "kwargs": mesh.kwargs,
+        }
+        if mesh.cache is not None:
+            res["cache"] = [mesh.cache.directory, mesh.cache.version]
+        return res
+    if isinstance(mesh, DynamicMesh):
+        return {
+            "type": "dynamic",
+            "vertices": writer.add(mesh.mesh.vertices),
+            "faces": writer.add(mesh.mesh.faces),
+            "visual_material_path": mesh.visual_material_path,
+            "visual_material": _encode_material(mesh.visual_material),
+            "physics_material": _encode_material(mesh.physics_material),
+            "instancable": hasattr(type(mesh), "spawner"),
+            "share_materials": mesh.share_materials,
+            "collision_lod": (
+                None
+                if mesh.collision_lod is None
+                else asdict(mesh.collision_lod)
+            ),
+        }
+    raise ValueError(f"Cannot serialize mesh of type {type(mesh).__name__}")
+
+
+def _encode_batch(
+    batch: AssetInstanceBatch,
+    writer: _Writer,
+    meshes: dict[int, int],
+    mesh_table: list[dict[str, Any]],
+) -> dict[str, Any]:
+    for mesh in batch.meshes:
+        if id(mesh) not in meshes:
+            meshes[id(mesh)] = len(mesh_table)
+            mesh_table.append(_encode_mesh(mesh, writer))
+    assert batch.tag_offsets is not None
+    spec = batch.asset_class
+    return {
+        "asset_class": None if spec is None else spec.name,
+        "spec": (
+            None
+            if spec is None
+            else {
+                f.name: getattr(spec, f.name)
+                for f in fields(StoredAssetSpec)
+                if f.name not in ("name", "asset_cfg_class")
+            }
+        ),
+        "meshes": [meshes[id(mesh)] for mesh in batch.meshes],
+        "positions": writer.add(batch.positions),
+        "rotations": writer.add(batch.rotations),
+        "mesh_ids": writer.add(batch.mesh_ids),
+        "tag_table": batch.tag_table,
+        "tag_ids": writer.add(batch.tag_ids),
+        "tag_offsets": writer.add(batch.tag_offsets),
+        "names": batch.names,
+        "asset_cfg_class": (
+            None
+            if batch.asset_cfg_class is None
+            else class_path(batch.asset_cfg_class)
+        ),
+        "point_instancer": batch.point_instancer,
+    }
+
+
+def _group_instances(
+    assets: Iterable[AssetInstance | AssetInstanceBatch],
+) -> list[AssetInstanceBatch]:
+    """Turn the assets into batches, grouping loose instances by their class"""
+    batches: list[AssetInstanceBatch] = []
+    groups: dict[tuple[int, int], list[AssetInstance]] = {}
+    for asset in assets:
+        if isinstance(asset, AssetInstanceBatch):
+            batches.append(asset)
+        else:
+            key = (id(asset.asset_class), id(asset.asset_cfg_class))
+            groups.setdefault(key, []).append(asset)
+    batches.extend(
+        AssetInstanceBatch.from_instances(group) for group in groups.values()
+    )
+    return batches
+
+
+def save_scene(
+    path: str,
+    terrain: TerrainInstance,
+    assets: Iterable[AssetInstance | AssetInstanceBatch],
+    lights: Iterable[SceneAsset] = (),
+) -> None:
+    """Save a generated scene to a manifest file
+
+    This doesn't require Isaac Sim, so it can be used along with
+    `SceneSpec.generate_scene` on machines without it.
+
+    Args:
+        path (str): Path to the manifest file
+        terrain (TerrainInstance): The terrain of the scene
+        assets (Iterable[AssetInstance | AssetInstanceBatch]): The assets of the scene
+        lights (Iterable[SceneAsset], optional): The lights of the scene, must be dataclasses. Defaults to ().
+
+    Raises:
+        ValueError: If some part of the scene cannot be serialized
+    """
+    writer = _Writer()
+
+    try:
+        values, arrays = split_terrain_fields(terrain)
+    except TypeError as e:
+        raise ValueError(f"Cannot serialize terrain, {e}") from None
+
+    terrain_header = {
+        "class": class_path(type(terrain)),
+        "mesh": [
+            {
+                "vertices": writer.add(mesh.vertices),
+                "faces": writer.add(mesh.faces),
+                "tags": tags,
+            }
+            for mesh, tags in terrain.mesh
+        ],
+        "fields": values,
+        "arrays": {name: writer.add(value) for name, value in arrays.items()},
+    }
+
+    meshes: dict[int, int] = {}
+    mesh_table: list[dict[str, Any]] = []
+    batches = [
+        _encode_batch(batch, writer, meshes, mesh_table)
+        for batch in _group_instances(assets)
+    ]
+
+    light_header = [
+        {
+            "class": class_path(type(light)),
+            "fields": asdict(light),  # pyright: ignore[reportArgumentType]
+        }
+        for light in lights
+    ]
+
+    header = json.dumps(
+        {
+            "terrain": terrain_header,
+            "meshes": mesh_table,
+            "batches": batches,
+            "lights": light_header,
+        }
+    ).encode()
+
+    data_start = _align(_PREAMBLE.size + len(header))
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header)))
+        f.write(header)
+        for offset, array in writer.blocks:
+            f.seek(data_start + offset)
+            f.write(array.data)
+        f.truncate(data_start + writer.size)
+
+    logger.debug(f"Saved scene to {path}")
+
+
+def _decode_mesh(entry: dict[str, Any], array: "_ArrayReader") -> AssetMesh:
+    kind = entry["type"]
+    if kind == "debug":
+        return DebugMesh()
+    if kind == "usd":
+        return USDMesh(entry["usd_path"])
+    if kind == "universal":
+        cache = entry.get("cache")
+        return UniversalMesh(
+            entry["path"],
+            MeshConversionCache(*cache) if cache is not None else None,
+            lazy=True,
+            **entry["kwargs"],
+        )
+    if kind == "dynamic":
+        cls = _InstancableDynamicMesh if entry["instancable"] else DynamicMesh
+        mesh = cls(
+            Trimesh(
+                vertices=array(entry["vertices"]),
+                faces=array(entry["faces"]),
+                process=False,
+                validate=False,
+            ),
+            visual_material_path=entry["visual_material_path"],
+            visual_material=_decode_material(entry["visual_material"]),
+            physics_material=_decode_material(entry["physics_material"]),
+            share_materials=entry.get("share_materials", True),
+        )
+        if entry.get("collision_lod") is not None:
+            mesh.collision_lod = CollisionLOD(**entry["collision_lod"])
+        return mesh
+    raise ValueError(f"Unknown mesh type {kind}")
+
+
+class _ArrayReader:
+    """Creates arrays on top of the memory-mapped blocks"""
+
+    def __init__(self, buffer: mmap.mmap, data_start: int):
+        self.buffer = buffer
+        self.data_start = data_start
+
+    def __call__(self, block: dict[str, Any]) -> np.ndarray:
+        dtype = np.dtype(block["dtype"])
+        shape = tuple(block["shape"])
+        return np.frombuffer(
+            self.buffer,
+            dtype=dtype,
+            count=int(np.prod(shape)),
+            offset=self.data_start + block["offset"],
+        ).reshape(shape)
+
+
+def load_scene(
+    path: str,
+    num_envs: int = 1,
+    env_spacing: float = 0.0,
+    **kwargs: bool,
+) -> "SceneCfgFactory":
+    """Load a scene from a manifest file
+
+    The file is memory-mapped, and all arrays (terrain meshes, asset poses
+    and tags) are read-only views into it. The asset cfgs are only created
+    once the scene is requested from the factory.
+
+    Args:
+        path (str): Path to the manifest file
+        num_envs (int, optional): The number of environments. Defaults to 1.
+        env_spacing (float, optional): The spacing between environments. Defaults to 0.0.
+        **kwargs: Additional keyword arguments to pass to the SceneCfgFactory
+
+    Raises:
+        ValueError: If the file is not a valid manifest
+
+    Returns:
+        SceneCfgFactory: The factory of the loaded scene
+    """
+    from .factory import SceneCfgFactory
+
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, _, header_len = _PREAMBLE.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a scene manifest")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported manifest version {version}")
+    header = json.loads(buffer[_PREAMBLE.size : _PREAMBLE.size + header_len])
+    array = _ArrayReader(buffer, _align(_PREAMBLE.size + header_len))
+
+    terrain_header = header["terrain"]
+    terrain = build_terrain(
+        terrain_header["class"],
+        [
+            (array(m["vertices"]), array(m["faces"]), m["tags"])
+            for m in terrain_header["mesh"]
+        ],
+        terrain_header["fields"],
+        {
+            name: array(block)
+            for name, block in terrain_header["arrays"].items()
+        },
+    )
+
+    factory = SceneCfgFactory(terrain, num_envs, env_spacing, **kwargs)
+
+    meshes = [_decode_mesh(entry, array) for entry in header["meshes"]]
+    specs: dict[str, StoredAssetSpec] = {}
+    for entry in header["batches"]:
+        cfg_class = (
+            None
+            if entry["asset_cfg_class"] is None
+            else load_class(entry["asset_cfg_class"])
+        )
+        spec = None
+        if entry["asset_class"] is not None:
+            spec = specs.get(entry["asset_class"])
+            if spec is None:
+                spec = specs[entry["asset_class"]] = StoredAssetSpec(
+                    entry["asset_class"], cfg_class, **entry["spec"]
+                )
+        factory.add_batch(
+            AssetInstanceBatch(
+                spec,
+                [meshes[i] for i in entry["meshes"]],
+                array(entry["positions"]),
+                array(entry["rotations"]),
+                array(entry["mesh_ids"]),
+                tag_table=[(tag, value) for tag, value in entry["tag_table"]],
+                tag_ids=array(entry["tag_ids"]),
+                tag_offsets=array(entry["tag_offsets"]),
+                names=entry["names"],
+                asset_cfg_class=cfg_class,
+                point_instancer=entry["point_instancer"],
+            )
+        )
+
+    for entry in header["lights"]:
+        light_fields = {
+            name: tuple(value) if isinstance(value, list) else value
+            for name, value in entry["fields"].items()
+        }
+        factory.add_asset(load_class(entry["class"])(**light_fields))
+
+    logger.debug(f"Loaded scene from {path}")
+    return factory
@@ -0,0 +1,130 @@
+from dataclasses import fields, is_dataclass
+from hashlib import sha256
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from isaaclab.sim.spawners import RigidBodyMaterialCfg, VisualMaterialCfg
+
+logger = getLogger(__name__)
+
+MATERIALS_NAME = "materials"
+
+
+def _content(value: Any) -> Any:
+    """The parts of a value that define a material, leaving out callables
+    like the spawn functions of configuration classes"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return (
+            type(value).__qualname__,
+            tuple(
+                (f.name, _content(getattr(value, f.name)))
+                for f in fields(value)
+                if not callable(getattr(value, f.name))
+            ),
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(_content(v) for v in value)
+    return value
+
+
+def material_key(material: Any) -> str:
+    """Compute a key of a material configuration, by content
+
+    Two configurations with the same attributes get the same key, even if
+    they're separate objects.
+
+    Args:
+        material (Any): The material configuration, or a tuple of values defining the material
+
+    Returns:
+        str: Hex digest of the material
+    """
+    return sha256(repr(_content(material)).encode()).hexdigest()
+
+
+class MaterialRegistry:
+    """Spawns each unique material once per stage, and binds it to every
+    mesh using it.
+
+    Without it, `create_prim_from_mesh` spawns a visual and a physics
+    material beneath every mesh prim, so each chunk of a terrain gets a
+    material prim and a shader compile of its own. The registry spawns the
+    materials beneath `root` instead, named after their `material_key`.
+    """
+
+    def __init__(self, root: str = f"/{MATERIALS_NAME}"):
+        """Create a new MaterialRegistry object
+
+        Args:
+            root (str, optional): The prim path the materials are spawned beneath. Defaults to "/materials".
+        """
+        self.root = root
+        self.bindings = 0
+        """The number of meshes bound to a material by this registry"""
+        self.materials: dict[str, Any] = {}
+        """The materials spawned by this registry, by prim path"""
+
+    def material_path(self, material: Any, kind: str) -> str:
+        """Get the prim path of a material
+
+        Args:
+            material (Any): The material configuration
+            kind (str): The kind of the material, like `visual` or `physics`
+
+        Returns:
+            str: The prim path
+        """
+        return f"{self.root}/{kind}_{material_key(material)[:16]}"
+
+    def _spawn(self, material: Any, kind: str) -> str:
+        import isaacsim.core.utils.prims as prim_utils  # pyright: ignore[reportMissingImports]
+
+        path = self.material_path(material, kind)
+        # checked on the stage, since the registry may outlive it
+        if not prim_utils.is_prim_path_valid(path):
+            logger.debug(f"Spawning shared material {path}")
+            if not prim_utils.is_prim_path_valid(self.root):
+                prim_utils.create_prim(self.root, "Scope")
+            material.func(path, material)
+            self.materials[path] = material
+        self.bindings += 1
+        return path
+
+    def bind_visual(self, prim_path: str, material: "VisualMaterialCfg") -> str:
+        """Bind a visual material to a prim, spawning it if needed
+
+        Args:
+            prim_path (str): The prim to bind the material to
+            material (VisualMaterialCfg): The material configuration
+
+        Returns:
+            str: The prim path of the material
+        """
+        import isaaclab.sim as sim_utils
+
+        path = self._spawn(material, "visual")
+        sim_utils.bind_visual_material(prim_path, path)
+        return path
+
+    def bind_physics(
+        self, prim_path: str, material: "RigidBodyMaterialCfg"
+    ) -> str:
+        """Bind a physics material to a prim, spawning it if needed
+
+        Args:
+            prim_path (str): The prim to bind the material to
+            material (RigidBodyMaterialCfg): The material configuration
+
+        Returns:
+            str: The prim path of the material
+        """
+        import isaaclab.sim as sim_utils
+
+        path = self._spawn(material, "physics")
+        sim_utils.bind_physics_material(prim_path, path)
+        return path
+
+
+shared_materials = MaterialRegistry()
+"""The registry used by meshes with `DynamicMesh.share_materials` set"""
@@ -1,34 +1,43 @@
+import asyncio
+import os
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from logging import getLogger
-from typing import Any
-
-import isaacsim.core.utils.prims as prim_utils  # pyright: ignore[reportMissingImports]
-import isaacsim.core.utils.semantics as semantics_utils  # pyright: ignore[reportMissingImports]
-from isaaclab.sim.converters import MeshConverter, MeshConverterCfg
-from isaaclab.sim.spawners import (
-    MdlFileCfg,
-    PreviewSurfaceCfg,
-    RigidBodyMaterialCfg,
-    SpawnerCfg,
-    UsdFileCfg,
-    VisualMaterialCfg,
-    # spawn_from_mdl_file,
-)
-from isaaclab.terrains.utils import create_prim_from_mesh
-from pxr.Usd import Prim  # pyright: ignore[reportMissingImports]
+from typing import TYPE_CHECKING, Any
+
 from trimesh import Trimesh, primitives
 
+from .cache import MeshConversionCache
+from .lod import CollisionLOD
+from .materials import shared_materials
+from .profiling import profiled
+
+if TYPE_CHECKING:
+    from isaaclab.sim.converters import MeshConverter
+    from isaaclab.sim.spawners import (
+        RigidBodyMaterialCfg,
+        SpawnerCfg,
+        UsdFileCfg,
+        VisualMaterialCfg,
+    )
+    from pxr.Usd import Prim  # pyright: ignore[reportMissingImports]
+
 logger = getLogger(__name__)
 
 CLASS_TAG = "class"
 
 
 class AssetMesh(ABC):
-    """A mesh that can be spawned within Isaac Sim"""
+    """A mesh that can be spawned within Isaac Sim
+
+    Isaac Lab is only imported once the mesh is turned into a spawner, so
+    meshes can be freely created and passed around in generation code.
+    """
 
     @abstractmethod
-    def to_cfg(self, **kwargs: Any) -> SpawnerCfg:
+    def to_cfg(self, **kwargs: Any) -> "SpawnerCfg":
         """Create a SpawnerCfg object from an AssetMesh object
 
         Logically this should return a new object, thus nullifying any effects
@@ -49,7 +58,7 @@ class USDMesh(AssetMesh):
 
     usd_path: str
 
-    def to_cfg(self, **kwargs: Any) -> UsdFileCfg:
+    def to_cfg(self, **kwargs: Any) -> "UsdFileCfg":
         """Create a UsdFileCfg object from an AssetMesh object
 
         Args:
@@ -58,6 +67,8 @@ class USDMesh(AssetMesh):
         Returns:
             UsdFileCfg: The IsaacLab cfg object
         """
+        from isaaclab.sim.spawners import UsdFileCfg
+
         logger.debug("Creating USD mesh cfg")
         mesh_cfg = UsdFileCfg(usd_path=self.usd_path, **kwargs)
         return mesh_cfg
@@ -66,18 +77,82 @@ class USDMesh(AssetMesh):
 class UniversalMesh(AssetMesh):
     """A mesh derived from any file format, accepted by MeshConverterCfg"""
 
-    def __init__(self, path: str, **kwargs: Any):
+    def __init__(
+        self,
+        path: str,
+        cache: MeshConversionCache | None = None,
+        lazy: bool = False,
+        **kwargs: Any,
+    ):
         """Initialize a UniversalMesh object
 
         Args:
             path (str): Path to the mesh file
+            cache (MeshConversionCache | None, optional): Cache of converted meshes. Defaults to None.
+            lazy (bool, optional): Whether to defer the conversion until it's needed, see `convert_meshes`. Defaults to False.
             kwargs: Additional keyword arguments to pass to the MeshConverterCfg
         """
         logger.debug("Creating universal mesh")
-        cfg = MeshConverterCfg(path, **kwargs)
+        self.path = path
+        self.cache = cache
+        self.kwargs = kwargs
+        self.converter: "MeshConverter | None" = None
+        """The converter, None if the mesh hasn't been converted, or was found in the cache"""
+        self._usd_path: str | None = None
+        if not lazy:
+            self.convert()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the converter is derived from the other attributes
+        return {**self.__dict__, "converter": None}
+
+    def _cache_key(self) -> str | None:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.key(self.path, self.kwargs)
+        except TypeError as e:
+            logger.warning(f"Not caching the conversion of {self.path}: {e}")
+            return None
+
+    def convert(self) -> str:
+        """Convert the mesh to USD, unless it's already converted or cached
+
+        Returns:
+            str: Path to the converted USD file
+        """
+        if self._usd_path is not None:
+            return self._usd_path
+
+        key = self._cache_key()
+        if self.cache is not None and key is not None:
+            self._usd_path = self.cache.lookup(key, self.path)
+            if self._usd_path is not None:
+                logger.debug(f"Mesh conversion cache hit {self.path}")
+                return self._usd_path
+            kwargs = {
+                **self.kwargs,
+                "usd_dir": self.cache.usd_dir(key),
+                "usd_file_name": os.path.basename(
+                    self.cache.usd_path(key, self.path)
+                ),
+            }
+        else:
+            kwargs = self.kwargs
+
+        from isaaclab.sim.converters import MeshConverter, MeshConverterCfg
+
+        cfg = MeshConverterCfg(self.path, **kwargs)
         self.converter = MeshConverter(cfg)
+        self._usd_path = self.converter.usd_path
+        return self._usd_path
+
+    @property
+    def usd_path(self) -> str:
+        """Path to the converted USD file, converting the mesh if needed"""
+        return self.convert()
 
-    def to_cfg(self, **kwargs: Any) -> UsdFileCfg:
+    def to_cfg(self, **kwargs: Any) -> "UsdFileCfg":
         """Create a UsdFileCfg object utilizing the MeshConverterCfg from an AssetMesh object
 
         Args:
@@ -86,10 +161,55 @@ class UniversalMesh(AssetMesh):
         Returns:
             UsdFileCfg: The IsaacLab cfg object
         """
-        mesh_cfg = UsdFileCfg(usd_path=self.converter.usd_path, **kwargs)
+        from isaaclab.sim.spawners import UsdFileCfg
+
+        mesh_cfg = UsdFileCfg(usd_path=self.usd_path, **kwargs)
         return mesh_cfg
 
 
+def _init_worker() -> None:
+    # the converter drives its tasks on the event loop of the current thread
+    asyncio.set_event_loop(asyncio.new_event_loop())
+
+
+def convert_meshes(
+    meshes: Iterable[AssetMesh], max_workers: int | None = None
+) -> None:
+    """Convert all pending `UniversalMesh` objects concurrently.
+
+    Meshes that are already converted or found in their cache are skipped,
+    and meshes sharing a cache key are converted only once. Meshes of other
+    types are ignored, so you can pass all meshes of your palette.
+
+    Args:
+        meshes (Iterable[AssetMesh]): The meshes to convert
+        max_workers (int | None, optional): The maximum number of worker threads. Defaults to None.
+    """
+    pending: dict[str | int, list[UniversalMesh]] = {}
+    for mesh in meshes:
+        if not isinstance(mesh, UniversalMesh) or mesh._usd_path is not None:
+            continue
+        key = mesh._cache_key()
+        if key is not None and mesh.cache is not None:
+            cached = mesh.cache.lookup(key, mesh.path)
+            if cached is not None:
+                mesh._usd_path = cached
+                continue
+        pending.setdefault(id(mesh) if key is None else key, []).append(mesh)
+
+    if not pending:
+        return
+
+    logger.debug(f"Converting {len(pending)} meshes")
+    with ThreadPoolExecutor(max_workers, initializer=_init_worker) as pool:
+        paths = list(
+            pool.map(lambda group: group[0].convert(), pending.values())
+        )
+    for group, path in zip(pending.values(), paths):
+        for mesh in group[1:]:
+            mesh._usd_path = path
+
+
 def instancable(cls: type[AssetMesh]) -> type[AssetMesh]:
     """Decorator to make the assets work as instancables
 
@@ -99,18 +219,28 @@ def instancable(cls: type[AssetMesh]) -> type[AssetMesh]:
     class _instancable(cls):
         spawner = None
 
-        def to_cfg(self, **kwargs: Any) -> SpawnerCfg:
+        def to_cfg(self, **kwargs: Any) -> "SpawnerCfg":
             if self.spawner is None:
                 self.spawner = cls.to_cfg(self, **kwargs)
             elif kwargs:
                 logger.warning("Ignoring additional keyword arguments")
             return self.spawner
 
+        def __getstate__(self) -> dict[str, Any]:
+            # the cached spawner holds closures, which can't be pickled
+            state = self.__dict__.copy()
+            state.pop("spawner", None)
+            return state
+
+    # make the decorated class picklable under the original name
+    _instancable.__name__ = cls.__name__
+    _instancable.__qualname__ = cls.__qualname__
+    _instancable.__module__ = cls.__module__
     return _instancable
 
 
 def apply_semantics(
-    prim: Prim, type: str, value: str  # pyright: ignore[reportUnknownParameterType]
+    prim: "Prim", type: str, value: str  # pyright: ignore[reportUnknownParameterType]
 ) -> None:
     """Applies a semantic type and data to a prim.
 
@@ -119,6 +249,8 @@ def apply_semantics(
         type (str): Label
         value (str): Value
     """
+    import isaacsim.core.utils.semantics as semantics_utils  # pyright: ignore[reportMissingImports]
+
     semantics_utils.add_update_semantics(prim, value, type)
 
 
@@ -130,15 +262,24 @@ class DynamicMesh(AssetMesh):
     """The Trimesh object that defines the mesh"""
     visual_material_path: str | None = None
     """Path to the visual material file, needed for MDL materials only"""
-    visual_material: VisualMaterialCfg = field(default_factory=PreviewSurfaceCfg)
-    """The visual material configuration for the mesh"""
-    physics_material: RigidBodyMaterialCfg = field(default_factory=RigidBodyMaterialCfg)
-    """The physics material configuration for the mesh"""
+    visual_material: "VisualMaterialCfg | None" = None
+    """The visual material configuration for the mesh, defaults to a
+    `PreviewSurfaceCfg`"""
+    physics_material: "RigidBodyMaterialCfg | None" = None
+    """The physics material configuration for the mesh, defaults to a
+    `RigidBodyMaterialCfg`"""
+    collision_lod: CollisionLOD | None = None
+    """If set, collisions use a simplified version of the mesh, spawned as
+    a prim of its own, while the renderer keeps the full mesh"""
+    share_materials: bool = True
+    """Whether the materials are spawned once per stage and shared by all
+    meshes with the same materials (see `MaterialRegistry`), instead of
+    being spawned beneath each prim"""
 
     # inspiration:
     # https://github.com/isaac-sim/IsaacLab/blob/963b53b96bc6140670fa0fe41d9fbafa68d8382f/source/isaaclab/isaaclab/terrains/utils.py#L61
 
-    def to_cfg(self, **kwargs: Any) -> SpawnerCfg:
+    def to_cfg(self, **kwargs: Any) -> "SpawnerCfg":
         """Converts the dynamic mesh to a SpawnerCfg object
 
         Args:
@@ -147,23 +288,63 @@ class DynamicMesh(AssetMesh):
         Returns:
             SpawnerCfg: A SpawnerCfg object representing the dynamic mesh
         """
+        import isaacsim.core.utils.prims as prim_utils  # pyright: ignore[reportMissingImports]
+        from isaaclab.sim.spawners import (
+            MdlFileCfg,
+            PreviewSurfaceCfg,
+            RigidBodyMaterialCfg,
+            SpawnerCfg,
+        )
+        from isaaclab.terrains.utils import create_prim_from_mesh
+
         logger.debug("Creating dynamic mesh cfg")
 
         if self.visual_material_path:
-            self.visual_material = MdlFileCfg(mdl_path=self.visual_material_path)
-
+            if (
+                getattr(self.visual_material, "mdl_path", None)
+                != self.visual_material_path
+            ):
+                self.visual_material = MdlFileCfg(
+                    mdl_path=self.visual_material_path
+                )
+        elif self.visual_material is None:
+            self.visual_material = PreviewSurfaceCfg()
+        if self.physics_material is None:
+            self.physics_material = RigidBodyMaterialCfg()
+
+        @profiled("DynamicMesh.spawn", triangles=len(self.mesh.faces))
         def func_wrapper(  # pyright: ignore[reportUnknownParameterType]
             prim: str, cfg: SpawnerCfg, *args: Any, **kwargs: Any
-        ) -> Prim:
-            create_prim_from_mesh(
-                prim,
-                self.mesh,
-                visual_material=self.visual_material,
-                physics_material=self.physics_material,
-                *args,
-                **kwargs,
-            )
-            p: Prim = prim_utils.get_prim_at_path(prim)
+        ) -> "Prim":
+            physics_material = f"{prim}/physicsMaterial"
+            if self.share_materials:
+                create_prim_from_mesh(prim, self.mesh, *args, **kwargs)
+                shared_materials.bind_visual(
+                    f"{prim}/mesh", self.visual_material
+                )
+                physics_material = shared_materials.bind_physics(
+                    f"{prim}/mesh", self.physics_material
+                )
+            else:
+                create_prim_from_mesh(
+                    prim,
+                    self.mesh,
+                    visual_material=self.visual_material,
+                    physics_material=self.physics_material,
+                    *args,
+                    **kwargs,
+                )
+            p: "Prim" = prim_utils.get_prim_at_path(prim)
+            if self.collision_lod is not None:
+                from .bake import set_collision_mesh
+
+                set_collision_mesh(
+                    p.GetStage().GetEditTarget().GetLayer(),
+                    prim,
+                    self.mesh,
+                    self.collision_lod,
+                    physics_material,
+                )
             if cfg.semantic_tags is not None:
                 for tag, value in cfg.semantic_tags:
                     apply_semantics(p, tag, value)
@@ -0,0 +1,270 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from logging import getLogger
+from typing import Literal, TypeVar
+
+import numpy as np
+
+from .asset import AssetInstance, AssetInstanceBatch, SceneAsset
+from .placement import drop_to_surface
+from .spawn import bounding_boxes
+from .terrain import TerrainInstance
+
+logger = getLogger(__name__)
+
+A = TypeVar("A", bound=SceneAsset | AssetInstanceBatch)
+
+
+def _pairs_within_groups(
+    keys: np.ndarray, values: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """All pairs of values sharing a key, each pair once per shared key"""
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    values = values[order]
+    ends = np.searchsorted(keys, keys, side="right")
+    # each value pairs with the values after it, up to the end of its group
+    counts = ends - np.arange(len(keys)) - 1
+    first = np.repeat(np.arange(len(keys)), counts)
+    starts = np.cumsum(counts) - counts
+    second = np.arange(counts.sum()) - np.repeat(starts, counts) + first + 1
+    return values[first], values[second]
+
+
+def find_overlaps(
+    boxes: np.ndarray,
+    groups: np.ndarray | None = None,
+    margin: float = 0.0,
+    cell_size: float | None = None,
+) -> np.ndarray:
+    """Find the pairs of overlapping bounding boxes
+
+    The boxes are hashed into a uniform grid of the horizontal plane, and
+    only the boxes sharing a cell are tested against each other, so for
+    boxes of similar size spread over a terrain, this takes near-linear
+    time. Boxes larger than the cells are inserted into every cell they
+    cover.
+
+    Args:
+        boxes (np.ndarray): The boxes as (min x, min y, min z, max x, max y, max z), of shape (N, 6), see `bounding_boxes`
+        groups (np.ndarray | None, optional): A group id for each box, boxes of the same group are never reported. Defaults to None.
+        margin (float, optional): The clearance required between the boxes in meters. Defaults to 0.0.
+        cell_size (float | None, optional): The size of the grid cells in meters. Defaults to None, meaning the median horizontal extent of the boxes.
+
+    Returns:
+        np.ndarray: The indices of the overlapping boxes, of shape (M, 2), with the lower index first, sorted
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+    if len(boxes) < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+    lower = boxes[:, :3] - margin / 2
+    upper = boxes[:, 3:] + margin / 2
+    if cell_size is None:
+        extent = (upper[:, :2] - lower[:, :2]).max(axis=1)
+        cell_size = max(float(np.median(extent)), 1e-6)
+
+    first_cell = np.floor(lower[:, :2] / cell_size).astype(np.int64)
+    last_cell = np.floor(upper[:, :2] / cell_size).astype(np.int64)
+    span = last_cell - first_cell + 1
+    counts = span[:, 0] * span[:, 1]
+    owners = np.repeat(np.arange(len(boxes)), counts)
+    local = np.arange(counts.sum()) - np.repeat(
+        np.cumsum(counts) - counts, counts
+    )
+    cells = first_cell[owners] + np.stack(
+        [local % span[owners, 0], local // span[owners, 0]], axis=1
+    )
+    cells -= cells.min(axis=0)
+    keys = cells[:, 0] * (int(cells[:, 1].max()) + 1) + cells[:, 1]
+
+    a, b = _pairs_within_groups(keys, owners)
+    keep = ((lower[a] < upper[b]) & (lower[b] < upper[a])).all(axis=1)
+    if groups is not None:
+        groups = np.asarray(groups)
+        keep &= groups[a] != groups[b]
+    pairs = np.stack([np.minimum(a, b), np.maximum(a, b)], axis=1)[keep]
+    return np.unique(pairs, axis=0)
+
+
+def _losers(pairs: np.ndarray, rank: np.ndarray) -> np.ndarray:
+    """Greedily pick the instances to remove, so that no pair overlaps,
+    keeping the instances of the lowest rank first"""
+    losers = np.zeros(len(rank), dtype=bool)
+    if len(pairs) == 0:
+        return losers
+    a = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    b = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    order = np.argsort(a, kind="stable")
+    a = a[order]
+    b = b[order]
+    involved = np.unique(a)
+    starts = np.searchsorted(a, involved)
+    ends = np.searchsorted(a, involved, side="right")
+    for k in np.argsort(rank[involved], kind="stable").tolist():
+        i = involved[k]
+        neighbors = b[starts[k] : ends[k]]
+        if np.any(~losers[neighbors] & (rank[neighbors] < rank[i])):
+            losers[i] = True
+    return losers
+
+
+def _surface_heights(terrain: TerrainInstance, xy: np.ndarray) -> np.ndarray:
+    """The height of the terrain surface at the points, NaN if missed"""
+    positions, _, index = drop_to_surface(terrain, xy, align=False)
+    res = np.full(len(xy), np.nan)
+    res[index] = positions[:, 2]
+    return res
+
+
+@dataclass(frozen=True)
+class OverlapPolicy:
+    """How overlapping asset instances from different asset specifications
+    are resolved, see `resolve_overlaps`
+
+    The instances are compared by the bounding boxes of their meshes,
+    transformed by their poses, see `bounding_boxes`.
+    """
+
+    action: Literal["drop", "jitter", "report"] = "drop"
+    """What's done with every overlapping pair. `drop` removes the instance
+    of the lower `AssetSpec.priority` (the later generated one among equal
+    priorities), `jitter` first moves it to a random spot nearby, dropping
+    it only if it still overlaps after `attempts` tries, and `report` only
+    logs the overlaps"""
+    margin: float = 0.0
+    """The clearance required between the bounding boxes in meters"""
+    within_spec: bool = False
+    """Whether the instances of the same asset specification are checked
+    against each other too, by default each specification is trusted to
+    space its own instances"""
+    distance: float = 1.0
+    """The largest horizontal distance an instance is moved per try by
+    `jitter`, in meters"""
+    attempts: int = 5
+    """The number of tries of `jitter`"""
+    default_extent: float = 0.5
+    """Half of the size of meshes whose geometry isn't known, like USD
+    files"""
+
+    def __post_init__(self):
+        if self.action not in ("drop", "jitter", "report"):
+            raise ValueError(f"Unknown overlap action {self.action}")
+        if self.margin < 0.0 or self.distance <= 0.0:
+            raise ValueError("The margin and the distance must be positive")
+        if self.attempts < 1:
+            raise ValueError("At least one attempt is required")
+
+
+def resolve_overlaps(
+    assets: Sequence[A],
+    policy: OverlapPolicy,
+    terrain: TerrainInstance | None = None,
+    seed: int | np.random.Generator | None = None,
+) -> list[A]:
+    """Detect and resolve the overlaps between the instances of a scene,
+    across all of its asset specifications, see `OverlapPolicy`
+
+    Args:
+        assets (Sequence[A]): The generated assets, in the order of generation
+        policy (OverlapPolicy): How the overlaps are resolved
+        terrain (TerrainInstance | None, optional): The terrain, if given, moved instances keep their height above its surface. Defaults to None.
+        seed (int | np.random.Generator | None, optional): The seed of the moves. Defaults to None.
+
+    Returns:
+        list[A]: The assets, with moved instances replaced by copies and removed instances left out, batches are copied as well
+    """
+    instances = [
+        a for a in assets if isinstance(a, (AssetInstance, AssetInstanceBatch))
+    ]
+    counts = [
+        len(a) if isinstance(a, AssetInstanceBatch) else 1 for a in instances
+    ]
+    names: dict[str | None, int] = {}
+    groups = np.repeat(
+        [
+            names.setdefault(
+                None if a.asset_class is None else a.asset_class.name,
+                len(names),
+            )
+            for a in instances
+        ],
+        counts,
+    ).astype(np.int64)
+    priority = np.repeat(
+        [
+            0 if a.asset_class is None else a.asset_class.priority
+            for a in instances
+        ],
+        counts,
+    ).astype(np.int64)
+    boxes = bounding_boxes(instances, policy.default_extent)
+    rank = np.empty(len(boxes), dtype=np.int64)
+    rank[np.lexsort((np.arange(len(boxes)), -priority))] = np.arange(len(boxes))
+
+    spec_groups = None if policy.within_spec else groups
+    pairs = find_overlaps(boxes, spec_groups, policy.margin)
+    if len(pairs) == 0:
+        return list(assets)
+    if policy.action == "report":
+        spec_names = list(names)
+        found: dict[tuple[str | None, str | None], int] = {}
+        for i, j in groups[pairs].tolist():
+            key = (spec_names[i], spec_names[j])
+            found[key] = found.get(key, 0) + 1
+        logger.warning(
+            f"Found {len(pairs)} overlapping pairs of instances: "
+            + ", ".join(f"{a} and {b} {n}x" for (a, b), n in found.items())
+        )
+        return list(assets)
+
+    losers = _losers(pairs, rank)
+    offsets = np.zeros((len(boxes), 3))
+    if policy.action == "jitter":
+        rng = np.random.default_rng(seed)
+        for _ in range(policy.attempts):
+            moving = np.flatnonzero(losers)
+            if len(moving) == 0:
+                break
+            angle = rng.uniform(0.0, 2 * np.pi, len(moving))
+            radius = policy.distance * np.sqrt(rng.uniform(size=len(moving)))
+            step = np.zeros((len(moving), 3))
+            step[:, 0] = radius * np.cos(angle)
+            step[:, 1] = radius * np.sin(angle)
+            if terrain is not None:
+                center = (boxes[moving, :2] + boxes[moving, 3:5]) / 2
+                before = _surface_heights(terrain, center)
+                after = _surface_heights(terrain, center + step[:, :2])
+                step[:, 2] = np.nan_to_num(after - before)
+            offsets[moving] += step
+            boxes[moving, :3] += step
+            boxes[moving, 3:] += step
+            pairs = find_overlaps(boxes, spec_groups, policy.margin)
+            losers = _losers(pairs, rank)
+    moved = np.any(offsets != 0.0, axis=1) & ~losers
+    logger.info(
+        f"Resolved overlaps, moved {int(moved.sum())} and dropped "
+        f"{int(losers.sum())} instances"
+    )
+
+    res: list[A] = []
+    start = 0
+    for asset in assets:
+        if isinstance(asset, AssetInstanceBatch):
+            rows = slice(start, start + len(asset))
+            start += len(asset)
+            positions = asset.positions + offsets[rows] * moved[rows, None]
+            res.append(
+                replace(asset, positions=positions).select(~losers[rows])
+            )
+        elif isinstance(asset, AssetInstance):
+            i = start
+            start += 1
+            if losers[i]:
+                continue
+            if moved[i]:
+                position = np.add(asset.position, offsets[i]).tolist()
+                asset = replace(asset, position=tuple(position))
+            res.append(asset)
+        else:
+            res.append(asset)
+    return res
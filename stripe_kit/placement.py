@@ -0,0 +1,509 @@
+from collections.abc import Callable
+from logging import getLogger
+from math import ceil, pi, sqrt
+from typing import TYPE_CHECKING
+
+import numpy as np
+from trimesh import Trimesh
+
+from .asset import AssetInstanceBatch, IdenticalAssetSpec
+from .heightfield import HeightfieldTerrain
+from .mesh import AssetMesh
+from .terrain import TerrainInstance
+
+if TYPE_CHECKING:
+    from isaaclab.assets import AssetBaseCfg
+
+logger = getLogger(__name__)
+
+Density = Callable[[np.ndarray], np.ndarray] | np.ndarray
+"""Probability of keeping a point, either as a function of an array of
+points of shape (N, 2), or as a grid spanning the terrain, rows along the y
+axis"""
+
+# the 5x5 block of grid cells that can hold points closer than the radius
+_NEIGHBOURS = np.stack(
+    np.meshgrid(np.arange(-2, 3), np.arange(-2, 3), indexing="ij")
+).reshape(2, -1)
+
+
+def _evaluate_density(
+    density: Density, points: np.ndarray, size: tuple[float, float]
+) -> np.ndarray:
+    if callable(density):
+        return np.asarray(density(points), dtype=np.float64)
+    rows, cols = density.shape
+    i = np.minimum((points[:, 1] / size[1] * rows).astype(np.intp), rows - 1)
+    j = np.minimum((points[:, 0] / size[0] * cols).astype(np.intp), cols - 1)
+    return density[i, j]
+
+
+def poisson_disk_sample(
+    size: tuple[float, float],
+    radius: float,
+    seed: int | np.random.Generator | None = None,
+    density: Density | None = None,
+    k: int = 30,
+) -> np.ndarray:
+    """Sample points over `[0, size[0]] x [0, size[1]]`, no two of them
+    closer than `radius`, using a variant of Bridson's algorithm.
+
+    The points are kept in a uniform grid with cells small enough to hold at
+    most one point, so each candidate is only checked against a constant
+    number of neighbours, and the sampling time is linear in the number of
+    points. The whole front of active points is advanced at once, so the
+    work is done in array operations. If a density is given, the points are
+    thinned out afterwards, which keeps the minimum distance.
+
+    Args:
+        size (tuple[float, float]): The size of the sampled area
+        radius (float): The minimum distance between the points
+        seed (int | np.random.Generator | None, optional): The seed or the generator to use. Defaults to None.
+        density (Density | None, optional): The probability of keeping each point. Defaults to None.
+        k (int, optional): The number of failed candidates around a point, before it's retired. Defaults to 30.
+
+    Returns:
+        np.ndarray: The points, of shape (N, 2)
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    cell = radius / sqrt(2)
+    rows = ceil(height / cell)
+    cols = ceil(width / cell)
+    # padded, so that the neighbours of any cell are within bounds
+    grid = np.full((rows + 4, cols + 4), -1, dtype=np.intp)
+    # the candidates of the current round
+    pending = np.full_like(grid, -1)
+    points = np.zeros((rows * cols + 1, 2))
+    r2 = radius * radius
+
+    def cells(xy: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # points outside are clamped to the border, they're rejected anyway
+        i = np.clip(xy[:, 1] / cell, 0, rows - 1).astype(np.intp) + 2
+        j = np.clip(xy[:, 0] / cell, 0, cols - 1).astype(np.intp) + 2
+        return i, j
+
+    def far(
+        xy: np.ndarray,
+        table: np.ndarray,
+        coords: np.ndarray,
+        before: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Check that points are at least the radius away from the points
+        in the neighbouring cells of a grid, only the ones with an index
+        lower than `before` if given"""
+        i, j = cells(xy)
+        neighbours = table[
+            i[:, None] + _NEIGHBOURS[0], j[:, None] + _NEIGHBOURS[1]
+        ]
+        ignored = neighbours < 0
+        if before is not None:
+            ignored |= neighbours >= before[:, None]
+        d2 = ((coords[neighbours] - xy[:, None]) ** 2).sum(axis=2)
+        return (ignored | (d2 >= r2)).all(axis=1)
+
+    first = rng.uniform((0.0, 0.0), size)
+    points[0] = first
+    grid[cells(first[None])] = 0
+    n = 1
+    active = np.zeros(1, dtype=np.intp)
+
+    # All active points are advanced at once, each proposing a candidate
+    # per round, which is kept if it's far enough from the existing points.
+    # A point is retired after k failed candidates, like in Bridson's.
+    failures = np.zeros(1, dtype=np.intp)
+    while len(active):
+        u = rng.random((len(active), 2))
+        angle = 2 * pi * u[:, 0]
+        # uniformly distributed over the annulus between r and 2r
+        distance = radius * np.sqrt(1.0 + 3.0 * u[:, 1])
+        candidates = points[active] + distance[:, None] * np.stack(
+            [np.cos(angle), np.sin(angle)], axis=1
+        )
+        valid = (
+            (candidates[:, 0] >= 0)
+            & (candidates[:, 0] < width)
+            & (candidates[:, 1] >= 0)
+            & (candidates[:, 1] < height)
+        )
+        valid[valid] = far(candidates[valid], grid, points)
+        candidates = candidates[valid]
+        failures[~valid] += 1
+        alive = failures < k
+        active = active[alive]
+        failures = failures[alive]
+
+        # The candidates may still be too close to each other. Keeping one
+        # per cell, in random order, a candidate is accepted if it isn't
+        # too close to any preceding one. The rest are tried again later.
+        candidates = candidates[rng.permutation(len(candidates))]
+        i, j = cells(candidates)
+        _, first_in_cell = np.unique(i * (cols + 4) + j, return_index=True)
+        candidates = candidates[np.sort(first_in_cell)]
+        i, j = cells(candidates)
+        order = np.arange(len(candidates))
+        pending[i, j] = order
+        accepted = candidates[far(candidates, pending, candidates, order)]
+        pending[i, j] = -1
+
+        new = np.arange(n, n + len(accepted))
+        points[new] = accepted
+        grid[cells(accepted)] = new
+        active = np.concatenate([active, new])
+        failures = np.concatenate([failures, np.zeros_like(new)])
+        n += len(accepted)
+
+    res = points[:n]
+    if density is not None:
+        res = res[rng.random(n) < _evaluate_density(density, res, size)]
+    logger.debug(f"Sampled {len(res)} points with radius {radius}")
+    return res
+
+
+class SurfaceGrid:
+    """A uniform 2D grid over the triangles of a mesh, for casting many
+    vertical rays at once.
+
+    Each cell lists the triangles whose horizontal bounding box overlaps
+    it, in CSR format. A query gathers the candidate triangles of all
+    points, and intersects them with a single set of array operations.
+    """
+
+    def __init__(self, mesh: Trimesh, max_cells: int = 1024):
+        """Build the grid over a mesh
+
+        Args:
+            mesh (Trimesh): The mesh
+            max_cells (int, optional): The maximum number of cells along each axis. Defaults to 1024.
+        """
+        self.triangles = np.asarray(mesh.triangles)
+        self.normals = np.asarray(mesh.face_normals)
+        low = self.triangles[:, :, :2].min(axis=1)
+        high = self.triangles[:, :, :2].max(axis=1)
+        self.origin = low.min(axis=0)
+        extent = high.max(axis=0) - self.origin
+        # about the size of a typical triangle
+        self.cell = max(
+            float(np.median((high - low).max(axis=1))),
+            float(extent.max()) / max_cells,
+            1e-9,
+        )
+        self.shape = (extent // self.cell).astype(np.intp) + 1
+
+        first = ((low - self.origin) // self.cell).astype(np.intp)
+        span = ((high - self.origin) // self.cell).astype(np.intp) - first + 1
+        counts = span.prod(axis=1)
+        triangle_ids = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        width = span[triangle_ids, 0]
+        x = first[triangle_ids, 0] + local % width
+        y = first[triangle_ids, 1] + local // width
+        keys = y * self.shape[0] + x
+        order = np.argsort(keys, kind="stable")
+        self.triangle_ids = triangle_ids[order]
+        self.offsets = np.searchsorted(
+            keys[order], np.arange(self.shape.prod() + 1)
+        )
+        logger.debug(
+            f"Built surface grid of {self.shape} cells over {len(counts)} triangles"
+        )
+
+    def raycast(
+        self, xy: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cast rays straight down from above the mesh
+
+        Args:
+            xy (np.ndarray): The horizontal positions of the rays, of shape (N, 2)
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The indices of the rays that hit the mesh, the topmost hit locations and the indices of the hit faces
+        """
+        cell = np.floor((xy - self.origin) / self.cell).astype(np.intp)
+        inside = ((cell >= 0) & (cell < self.shape)).all(axis=1)
+        rays = np.flatnonzero(inside)
+        keys = cell[rays, 1] * self.shape[0] + cell[rays, 0]
+        start = self.offsets[keys]
+        counts = self.offsets[keys + 1] - start
+        local = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        ray_ids = np.repeat(rays, counts)
+        triangle_ids = self.triangle_ids[np.repeat(start, counts) + local]
+
+        # barycentric coordinates in the horizontal plane
+        a, b, c = np.moveaxis(self.triangles[triangle_ids], 1, 0)
+        e1 = b - a
+        e2 = c - a
+        p = xy[ray_ids] - a[:, :2]
+        det = e1[:, 0] * e2[:, 1] - e2[:, 0] * e1[:, 1]
+        # vertical triangles can't be hit
+        hit = np.abs(det) > 1e-12
+        det[~hit] = 1.0
+        u = (p[:, 0] * e2[:, 1] - e2[:, 0] * p[:, 1]) / det
+        v = (e1[:, 0] * p[:, 1] - p[:, 0] * e1[:, 1]) / det
+        eps = 1e-9
+        hit &= (u >= -eps) & (v >= -eps) & (u + v <= 1 + eps)
+        ray_ids = ray_ids[hit]
+        triangle_ids = triangle_ids[hit]
+        z = (a[:, 2] + u * e1[:, 2] + v * e2[:, 2])[hit]
+
+        # the topmost hit of each ray
+        order = np.lexsort((-z, ray_ids))
+        ray_ids = ray_ids[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = ray_ids[1:] != ray_ids[:-1]
+        index = ray_ids[first]
+        top = order[first]
+        locations = np.column_stack([xy[index], z[top]])
+        return index, locations, triangle_ids[top]
+
+
+def surface_grid(terrain: TerrainInstance) -> SurfaceGrid:
+    """Get the `SurfaceGrid` over the combined meshes of a terrain
+
+    Args:
+        terrain (TerrainInstance): The terrain
+
+    Returns:
+        SurfaceGrid: The grid, built once and kept on the terrain
+    """
+    return terrain.memoize(
+        "surface_grid", lambda: SurfaceGrid(terrain.combined_mesh())
+    )
+
+
+def _raycast(
+    terrain: TerrainInstance, xy: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    grid = surface_grid(terrain)
+    index, locations, faces = grid.raycast(xy)
+    return index, locations, grid.normals[faces]
+
+
+def surface_heights(terrain: TerrainInstance, xy: np.ndarray) -> np.ndarray:
+    """Get the height of the topmost terrain surface at many points
+
+    For a `HeightfieldTerrain` the grid is interpolated, otherwise rays are
+    cast downwards against the terrain meshes.
+
+    Args:
+        terrain (TerrainInstance): The terrain
+        xy (np.ndarray): The points, of shape (N, 2)
+
+    Returns:
+        np.ndarray: The heights, of shape (N,), NaN where there's no surface
+    """
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    if isinstance(terrain, HeightfieldTerrain):
+        return terrain.height_at(xy)
+
+    index, locations, _ = _raycast(terrain, xy)
+    heights = np.full(len(xy), np.nan)
+    heights[index] = locations[:, 2]
+    return heights
+
+
+def quat_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Multiply quaternions in the (w, x, y, z) convention, elementwise
+
+    Args:
+        a (np.ndarray): The left quaternions, of shape (N, 4) or (4,)
+        b (np.ndarray): The right quaternions, of shape (N, 4) or (4,)
+
+    Returns:
+        np.ndarray: The products, of shape (N, 4)
+    """
+    a = np.atleast_2d(a)
+    b = np.atleast_2d(b)
+    w1, x1, y1, z1 = a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+    w2, x2, y2, z2 = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    return np.stack(
+        [
+            w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+        ],
+        axis=1,
+    )
+
+
+def align_to_normals(normals: np.ndarray) -> np.ndarray:
+    """Get the shortest rotations turning the z axis onto the normals
+
+    Args:
+        normals (np.ndarray): The unit normals, of shape (N, 3), facing up
+
+    Returns:
+        np.ndarray: The rotations in the (w, x, y, z) convention, of shape (N, 4)
+    """
+    # half-way quaternion between (0, 0, 1) and n: (1 + n.z, z x n)
+    q = np.column_stack(
+        [
+            1.0 + normals[:, 2],
+            -normals[:, 1],
+            normals[:, 0],
+            np.zeros(len(normals)),
+        ]
+    )
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def yaw_rotations(yaw: np.ndarray) -> np.ndarray:
+    """Get rotations around the z axis
+
+    Args:
+        yaw (np.ndarray): The angles in radians, of shape (N,)
+
+    Returns:
+        np.ndarray: The rotations in the (w, x, y, z) convention, of shape (N, 4)
+    """
+    zeros = np.zeros_like(yaw)
+    return np.column_stack([np.cos(yaw / 2), zeros, zeros, np.sin(yaw / 2)])
+
+
+def drop_to_surface(
+    terrain: TerrainInstance,
+    xy: np.ndarray,
+    align: bool = True,
+    yaw: np.ndarray | float | None = None,
+    seed: int | np.random.Generator | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Place many assets on the topmost terrain surface at once
+
+    For a `HeightfieldTerrain` the grid is interpolated, otherwise a single
+    batched raycast is made against `TerrainInstance.combined_mesh`, using
+    a `SurfaceGrid` kept on the terrain. This handles overhangs, caves and
+    multiple meshes. The results can be passed
+    straight to `AssetSpec.create_batch`.
+
+    Args:
+        terrain (TerrainInstance): The terrain
+        xy (np.ndarray): The horizontal positions, of shape (N, 2)
+        align (bool, optional): Whether to align the up axis of the assets with the surface normal. Defaults to True.
+        yaw (np.ndarray | float | None, optional): The rotations around the up axis in radians. Defaults to None, meaning random.
+        seed (int | np.random.Generator | None, optional): The seed or the generator of the random yaw. Defaults to None.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The positions of shape (M, 3) and rotations in the (w, x, y, z) convention of shape (M, 4) of the M points that hit the surface, and their indices into `xy`
+    """
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    if isinstance(terrain, HeightfieldTerrain):
+        index = np.arange(len(xy))
+        positions = np.column_stack([xy, terrain.height_at(xy)])
+        normals = terrain.normal_at(xy) if align else None
+    else:
+        index, positions, normals = _raycast(terrain, xy)
+        # the rays may hit faces with flipped winding
+        normals = normals * np.sign(normals[:, 2:3] + 1e-12)
+
+    if yaw is None:
+        yaw = np.random.default_rng(seed).uniform(0.0, 2 * pi, len(index))
+    else:
+        yaw = np.broadcast_to(np.asarray(yaw, dtype=np.float64), len(xy))[index]
+    rotations = yaw_rotations(yaw)
+    if align:
+        assert normals is not None
+        rotations = quat_multiply(align_to_normals(normals), rotations)
+    return positions, rotations, index
+
+
+class PoissonDiskAssetSpec(IdenticalAssetSpec):
+    """An asset scattered over the whole terrain with blue noise, see
+    `poisson_disk_sample`, and placed on the terrain surface"""
+
+    def __init__(
+        self,
+        name: str,
+        mesh: AssetMesh,
+        radius: float,
+        density: Density | None = None,
+        seed: int | None = None,
+        asset_cfg_class: "type[AssetBaseCfg] | None" = None,
+        rotation: tuple[float, float, float, float] = (0, 0, 0, 1),
+        point_instancer: bool = False,
+        align: bool = False,
+        random_yaw: bool = False,
+        max_slope: float | None = None,
+        priority: int = 0,
+    ):
+        """Create a new PoissonDiskAssetSpec object
+
+        Args:
+            name (str): The name of the asset
+            mesh (AssetMesh): The mesh of the asset
+            radius (float): The minimum distance between the instances
+            density (Density | None, optional): The probability of keeping each instance, see `poisson_disk_sample`. Defaults to None.
+            seed (int | None, optional): The seed of the placement, combined with the seed of the scene, see `SceneSpec.generate_scene`. Defaults to None, meaning the placement only depends on the seed of the scene, or differs every time if that isn't set either.
+            asset_cfg_class (type[AssetBaseCfg] | None, optional): The configuration class for the asset. Defaults to None, meaning AssetBaseCfg.
+            rotation (tuple[float, float, float, float], optional): The rotation of all instances. Defaults to (0, 0, 0, 1).
+            point_instancer (bool, optional): Whether to spawn all instances as a single point instancer. Defaults to False.
+            align (bool, optional): Whether to align the instances with the surface normal, see `drop_to_surface`. Defaults to False.
+            random_yaw (bool, optional): Whether to rotate the instances randomly around the up axis. Defaults to False.
+            max_slope (float | None, optional): The maximum slope of the terrain beneath an instance in radians, see `TerrainAnalysis.traversable`. Defaults to None, meaning any slope.
+            priority (int, optional): The importance of the asset, see `AssetSpec.priority`. Defaults to 0.
+        """
+        super().__init__(
+            name, mesh, asset_cfg_class, rotation, point_instancer, priority
+        )
+        self.radius = radius
+        self.density = density
+        self.seed = seed
+        self.align = align
+        self.random_yaw = random_yaw
+        self.max_slope = max_slope
+
+    def _sample(
+        self, terrain: TerrainInstance, seed: int | np.random.Generator | None
+    ) -> np.ndarray:
+        xy = poisson_disk_sample(terrain.size, self.radius, seed, self.density)
+        if self.max_slope is not None:
+            analysis = terrain.analysis()
+            keep = analysis.sample(analysis.traversable(self.max_slope), xy)
+            xy = xy[keep]
+        return xy
+
+    def generate(self, terrain: TerrainInstance) -> AssetInstanceBatch:
+        """Generate instances of the asset to be placed on the terrain
+
+        Without `align` and `random_yaw`, this is the same as
+        `IdenticalAssetSpec.generate`, otherwise the instances are rotated
+        by `drop_to_surface`, on top of `rotation`.
+
+        Args:
+            terrain (TerrainInstance): The terrain to place the asset on
+
+        Returns:
+            AssetInstanceBatch: A batch of instances of the asset to be placed on the terrain
+        """
+        if not (self.align or self.random_yaw):
+            return super().generate(terrain)
+        rng = np.random.default_rng(self.seed)
+        xy = self._sample(terrain, rng)
+        positions, rotations, _ = drop_to_surface(
+            terrain,
+            xy,
+            self.align,
+            None if self.random_yaw else 0.0,
+            rng,
+        )
+        rotations = quat_multiply(rotations, np.asarray(self.rotation))
+        return self.create_identical_batch(positions, rotations)
+
+    def find_positions(self, terrain: TerrainInstance) -> np.ndarray:
+        """Sample the positions over the terrain, dropping the ones without
+        any terrain surface beneath
+
+        Args:
+            terrain (TerrainInstance): The terrain to place the asset on
+
+        Returns:
+            np.ndarray: The positions, of shape (N, 3)
+        """
+        xy = self._sample(terrain, self.seed)
+        z = surface_heights(terrain, xy)
+        found = ~np.isnan(z)
+        return np.column_stack([xy[found], z[found]])
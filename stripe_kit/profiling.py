@@ -0,0 +1,384 @@
+"""
+Profiling of the generation-to-spawn pipeline.
+
+The stages of the pipeline (terrain and asset generation, creating the
+configurations, building the scene and spawning it) are wrapped in spans,
+which record their wall and CPU time, along with counts like the number of
+instances or triangles. Spans are only recorded once `profiler.enabled` is
+set, otherwise they cost a single attribute check.
+
+Profiling is enabled at startup by the `STRIPE_KIT_PROFILE` environment
+variable. Set it to `1` to only collect the spans, or to a path ending with
+`.json` to also save them as a Chrome trace (viewable in Perfetto) and log a
+summary table when the process exits.
+
+Work done in worker processes is wrapped in `profiled_call`, which sends the
+spans recorded by the worker back along with its result, to be merged into
+the profiler of the main process with `Profiler.merge`.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field, replace
+from functools import wraps
+from logging import getLogger
+from multiprocessing import parent_process
+from typing import Any, TypeVar
+
+logger = getLogger(__name__)
+
+ENV_VAR = "STRIPE_KIT_PROFILE"
+
+F = TypeVar("F", bound=Callable[..., Any])
+T = TypeVar("T")
+
+
+@dataclass
+class Span:
+    """A timed stage of the pipeline"""
+
+    name: str
+    """The name of the stage, like `AssetSpec.generate`"""
+    label: str | None
+    """What the stage was run on, like the name of an asset specification"""
+    start: int
+    """The start of the span in nanoseconds, since the profiler was created"""
+    wall: int
+    """The wall time of the span in nanoseconds"""
+    cpu: int
+    """The CPU time of the process during the span in nanoseconds"""
+    thread: int
+    """The id of the thread the span was recorded on"""
+    counts: dict[str, int | float] = field(default_factory=dict)
+    """Counts recorded in the span, like `instances` or `triangles`"""
+    process: int | None = None
+    """The id of the worker process the span was recorded in, None for the
+    process of the profiler"""
+
+
+class _NullSpan:
+    """Stands in for spans while profiling is disabled"""
+
+    enabled = False
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def add(self, **counts: int | float) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    enabled = True
+
+    def __init__(
+        self,
+        profiler: "Profiler",
+        name: str,
+        label: str | None,
+        counts: dict[str, int | float],
+    ):
+        self.profiler = profiler
+        self.name = name
+        self.label = label
+        self.counts = counts
+
+    def __enter__(self) -> "_ActiveSpan":
+        self.cpu = time.process_time_ns()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        end = time.perf_counter_ns()
+        self.profiler.record(
+            Span(
+                self.name,
+                self.label,
+                self.start - self.profiler.origin,
+                end - self.start,
+                time.process_time_ns() - self.cpu,
+                threading.get_ident(),
+                self.counts,
+            )
+        )
+
+    def add(self, **counts: int | float) -> None:
+        """Add to the counts of the span
+
+        Args:
+            **counts (int | float): The amounts to add, by name
+        """
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+
+class Profiler:
+    """Records the spans of the pipeline, see the module documentation"""
+
+    def __init__(self, enabled: bool = False):
+        """Create a new Profiler object
+
+        Args:
+            enabled (bool, optional): Whether spans are recorded. Defaults to False.
+        """
+        self.enabled = enabled
+        self.spans: list[Span] = []
+        """The recorded spans, in the order they ended"""
+        self.origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def span(
+        self, name: str, label: str | None = None, **counts: int | float
+    ) -> _ActiveSpan | _NullSpan:
+        """Create a span, to be entered with a `with` statement
+
+        More counts may be added within the span, with its `add` method.
+        Counting that takes time should be guarded by the `enabled`
+        attribute of the span.
+
+        Args:
+            name (str): The name of the stage
+            label (str | None, optional): What the stage is run on. Defaults to None.
+            **counts (int | float): Initial counts of the span
+
+        Returns:
+            _ActiveSpan | _NullSpan: The span, which does nothing if profiling is disabled
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, label, counts)
+
+    def record(self, span: Span) -> None:
+        """Record a finished span
+
+        Args:
+            span (Span): The span
+        """
+        with self._lock:
+            self.spans.append(span)
+
+    def merge(self, spans: Iterable[Span]) -> None:
+        """Record the spans of a worker process, see `profiled_call`
+
+        Args:
+            spans (Iterable[Span]): The spans, starting at absolute `time.perf_counter_ns` values, which are shared by all processes of the machine
+        """
+        with self._lock:
+            self.spans.extend(
+                replace(span, start=span.start - self.origin) for span in spans
+            )
+
+    def clear(self) -> None:
+        """Drop all recorded spans"""
+        with self._lock:
+            self.spans.clear()
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Export the spans in the Chrome trace event format
+
+        Returns:
+            dict[str, Any]: The trace, to be saved as JSON
+        """
+        pid = os.getpid()
+        events: list[dict[str, Any]] = []
+        for span in self.spans:
+            args: dict[str, Any] = {"cpu_ms": span.cpu / 1e6, **span.counts}
+            if span.label is not None:
+                args["label"] = span.label
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "stripe_kit",
+                    "ph": "X",
+                    "ts": span.start / 1e3,
+                    "dur": span.wall / 1e3,
+                    "pid": pid if span.process is None else span.process,
+                    "tid": span.thread,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: str) -> None:
+        """Save the spans as a Chrome trace, see `chrome_trace`
+
+        Args:
+            path (str): Path to the JSON file
+        """
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        logger.debug(f"Saved {len(self.spans)} spans to {path}")
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Aggregate the spans by name and label
+
+        Returns:
+            list[dict[str, Any]]: A row per name and label, with the number of calls, the total wall and CPU time in seconds, and the summed counts, slowest first
+        """
+        rows: dict[tuple[str, str | None], dict[str, Any]] = {}
+        for span in self.spans:
+            row = rows.setdefault(
+                (span.name, span.label),
+                {
+                    "name": span.name,
+                    "label": span.label,
+                    "calls": 0,
+                    "wall": 0.0,
+                    "cpu": 0.0,
+                },
+            )
+            row["calls"] += 1
+            row["wall"] += span.wall / 1e9
+            row["cpu"] += span.cpu / 1e9
+            for key, value in span.counts.items():
+                row[key] = row.get(key, 0) + value
+        return sorted(rows.values(), key=lambda r: -r["wall"])
+
+    def summary_table(self) -> str:
+        """Format the `summary` as a text table
+
+        Returns:
+            str: The table
+        """
+        rows = self.summary()
+        counts = sorted(
+            {k for r in rows for k in r}
+            - {"name", "label", "calls", "wall", "cpu"}
+        )
+        header = ["stage", "calls", "wall [s]", "cpu [s]", *counts]
+        lines = [
+            [
+                (
+                    r["name"]
+                    if r["label"] is None
+                    else f"{r['name']} ({r['label']})"
+                ),
+                str(r["calls"]),
+                f"{r['wall']:.3f}",
+                f"{r['cpu']:.3f}",
+                *(_format_count(r.get(k)) for k in counts),
+            ]
+            for r in rows
+        ]
+        widths = [
+            max(len(line[i]) for line in [header, *lines])
+            for i in range(len(header))
+        ]
+        return "\n".join(
+            "  ".join(cell.ljust(width) for cell, width in zip(line, widths))
+            for line in [header, *lines]
+        )
+
+
+def _format_count(value: int | float | None) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:.3f}"
+    return str(int(value))
+
+
+def count_triangles(meshes: Iterable[Any]) -> int:
+    """Count the triangles of the dynamic meshes among some meshes
+
+    Args:
+        meshes (Iterable[Any]): The meshes, like `AssetMesh` or `Trimesh` objects
+
+    Returns:
+        int: The number of triangles, meshes without geometry count as none
+    """
+    res = 0
+    for mesh in meshes:
+        faces = getattr(getattr(mesh, "mesh", mesh), "faces", None)
+        if faces is not None:
+            res += len(faces)
+    return res
+
+
+profiler = Profiler(bool(os.environ.get(ENV_VAR)))
+"""The profiler of the pipeline"""
+
+
+def profiled(
+    name: str, label: str | None = None, **counts: int | float
+) -> Callable[[F], F]:
+    """Decorator wrapping every call of a function in a span of `profiler`
+
+    Args:
+        name (str): The name of the spans
+        label (str | None, optional): The label of the spans. Defaults to None.
+        **counts (int | float): Initial counts of each span
+
+    Returns:
+        Callable[[F], F]: The decorator
+    """
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with profiler.span(name, label, **counts):
+                return func(*args, **kwargs)
+
+        return wrapper  # pyright: ignore[reportReturnType]
+
+    return decorator
+
+
+def profiled_call(
+    enabled: bool, func: Callable[..., T], *args: Any
+) -> tuple[T, list[Span]]:
+    """Call a function in a worker process, collecting the spans it records
+
+    Meant to be submitted to a process pool, with `enabled` set to
+    `profiler.enabled` of the main process, which then records the returned
+    spans with `Profiler.merge`. Spans recorded by the worker outside of
+    this call are left out.
+
+    Args:
+        enabled (bool): Whether to record spans
+        func (Callable[..., T]): The function
+        *args (Any): The arguments of the function
+
+    Returns:
+        tuple[T, list[Span]]: The result of the function, and the spans it recorded, with absolute start times
+    """
+    if not enabled:
+        return func(*args), []
+    was_enabled = profiler.enabled
+    profiler.enabled = True
+    # forked workers inherit the spans of the main process
+    profiler.clear()
+    try:
+        res = func(*args)
+        spans = [
+            replace(
+                span,
+                start=span.start + profiler.origin,
+                process=os.getpid(),
+            )
+            for span in profiler.spans
+        ]
+    finally:
+        profiler.clear()
+        profiler.enabled = was_enabled
+    return res, spans
+
+
+def _save_at_exit(path: str) -> None:
+    profiler.save_chrome_trace(path)
+    logger.info(f"Profile of the pipeline:\n{profiler.summary_table()}")
+
+
+# worker processes inherit the variable, but only the main process saves
+if os.environ.get(ENV_VAR, "").endswith(".json") and parent_process() is None:
+    atexit.register(_save_at_exit, os.environ[ENV_VAR])
@@ -0,0 +1,138 @@
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from logging import getLogger
+from typing import Literal
+
+from trimesh import Trimesh
+
+from .asset import AssetInstance, AssetInstanceBatch, SceneAsset
+from .cache import BoundedCache, mesh_hash
+from .lod import require_decimation
+from .mesh import AssetMesh, DebugMesh, DynamicMesh
+
+logger = getLogger(__name__)
+
+PROXY_CACHE_SIZE = 1024
+
+_proxies: BoundedCache[tuple[str, "MeshProxy"], Trimesh] = BoundedCache(
+    PROXY_CACHE_SIZE
+)
+
+
+@dataclass(frozen=True)
+class MeshProxy:
+    """A cheap stand-in for the meshes of the assets, derived from each
+    mesh, for fast iteration runs or scenes over their `SceneBudget`
+
+    Unlike a unit cube, a proxy keeps the size, position and orientation of
+    its mesh, so collisions and sensors still see roughly the right
+    geometry. Meshes loaded from files have no geometry to derive a proxy
+    from, so they are replaced with a `DebugMesh` cube. The last `PROXY_CACHE_SIZE` proxies are cached by `mesh_hash`,
+    so meshes shared by many assets, or regenerated identically, are
+    simplified once, and identical
+    proxies are collapsed into a shared prototype by the factory, see
+    `GeometryRegistry`.
+    """
+
+    method: Literal["obb", "convex_hull", "decimate"] = "obb"
+    """How the proxy is derived. `obb` is the oriented bounding box of the
+    mesh, `convex_hull` its convex hull, and `decimate` uses quadric
+    decimation, which requires the `decimate` extra (the
+    `fast_simplification` package)"""
+    ratio: float = 0.1
+    """The fraction of the faces kept by `decimate`"""
+
+    def __post_init__(self):
+        if self.method not in ("obb", "convex_hull", "decimate"):
+            raise ValueError(f"Unknown proxy method {self.method}")
+        if not 0.0 < self.ratio <= 1.0:
+            raise ValueError("The ratio must be in (0, 1]")
+        if self.method == "decimate":
+            require_decimation()
+
+    def _simplify(self, mesh: Trimesh) -> Trimesh:
+        if self.method == "obb":
+            box = mesh.bounding_box_oriented
+            return Trimesh(box.vertices, box.faces, process=False)
+        if self.method == "convex_hull":
+            return mesh.convex_hull
+        face_count = max(int(len(mesh.faces) * self.ratio), 4)
+        if face_count >= len(mesh.faces):
+            return mesh
+        return mesh.simplify_quadric_decimation(face_count=face_count)
+
+    def simplify(self, mesh: Trimesh) -> Trimesh:
+        """Get the proxy of a mesh
+
+        Args:
+            mesh (Trimesh): The full mesh
+
+        Returns:
+            Trimesh: The proxy, computed once per geometry
+        """
+
+        def compute() -> Trimesh:
+            res = self._simplify(mesh)
+            logger.debug(
+                f"Created {self.method} proxy of {len(res.faces)} faces, "
+                f"from {len(mesh.faces)} faces"
+            )
+            return res
+
+        return _proxies.get((mesh_hash(mesh), self), compute)
+
+    def proxy_mesh(self, mesh: AssetMesh) -> AssetMesh:
+        """Create the proxy of an asset mesh
+
+        Args:
+            mesh (AssetMesh): The mesh
+
+        Returns:
+            AssetMesh: A dynamic mesh with the proxy geometry and the materials of the mesh, or a `DebugMesh` cube if the mesh is loaded from a file
+        """
+        if not isinstance(mesh, DynamicMesh):
+            logger.debug(f"Replacing {type(mesh).__name__} with a debug cube")
+            return DebugMesh()
+        return DynamicMesh(
+            self.simplify(mesh.mesh),
+            mesh.visual_material_path,
+            mesh.visual_material,
+            mesh.physics_material,
+            mesh.collision_lod,
+            mesh.share_materials,
+        )
+
+
+def proxy_assets(
+    proxy: MeshProxy,
+) -> Callable[
+    [SceneAsset | AssetInstanceBatch], SceneAsset | AssetInstanceBatch
+]:
+    """Create a function replacing the meshes of assets with their proxies
+
+    Meshes shared by several assets keep being shared by their proxies.
+
+    Args:
+        proxy (MeshProxy): How the proxies are derived
+
+    Returns:
+        Callable[[SceneAsset | AssetInstanceBatch], SceneAsset | AssetInstanceBatch]: The function, returning a copy of the asset or the asset itself if it has no mesh
+    """
+    # the meshes are kept alive, so that their ids aren't reused
+    proxies: dict[int, tuple[AssetMesh, AssetMesh]] = {}
+
+    def proxy_mesh(mesh: AssetMesh) -> AssetMesh:
+        if id(mesh) not in proxies:
+            proxies[id(mesh)] = (mesh, proxy.proxy_mesh(mesh))
+        return proxies[id(mesh)][1]
+
+    def apply(
+        asset: SceneAsset | AssetInstanceBatch,
+    ) -> SceneAsset | AssetInstanceBatch:
+        if isinstance(asset, AssetInstanceBatch):
+            return replace(asset, meshes=[proxy_mesh(m) for m in asset.meshes])
+        if isinstance(asset, AssetInstance):
+            return replace(asset, mesh=proxy_mesh(asset.mesh))
+        return asset
+
+    return apply
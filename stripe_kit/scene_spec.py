@@ -1,18 +1,43 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
 from dataclasses import dataclass, field
+from itertools import repeat
 from logging import getLogger
+from multiprocessing.context import BaseContext
+from typing import TYPE_CHECKING
 
-from isaaclab.assets import AssetBaseCfg
+import numpy as np
 
-from .asset import AssetSpec, DistantLightSpec, DomeLightSpec
-from .factory import SceneCfgFactory
-from .mesh import DebugMesh
+from .asset import (
+    AssetInstance,
+    AssetInstanceBatch,
+    AssetSpec,
+    DistantLightSpec,
+    DomeLightSpec,
+)
+from .cache import TerrainCache
+from .lod import CollisionLOD
+from .overlap import OverlapPolicy, resolve_overlaps
+from .profiling import count_triangles, profiled_call, profiler
+from .proxy import MeshProxy, proxy_assets
+from .stats import SceneBudget
 from .terrain import TerrainInstance
+from .tiling import TerrainPool
+
+if TYPE_CHECKING:
+    from isaaclab.assets import AssetBaseCfg
+
+    from .factory import (
+        SceneCfgFactory,
+        TiledSceneCfgFactory,
+        VariantSceneCfgFactory,
+    )
 
 logger = getLogger(__name__)
 
 
-def spawn_cfg(cfg: AssetBaseCfg) -> None:
+def spawn_cfg(cfg: "AssetBaseCfg") -> None:
     if cfg.spawn is not None:
         cfg.spawn.func(cfg.prim_path, cfg.spawn)
     else:
@@ -21,6 +46,57 @@ def spawn_cfg(cfg: AssetBaseCfg) -> None:
         )
 
 
+def _generate_variant(
+    spec: "SceneSpec", seed: int
+) -> tuple[TerrainInstance, list[AssetInstance | AssetInstanceBatch]]:
+    """Generate a single scene variant. Meant to be run in a worker process.
+
+    Args:
+        spec (SceneSpec): The scene specification
+        seed (int): The seed of the variant
+
+    Returns:
+        tuple[TerrainInstance, list[AssetInstance | AssetInstanceBatch]]: The generated terrain and assets
+    """
+    spec = copy(spec)
+    spec.seed = seed
+    return spec.generate_scene()
+
+
+def _generate_pool_terrain(
+    spec: "SceneSpec", seed: int, difficulty: float
+) -> TerrainInstance:
+    """Generate a single terrain of a pool. Meant to be run in a worker
+    process.
+
+    Args:
+        spec (SceneSpec): The scene specification
+        seed (int): The seed of the terrain
+        difficulty (float): The difficulty of the terrain
+
+    Returns:
+        TerrainInstance: The generated or cached terrain
+    """
+    spec = copy(spec)
+    spec.seed = seed
+    spec.difficulty = difficulty
+    return spec.generate_terrain()
+
+
+def _reseed(asset: AssetSpec, seed: int | None, index: int) -> AssetSpec:
+    """Derive the seed of an asset spec with a `seed` attribute, like
+    `PoissonDiskAssetSpec`, from the seed of the scene and the index of the
+    spec in the palette, so that each scene places the asset differently"""
+    if seed is None or not hasattr(asset, "seed"):
+        return asset
+    entropy = [seed, index] if asset.seed is None else [seed, index, asset.seed]
+    asset = copy(asset)
+    asset.seed = int(
+        np.random.SeedSequence(entropy).generate_state(1, np.uint64)[0]
+    )
+    return asset
+
+
 @dataclass
 class SceneSpec(ABC):
     """A specification for a scene to be generated.
@@ -53,6 +129,36 @@ class SceneSpec(ABC):
     distant_light: DistantLightSpec = field(default_factory=DistantLightSpec)
     dome_light: DomeLightSpec = field(default_factory=DomeLightSpec)
     """The light specification for the scene"""
+    seed: int | None = None
+    """The seed for scene generation. Your `generate` implementation should
+    derive all of its randomness from it, so that the results are
+    reproducible and can be cached. The seeds of the asset specs with a
+    `seed` attribute are derived from it as well, see `generate_scene`."""
+    cache: TerrainCache | None = field(default=None, compare=False, repr=False)
+    """Optional on-disk cache of generated terrains, see `generate_terrain`"""
+    num_variants: int = 1
+    """The number of independent scene variants to generate, when more than
+    one, `create_instance` delegates to `create_variants`"""
+    difficulty: float = 0.0
+    """The difficulty of the terrain between 0 and 1, your `generate`
+    implementation may scale the terrain by it, see `create_pool`"""
+    chunk_size: float | None = field(default=None, compare=False)
+    """If set, overrides `TerrainInstance.chunk_size` of the generated
+    terrains"""
+    collision_lod: CollisionLOD | None = field(default=None, compare=False)
+    """If set, overrides `TerrainInstance.collision_lod` of the generated
+    terrains"""
+    bake_path: str | None = field(default=None, compare=False)
+    """If set, `create_instance` bakes the scene into this USD file, or
+    reuses it if it was baked from the same scene, see
+    `SceneCfgFactory.bake`"""
+    overlaps: OverlapPolicy | None = field(default=None, compare=False)
+    """If set, overlaps between the instances of different asset
+    specifications are resolved by `generate_scene`, so in every variant,
+    see `resolve_overlaps`"""
+    budget: SceneBudget | None = field(default=None, compare=False)
+    """If set, `create_instance` checks the scene against it before it's
+    baked or spawned, see `SceneCfgFactory.apply_budget`"""
 
     def add_asset(self, asset: AssetSpec):
         """Add an asset to the scene palette.
@@ -80,32 +186,333 @@ class SceneSpec(ABC):
         """
         ...
 
+    def generate_terrain(self) -> TerrainInstance:
+        """Generate a terrain instance, utilizing the cache if one is set.
+
+        On a cache hit, `generate` isn't called at all. The cache key is
+        derived from the attributes of this object that affect the terrain,
+        including the seed, see `TerrainCache.key`. If an attribute can't be
+        hashed, the terrain isn't cached.
+
+        Returns:
+            TerrainInstance: The generated or cached terrain instance
+        """
+        with profiler.span(
+            "SceneSpec.generate_terrain", type(self).__name__
+        ) as span:
+            key = None
+            if self.cache is not None:
+                try:
+                    key = self.cache.key(self)
+                except TypeError as e:
+                    logger.warning(f"Not caching the terrain: {e}")
+            if key is None:
+                terrain = self.generate()
+            else:
+                terrain = self.cache.load(key)
+                if terrain is None:
+                    terrain = self.generate()
+                    self.cache.store(key, terrain)
+                else:
+                    span.add(cached=1)
+            if span.enabled:
+                span.add(triangles=count_triangles(m for m, _ in terrain.mesh))
+        if self.chunk_size is not None:
+            terrain.chunk_size = self.chunk_size
+        if self.collision_lod is not None:
+            terrain.collision_lod = self.collision_lod
+        return terrain
+
+    def generate_scene(
+        self,
+    ) -> tuple[TerrainInstance, list[AssetInstance | AssetInstanceBatch]]:
+        """Generate the terrain, and then the assets of the whole palette.
+
+        If `seed` is set, the asset specs with a `seed` attribute (like
+        `PoissonDiskAssetSpec`) are generated from copies, seeded by both
+        their own seed and the seed of the scene, so that variants and
+        swapped scenes don't share the placement of their assets. If
+        `overlaps` is set, the overlapping assets are then resolved, with
+        the seed of the scene.
+
+        Returns:
+            tuple[TerrainInstance, list[AssetInstance | AssetInstanceBatch]]: The generated terrain and assets
+        """
+        logger.debug("Generating terrain")
+        terrain = self.generate_terrain()
+        assets: list[AssetInstance | AssetInstanceBatch] = []
+        for k, asset in enumerate(self.palette):
+            asset = _reseed(asset, self.seed, k)
+            logger.debug(f"Generating asset {asset.name}")
+            with profiler.span("AssetSpec.generate", asset.name) as span:
+                generated = asset.generate(terrain)
+                if span.enabled:
+                    span.add(instances=len(generated))
+                    span.add(
+                        triangles=(
+                            count_triangles(
+                                generated.meshes[i] for i in generated.mesh_ids
+                            )
+                            if isinstance(generated, AssetInstanceBatch)
+                            else count_triangles(a.mesh for a in generated)
+                        )
+                    )
+            if isinstance(generated, AssetInstanceBatch):
+                assets.append(generated)
+            else:
+                assets.extend(generated)
+        if self.overlaps is not None:
+            with profiler.span("resolve_overlaps", type(self).__name__):
+                assets = resolve_overlaps(
+                    assets, self.overlaps, terrain, self.seed
+                )
+        return terrain, assets
+
+    def save_instance(self, path: str) -> None:
+        """Generate a scene and save it to a manifest file.
+
+        Doesn't require Isaac Sim, the scene can then be loaded on another
+        machine with `load_scene`.
+
+        Args:
+            path (str): Path to the manifest file
+        """
+        from .manifest import save_scene
+
+        terrain, assets = self.generate_scene()
+        save_scene(path, terrain, assets, [self.distant_light, self.dome_light])
+
+    def _to_factory(
+        self,
+        terrain: TerrainInstance,
+        assets: list[AssetInstance | AssetInstanceBatch],
+        num_envs: int,
+        env_spacing: float,
+        debug_models: bool | MeshProxy,
+        **kwargs: bool,
+    ) -> "SceneCfgFactory":
+        from .factory import SceneCfgFactory
+
+        factory = SceneCfgFactory(terrain, num_envs, env_spacing, **kwargs)
+        if debug_models is True:
+            debug_models = MeshProxy()
+        proxy = (
+            proxy_assets(debug_models)
+            if isinstance(debug_models, MeshProxy)
+            else None
+        )
+        for child in assets:
+            factory.add_asset(child if proxy is None else proxy(child))
+        return factory
+
     def create_instance(
-        self, num_envs: int = 1, env_spacing: float = 0.0, debug_models: bool = False, **kwargs: bool
-    ) -> SceneCfgFactory:
+        self,
+        num_envs: int = 1,
+        env_spacing: float = 0.0,
+        debug_models: bool | MeshProxy = False,
+        **kwargs: bool,
+    ) -> "SceneCfgFactory":
         """Create a SceneCfgFactory object from the SceneSpec object.
 
-        The default implementation, generates the terrain using the generate
-        method, and then generates the assets using the asset specifications
-        in the palette. The generated scene is then returned.
+        The default implementation, generates the terrain using the
+        `generate_terrain` method, and then generates the assets using the
+        asset specifications in the palette. The generated scene is then
+        returned. If `num_variants` is greater than one, `create_variants`
+        is used instead. If `budget` is set, the scene is checked against it,
+        and if `bake_path` is set, the scene is baked.
 
         Args:
             num_envs (int): The number of environments to generate
             env_spacing (float): The spacing between environments
+            debug_models (bool | MeshProxy): Whether to replace all asset meshes with proxies, derived as given, or as oriented bounding boxes if True, see `MeshProxy`
             **kwargs: Additional keyword arguments to pass to the SceneCfgFactory
 
         Returns:
             SceneCfgFactory: The SceneCfgFactory object
         """
-        logger.debug("Generating terrain")
-        terrain = self.generate()
-        factory = SceneCfgFactory(terrain, num_envs, env_spacing, **kwargs)
-        for asset in self.palette:
-            logger.debug(f"Generating asset {asset.name}")
-            for child in asset.generate(terrain):
-                if debug_models:
-                    child.mesh = DebugMesh()
-                factory.add_asset(child)
+        if self.num_variants > 1:
+            factory = self.create_variants(
+                self.num_variants,
+                num_envs,
+                env_spacing,
+                debug_models,
+                **kwargs,
+            )
+        else:
+            terrain, assets = self.generate_scene()
+            factory = self._to_factory(
+                terrain, assets, num_envs, env_spacing, debug_models, **kwargs
+            )
+            logger.debug("Adding light")
+            factory.add_asset(self.distant_light)
+            factory.add_asset(self.dome_light)
+        if self.budget is not None:
+            factory.apply_budget(self.budget)
+        if self.bake_path is not None:
+            factory.bake(self.bake_path, reuse=True)
+        return factory
+
+    def variant_seeds(self, num_variants: int) -> list[int]:
+        """Derive deterministic, independent seeds for scene variants
+
+        Args:
+            num_variants (int): The number of variants
+
+        Returns:
+            list[int]: A seed for each of the variants
+        """
+        sequence = np.random.SeedSequence(self.seed)
+        return [
+            int(child.generate_state(1)[0])
+            for child in sequence.spawn(num_variants)
+        ]
+
+    def create_variants(
+        self,
+        num_variants: int,
+        num_envs: int = 1,
+        env_spacing: float = 0.0,
+        debug_models: bool | MeshProxy = False,
+        max_workers: int | None = None,
+        variant_spacing: float = 0.0,
+        mp_context: BaseContext | None = None,
+        **kwargs: bool,
+    ) -> "VariantSceneCfgFactory":
+        """Generate multiple independent scene variants in parallel.
+
+        Each variant is generated by `generate_scene` in a separate worker
+        process, on a copy of this object with its own seed, see
+        `variant_seeds`. Thus, this object (and your subclass) must be
+        picklable. The generation side of this package doesn't import
+        Isaac Lab, so if your module doesn't either, the workers can be
+        started with the "spawn" context, which is the safer option in a
+        process running the simulator. The variants are then laid out on a grid, and the
+        environments are distributed among them in a round-robin fashion.
+
+        Args:
+            num_variants (int): The number of variants to generate
+            num_envs (int, optional): The number of environments. Defaults to 1.
+            env_spacing (float, optional): The spacing between environments. Defaults to 0.0.
+            debug_models (bool | MeshProxy, optional): Whether to replace all asset meshes with proxies, see `create_instance`. Defaults to False.
+            max_workers (int | None, optional): The maximum number of worker processes. Defaults to None, meaning the number of CPUs.
+            variant_spacing (float, optional): Additional spacing between variants on the grid. Defaults to 0.0.
+            mp_context (BaseContext | None, optional): Multiprocessing context used to start the workers. Defaults to None.
+            **kwargs: Additional keyword arguments to pass to the SceneCfgFactory
+
+        Returns:
+            VariantSceneCfgFactory: The factory of the combined scene
+        """
+        from .factory import VariantSceneCfgFactory
+
+        seeds = self.variant_seeds(num_variants)
+        logger.debug(f"Generating {num_variants} scene variants")
+        with ProcessPoolExecutor(max_workers, mp_context) as pool:
+            calls = list(
+                pool.map(
+                    profiled_call,
+                    repeat(profiler.enabled),
+                    repeat(_generate_variant),
+                    repeat(self),
+                    seeds,
+                )
+            )
+        profiler.merge(span for _, spans in calls for span in spans)
+        results = [result for result, _ in calls]
+        variants = [
+            self._to_factory(
+                terrain, assets, num_envs, env_spacing, debug_models, **kwargs
+            )
+            for terrain, assets in results
+        ]
+        factory = VariantSceneCfgFactory(
+            variants, num_envs, env_spacing, variant_spacing, **kwargs
+        )
+        logger.debug("Adding light")
+        factory.add_asset(self.distant_light)
+        factory.add_asset(self.dome_light)
+        return factory
+
+    def create_pool(
+        self,
+        num_levels: int,
+        per_level: int = 1,
+        max_workers: int | None = None,
+        mp_context: BaseContext | None = None,
+    ) -> TerrainPool:
+        """Generate a pool of terrains of increasing difficulty in parallel.
+
+        Each terrain is generated by `generate_terrain` in a separate worker
+        process, on a copy of this object with its own seed and
+        `difficulty`, so the cache is used if set. Only the terrains are
+        generated, not the assets.
+
+        Args:
+            num_levels (int): The number of difficulty levels
+            per_level (int, optional): The number of terrains per level. Defaults to 1.
+            max_workers (int | None, optional): The maximum number of worker processes. Defaults to None, meaning the number of CPUs.
+            mp_context (BaseContext | None, optional): Multiprocessing context used to start the workers. Defaults to None.
+
+        Returns:
+            TerrainPool: The pool of terrains
+        """
+        difficulties = [
+            (level + 0.5) / num_levels
+            for level in range(num_levels)
+            for _ in range(per_level)
+        ]
+        seeds = self.variant_seeds(len(difficulties))
+        logger.debug(f"Generating a pool of {len(difficulties)} terrains")
+        with ProcessPoolExecutor(max_workers, mp_context) as pool:
+            calls = list(
+                pool.map(
+                    profiled_call,
+                    repeat(profiler.enabled),
+                    repeat(_generate_pool_terrain),
+                    repeat(self),
+                    seeds,
+                    difficulties,
+                )
+            )
+        profiler.merge(span for _, spans in calls for span in spans)
+        return TerrainPool([terrain for terrain, _ in calls], difficulties)
+
+    def create_tiled(
+        self,
+        num_rows: int,
+        num_cols: int,
+        num_envs: int = 1,
+        env_spacing: float = 0.0,
+        per_level: int = 1,
+        max_workers: int | None = None,
+        mp_context: BaseContext | None = None,
+        **kwargs: bool,
+    ) -> "TiledSceneCfgFactory":
+        """Create a scene, where the environments are spread over a grid of
+        terrains of increasing difficulty, see `create_pool`.
+
+        Each row of the grid is a difficulty level. The scene has no assets
+        apart from the lights. To use it for training, override
+        `create_instance` to call this method.
+
+        Args:
+            num_rows (int): The number of rows, and thus difficulty levels
+            num_cols (int): The number of columns
+            num_envs (int, optional): The number of environments. Defaults to 1.
+            env_spacing (float, optional): The spacing between environments. Defaults to 0.0.
+            per_level (int, optional): The number of distinct terrains per level. Defaults to 1.
+            max_workers (int | None, optional): The maximum number of worker processes. Defaults to None, meaning the number of CPUs.
+            mp_context (BaseContext | None, optional): Multiprocessing context used to start the workers. Defaults to None.
+            **kwargs: Additional keyword arguments to pass to the SceneCfgFactory
+
+        Returns:
+            TiledSceneCfgFactory: The factory of the tiled scene
+        """
+        from .factory import TiledSceneCfgFactory
+
+        pool = self.create_pool(num_rows, per_level, max_workers, mp_context)
+        factory = TiledSceneCfgFactory(
+            pool, num_rows, num_cols, num_envs, env_spacing, **kwargs
+        )
         logger.debug("Adding light")
         factory.add_asset(self.distant_light)
         factory.add_asset(self.dome_light)
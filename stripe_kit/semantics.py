@@ -0,0 +1,96 @@
+from collections.abc import Iterable, Iterator
+from logging import getLogger
+
+import numpy as np
+
+from .mesh import apply_semantics
+
+logger = getLogger(__name__)
+
+
+class SemanticTable:
+    """A compact side table of per-prim semantic tags.
+
+    Tags are interned, so each distinct (type, value) pair is stored once,
+    and every prim only holds a list of tag ids. This allows spawners to be
+    shared between instances without ever modifying them, with the semantics
+    applied in a single pass after the whole scene has been spawned.
+    """
+
+    def __init__(self):
+        """Create a new, empty SemanticTable object"""
+        self.tags: list[tuple[str, str]] = []
+        """The table of interned tags"""
+        self.prims: list[str] = []
+        """The paths of the prims"""
+        self._tag_ids: dict[tuple[str, str], int] = {}
+        self._ids: list[int] = []
+        self._offsets: list[int] = [0]
+
+    def __len__(self) -> int:
+        return len(self.prims)
+
+    def intern(self, tag: tuple[str, str]) -> int:
+        """Get the id of a tag, adding it to the table if needed
+
+        Args:
+            tag (tuple[str, str]): The semantic type and value
+
+        Returns:
+            int: The id of the tag
+        """
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = self._tag_ids[tag] = len(self.tags)
+            self.tags.append(tag)
+        return tag_id
+
+    def add(self, prim_path: str, tags: Iterable[tuple[str, str]]) -> None:
+        """Add the tags of a prim to the table
+
+        Args:
+            prim_path (str): The path of the prim
+            tags (Iterable[tuple[str, str]]): The semantic types and values
+        """
+        self.prims.append(prim_path)
+        self._ids.extend(self.intern(tag) for tag in tags)
+        self._offsets.append(len(self._ids))
+
+    def extend(self, other: "SemanticTable", prefix: str = "") -> None:
+        """Add all entries of another table to this one
+
+        Args:
+            other (SemanticTable): The table to add
+            prefix (str, optional): Prefix to prepend to the prim paths. Defaults to "".
+        """
+        remap = [self.intern(tag) for tag in other.tags]
+        for prim, ids in zip(other.prims, other.ids()):
+            self.prims.append(prefix + prim)
+            self._ids.extend(remap[i] for i in ids)
+            self._offsets.append(len(self._ids))
+
+    def ids(self) -> Iterator[np.ndarray]:
+        """Iterate over the tag ids of each prim
+
+        Returns:
+            Iterator[np.ndarray]: The tag ids, in the order of `prims`
+        """
+        ids = np.asarray(self._ids, dtype=np.int32)
+        offsets = self._offsets
+        return (ids[offsets[i] : offsets[i + 1]] for i in range(len(self)))
+
+    def apply(self) -> None:
+        """Apply the semantic tags to the prims on the current stage"""
+        import isaacsim.core.utils.prims as prim_utils  # pyright: ignore[reportMissingImports]
+
+        logger.debug(f"Applying semantics to {len(self)} prims")
+        for prim_path, ids in zip(self.prims, self.ids()):
+            prim = prim_utils.get_prim_at_path(prim_path)
+            if not prim.IsValid():
+                logger.warning(
+                    f"Cannot apply semantics, no prim at {prim_path}"
+                )
+                continue
+            for i in ids:
+                tag, value = self.tags[i]
+                apply_semantics(prim, tag, value)
@@ -0,0 +1,281 @@
+from collections.abc import Iterable, Mapping, Sequence
+from logging import getLogger
+from math import radians
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from .asset import AssetInstance, AssetInstanceBatch, SceneAsset
+from .mesh import AssetMesh, DynamicMesh
+from .terrain import TerrainInstance
+
+if TYPE_CHECKING:
+    import torch
+
+logger = getLogger(__name__)
+
+_CORNERS = np.array(
+    [[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)], dtype=np.intp
+)
+
+
+def _mesh_bounds(mesh: AssetMesh, default_extent: float) -> np.ndarray:
+    """The local bounding box of a mesh, as (2, 3), or a cube of
+    `default_extent` for meshes whose geometry isn't known here"""
+    if isinstance(mesh, DynamicMesh):
+        return np.asarray(mesh.mesh.bounds, dtype=np.float64)
+    return np.array([[-default_extent] * 3, [default_extent] * 3])
+
+
+def _rotate(q: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Rotate vectors of shape (N, K, 3) by quaternions (w, x, y, z) of
+    shape (N, 4)"""
+    w = q[:, None, :1]
+    u = q[:, None, 1:]
+    t = 2 * np.cross(u, v)
+    return v + w * t + np.cross(u, t)
+
+
+def bounding_boxes(
+    assets: Iterable[SceneAsset | AssetInstanceBatch],
+    default_extent: float = 0.5,
+) -> np.ndarray:
+    """Get the bounding boxes of the assets placed in a scene
+
+    The boxes enclose the rotated bounding boxes of the meshes. Assets other
+    than asset instances, like lights, have no bounding box.
+
+    Args:
+        assets (Iterable[SceneAsset | AssetInstanceBatch]): The assets
+        default_extent (float, optional): Half of the size of meshes whose geometry isn't known, like USD files. Defaults to 0.5.
+
+    Returns:
+        np.ndarray: The boxes as (min x, min y, min z, max x, max y, max z), of shape (N, 6), in the order of the instances
+    """
+    positions: list[np.ndarray] = []
+    rotations: list[np.ndarray] = []
+    corners: list[np.ndarray] = []
+    for asset in assets:
+        if isinstance(asset, AssetInstanceBatch):
+            if len(asset) == 0:
+                continue
+            bounds = np.stack(
+                [_mesh_bounds(m, default_extent) for m in asset.meshes]
+            )
+            corners.append(bounds[:, _CORNERS, [0, 1, 2]][asset.mesh_ids])
+            positions.append(np.asarray(asset.positions, dtype=np.float64))
+            rotations.append(np.asarray(asset.rotations, dtype=np.float64))
+        elif isinstance(asset, AssetInstance):
+            bounds = _mesh_bounds(asset.mesh, default_extent)
+            corners.append(bounds[_CORNERS, [0, 1, 2]][None])
+            positions.append(np.array([asset.position], dtype=np.float64))
+            rotations.append(np.array([asset.rotation], dtype=np.float64))
+    if not positions:
+        return np.zeros((0, 6))
+
+    points = _rotate(np.concatenate(rotations), np.concatenate(corners))
+    points += np.concatenate(positions)[:, None, :]
+    return np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1)
+
+
+def footprints(
+    assets: Iterable[SceneAsset | AssetInstanceBatch],
+    default_extent: float = 0.5,
+) -> np.ndarray:
+    """Get the horizontal bounding boxes of the assets placed in a scene,
+    see `bounding_boxes`
+
+    Args:
+        assets (Iterable[SceneAsset | AssetInstanceBatch]): The assets
+        default_extent (float, optional): Half of the size of meshes whose geometry isn't known, like USD files. Defaults to 0.5.
+
+    Returns:
+        np.ndarray: The boxes as (min x, min y, max x, max y), of shape (N, 4)
+    """
+    return bounding_boxes(assets, default_extent)[:, [0, 1, 3, 4]]
+
+
+def _rasterize(
+    boxes: np.ndarray, shape: tuple[int, int], resolution: float
+) -> np.ndarray:
+    """Mark the cells overlapping any of the boxes, using a 2D prefix sum
+    instead of filling the boxes one by one"""
+    rows, cols = shape
+    # cells whose centers lie within the box
+    j0 = np.clip(np.ceil(boxes[:, 0] / resolution - 0.5), 0, cols)
+    i0 = np.clip(np.ceil(boxes[:, 1] / resolution - 0.5), 0, rows)
+    j1 = np.clip(np.floor(boxes[:, 2] / resolution - 0.5) + 1, 0, cols)
+    i1 = np.clip(np.floor(boxes[:, 3] / resolution - 0.5) + 1, 0, rows)
+    i0, j0, i1, j1 = (a.astype(np.intp) for a in (i0, j0, i1, j1))
+    valid = (i0 < i1) & (j0 < j1)
+    i0, j0, i1, j1 = i0[valid], j0[valid], i1[valid], j1[valid]
+
+    diff = np.zeros((rows + 1, cols + 1), dtype=np.int64)
+    np.add.at(diff, (i0, j0), 1)
+    np.add.at(diff, (i0, j1), -1)
+    np.add.at(diff, (i1, j0), -1)
+    np.add.at(diff, (i1, j1), 1)
+    return diff.cumsum(axis=0).cumsum(axis=1)[:rows, :cols] > 0
+
+
+def spawn_positions(
+    terrain: TerrainInstance,
+    assets: Iterable[SceneAsset | AssetInstanceBatch] = (),
+    resolution: float = 0.25,
+    max_slope: float = radians(20),
+    clearance: float = 0.5,
+    height: float = 0.0,
+    default_extent: float = 0.5,
+) -> np.ndarray:
+    """Find the positions on the terrain, where a robot may spawn
+
+    These are the centers of the cells of the terrain analysis (see
+    `TerrainInstance.analysis`), that are traversable and further than
+    `clearance` from the footprints of all assets.
+
+    Args:
+        terrain (TerrainInstance): The terrain
+        assets (Iterable[SceneAsset | AssetInstanceBatch], optional): The assets placed on the terrain. Defaults to no assets.
+        resolution (float, optional): The spacing of the positions in meters. Defaults to 0.25.
+        max_slope (float, optional): The maximum slope of the terrain in radians. Defaults to 20 degrees.
+        clearance (float, optional): The minimum horizontal distance from the assets in meters. Defaults to 0.5.
+        height (float, optional): The height of the positions above the surface. Defaults to 0.0.
+        default_extent (float, optional): Half of the size of assets whose geometry isn't known, see `footprints`. Defaults to 0.5.
+
+    Returns:
+        np.ndarray: The positions, of shape (N, 3)
+    """
+    analysis = terrain.analysis(resolution)
+    boxes = footprints(assets, default_extent)
+    boxes[:, :2] -= clearance
+    boxes[:, 2:] += clearance
+    valid = analysis.traversable(max_slope) & ~np.isnan(analysis.heights)
+    valid &= ~_rasterize(boxes, analysis.shape, resolution)
+
+    xy = analysis.points[valid]
+    z = analysis.heights[valid] + height
+    logger.debug(f"Found {len(xy)} spawn positions for {len(boxes)} assets")
+    return np.column_stack([xy, z])
+
+
+class SpawnPoseTable:
+    """A table of valid spawn positions, from which the poses of many robots
+    are sampled at once.
+
+    The positions are split into groups, and each environment samples from
+    its own group, for example the variant of the scene it's placed in. The
+    table lives in NumPy arrays, until it's moved to a torch device with
+    `to`, after which sampling is done entirely on that device.
+    """
+
+    def __init__(
+        self,
+        groups: Sequence[np.ndarray],
+        env_groups: np.ndarray | None = None,
+        random_yaw: bool = True,
+        seed: int | None = None,
+        spawn_options: Mapping[str, float] | None = None,
+    ):
+        """Create a new SpawnPoseTable object
+
+        Args:
+            groups (Sequence[np.ndarray]): The positions of each group, each of shape (N, 3) with N > 0
+            env_groups (np.ndarray | None, optional): The group of each environment. Defaults to None, meaning all environments sample from the first group.
+            random_yaw (bool, optional): Whether to rotate the robots randomly around the up axis. Defaults to True.
+            seed (int | None, optional): The seed of the sampling. Defaults to None.
+            spawn_options (Mapping[str, float] | None, optional): The options of `spawn_positions` the positions were found with, kept to rebuild the table for another scene. Defaults to None.
+
+        Raises:
+            ValueError: If any of the groups is empty
+        """
+        counts = np.array([len(g) for g in groups], dtype=np.int64)
+        if len(counts) == 0 or (counts == 0).any():
+            raise ValueError("Every group needs at least one spawn position")
+        self.positions: Any = np.concatenate(groups).astype(np.float32)
+        """The positions of all groups, of shape (N, 3)"""
+        self.offsets: Any = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        """The index of the first position of each group"""
+        self.counts: Any = counts
+        """The number of positions in each group"""
+        self.env_groups: Any = env_groups
+        """The group of each environment, or None"""
+        self.random_yaw = random_yaw
+        self.seed = seed
+        self.spawn_options: dict[str, float] = dict(spawn_options or {})
+        """The options of `spawn_positions` the positions were found with"""
+        self.device: str | None = None
+        """The torch device of the table, None while it's in NumPy arrays"""
+        self._rng: Any = np.random.default_rng(seed)
+
+    def to(self, device: str) -> "SpawnPoseTable":
+        """Move the table to a torch device
+
+        Args:
+            device (str): The device, like `cuda:0`
+
+        Returns:
+            SpawnPoseTable: This table
+        """
+        import torch
+
+        self.positions = torch.as_tensor(self.positions, device=device)
+        self.offsets = torch.as_tensor(self.offsets, device=device)
+        self.counts = torch.as_tensor(self.counts, device=device)
+        if self.env_groups is not None:
+            self.env_groups = torch.as_tensor(
+                self.env_groups, dtype=torch.long, device=device
+            )
+        self._rng = torch.Generator(device=device)
+        if self.seed is not None:
+            self._rng.manual_seed(self.seed)
+        else:
+            self._rng.seed()
+        self.device = device
+        return self
+
+    def _random(self, n: int) -> "np.ndarray | torch.Tensor":
+        if self.device is None:
+            return self._rng.random(n)
+        import torch
+
+        return torch.rand(n, generator=self._rng, device=self.device)
+
+    def sample_spawn_poses(
+        self, env_ids: "Sequence[int] | np.ndarray | torch.Tensor"
+    ) -> "tuple[np.ndarray, np.ndarray] | tuple[torch.Tensor, torch.Tensor]":
+        """Sample a spawn pose for each of the environments
+
+        Args:
+            env_ids (Sequence[int] | np.ndarray | torch.Tensor): The environments to sample for
+
+        Returns:
+            tuple[np.ndarray, np.ndarray] | tuple[torch.Tensor, torch.Tensor]: The positions of shape (N, 3) and the rotations (w, x, y, z) of shape (N, 4), as tensors on the device of the table, or NumPy arrays
+        """
+        n = len(env_ids)
+        if self.env_groups is None:
+            groups = 0
+        else:
+            if self.device is None:
+                env_ids = np.asarray(env_ids)
+            groups = self.env_groups[env_ids]
+
+        index = self._random(n) * self.counts[groups]
+        if self.device is None:
+            index = index.astype(np.int64)
+        else:
+            index = index.long()  # pyright: ignore[reportAttributeAccessIssue]
+        positions = self.positions[self.offsets[groups] + index]
+
+        half_yaw = self._random(n) * (np.pi if self.random_yaw else 0.0)
+        if self.device is None:
+            rotations = np.zeros((n, 4), dtype=np.float32)
+            rotations[:, 0] = np.cos(half_yaw)
+            rotations[:, 3] = np.sin(half_yaw)
+        else:
+            import torch
+
+            zeros = torch.zeros_like(half_yaw)
+            rotations = torch.stack(
+                [half_yaw.cos(), zeros, zeros, half_yaw.sin()], dim=1
+            )
+        return positions, rotations
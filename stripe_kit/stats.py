@@ -0,0 +1,238 @@
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Literal
+
+import numpy as np
+from trimesh import Trimesh
+
+from .asset import AssetInstance, AssetInstanceBatch, SceneAsset
+from .dedup import PrototypeMesh
+from .mesh import CLASS_TAG, AssetMesh, DynamicMesh
+from .proxy import MeshProxy
+from .terrain import TerrainInstance
+
+logger = getLogger(__name__)
+
+# a USD mesh holds a float3 point per vertex, and three indices and a vertex
+# count per triangle
+VERTEX_BYTES = 12
+FACE_BYTES = 16
+
+
+def mesh_memory(mesh: Trimesh) -> int:
+    """Estimate the memory of the vertex and index buffers of a mesh
+
+    Args:
+        mesh (Trimesh): The mesh
+
+    Returns:
+        int: The estimated size in bytes
+    """
+    return VERTEX_BYTES * len(mesh.vertices) + FACE_BYTES * len(mesh.faces)
+
+
+@dataclass
+class SceneStats:
+    """The complexity of a scene, computed before it's spawned, see
+    `scene_stats`"""
+
+    prims: int = 0
+    """The number of prims spawned for the terrain and the assets, not
+    counting the prims beneath them"""
+    unique_meshes: int = 0
+    """The number of meshes held by the stage"""
+    instanced_meshes: int = 0
+    """The number of prims reusing one of the unique meshes, as a prototype
+    or within a point instancer, instead of holding a copy of their own"""
+    terrain_triangles: int = 0
+    """The number of triangles of the terrain"""
+    asset_triangles: int = 0
+    """The number of triangles of all asset instances, meshes loaded from
+    files aren't counted"""
+    vertex_memory: int = 0
+    """The estimated memory of the vertex and index buffers of the unique
+    meshes in bytes, see `mesh_memory`"""
+    semantic_labels: int = 0
+    """The number of distinct semantic (type, value) pairs"""
+    instances: dict[str, int] = field(default_factory=dict)
+    """The number of instances of each asset specification, by name"""
+
+    @property
+    def triangles(self) -> int:
+        """The number of triangles of the terrain and the assets"""
+        return self.terrain_triangles + self.asset_triangles
+
+    def report(self) -> str:
+        """Format the stats as a text table
+
+        Returns:
+            str: The table, with a row per stat and per asset specification
+        """
+        rows = [
+            ("prims", f"{self.prims}"),
+            ("unique meshes", f"{self.unique_meshes}"),
+            ("instanced meshes", f"{self.instanced_meshes}"),
+            ("terrain triangles", f"{self.terrain_triangles}"),
+            ("asset triangles", f"{self.asset_triangles}"),
+            ("vertex memory", f"{self.vertex_memory / 2**20:.1f} MiB"),
+            ("semantic labels", f"{self.semantic_labels}"),
+            *(
+                (f"instances of {name}", f"{count}")
+                for name, count in self.instances.items()
+            ),
+        ]
+        width = max(len(label) for label, _ in rows)
+        return "\n".join(
+            f"{label.ljust(width)}  {value}" for label, value in rows
+        )
+
+
+def scene_stats(
+    terrains: Iterable[TerrainInstance],
+    assets: Iterable[SceneAsset | AssetInstanceBatch],
+) -> SceneStats:
+    """Compute the stats of a scene, without creating any configuration
+
+    A dynamic mesh is held by the stage once per prim using it, unless it's
+    a prototype shared by several prims (see `GeometryRegistry`) or part of
+    a point instancer.
+    Meshes loaded from files are referenced, so they count once.
+
+    Args:
+        terrains (Iterable[TerrainInstance]): The terrains of the scene
+        assets (Iterable[SceneAsset | AssetInstanceBatch]): The assets of the scene, including lights
+
+    Returns:
+        SceneStats: The stats
+    """
+    stats = SceneStats()
+    labels: set[tuple[str, str]] = set()
+    shared: set[int] = set()
+
+    def use(mesh: AssetMesh, count: int, instanced: bool) -> None:
+        if isinstance(mesh, DynamicMesh):
+            stats.asset_triangles += count * len(mesh.mesh.faces)
+            if not (
+                instanced or isinstance(mesh, PrototypeMesh) and mesh.shared
+            ):
+                stats.unique_meshes += count
+                stats.vertex_memory += count * mesh_memory(mesh.mesh)
+                return
+        if id(mesh) in shared:
+            stats.instanced_meshes += count
+            return
+        shared.add(id(mesh))
+        stats.unique_meshes += 1
+        stats.instanced_meshes += count - 1
+        if isinstance(mesh, DynamicMesh):
+            stats.vertex_memory += mesh_memory(mesh.mesh)
+
+    for terrain in terrains:
+        for _, mesh, tags in terrain.chunks():
+            stats.prims += 1
+            stats.unique_meshes += 1
+            stats.terrain_triangles += len(mesh.faces)
+            stats.vertex_memory += mesh_memory(mesh)
+            labels.update(tags)
+
+    for asset in assets:
+        if isinstance(asset, AssetInstanceBatch):
+            counts = np.bincount(asset.mesh_ids, minlength=len(asset.meshes))
+            for mesh, count in zip(asset.meshes, counts.tolist()):
+                if count > 0:
+                    use(mesh, count, asset.point_instancer)
+                    if asset.point_instancer:
+                        stats.prims += 1
+            if not asset.point_instancer:
+                stats.prims += len(asset)
+            labels.update(asset.tag_table)
+            count = len(asset)
+        elif isinstance(asset, AssetInstance):
+            use(asset.mesh, 1, False)
+            stats.prims += 1
+            labels.update(asset.additional_tags.items())
+            count = 1
+        else:
+            stats.prims += 1
+            continue
+        if asset.asset_class is not None:
+            name = asset.asset_class.name
+            stats.instances[name] = stats.instances.get(name, 0) + count
+            labels.add((CLASS_TAG, name))
+
+    stats.semantic_labels = len(labels)
+    return stats
+
+
+@dataclass(frozen=True)
+class SceneBudget:
+    """Limits on the complexity of a scene, checked before it's spawned, see
+    `SceneCfgFactory.apply_budget`
+
+    Limits left unset aren't checked.
+    """
+
+    max_prims: int | None = None
+    """The maximum number of prims, see `SceneStats.prims`"""
+    max_unique_meshes: int | None = None
+    """The maximum number of meshes held by the stage"""
+    max_triangles: int | None = None
+    """The maximum number of triangles of the terrain and the assets"""
+    max_vertex_memory: int | None = None
+    """The maximum estimated memory of the vertex and index buffers in
+    bytes"""
+    max_semantic_labels: int | None = None
+    """The maximum number of distinct semantic labels"""
+    policy: Literal["raise", "warn", "degrade"] = "raise"
+    """What happens when the scene exceeds the budget. `raise` raises a
+    `ValueError`, `warn` only logs a warning, and `degrade` first replaces
+    the meshes of the asset specifications with proxies (if the triangles or
+    the memory are exceeded), then drops whole asset specifications, both in
+    the order of `AssetSpec.priority`, until the scene fits"""
+    proxy: MeshProxy | None = MeshProxy("convex_hull")
+    """How the proxy meshes are derived when degrading, None to only drop
+    asset specifications"""
+
+    def __post_init__(self):
+        if self.policy not in ("raise", "warn", "degrade"):
+            raise ValueError(f"Unknown budget policy {self.policy}")
+
+    def exceeded(self, stats: SceneStats) -> dict[str, tuple[int, int]]:
+        """Find the limits exceeded by a scene
+
+        Args:
+            stats (SceneStats): The stats of the scene
+
+        Returns:
+            dict[str, tuple[int, int]]: The value and the limit of each exceeded stat, by name
+        """
+        limits = {
+            "prims": (stats.prims, self.max_prims),
+            "unique_meshes": (stats.unique_meshes, self.max_unique_meshes),
+            "triangles": (stats.triangles, self.max_triangles),
+            "vertex_memory": (stats.vertex_memory, self.max_vertex_memory),
+            "semantic_labels": (
+                stats.semantic_labels,
+                self.max_semantic_labels,
+            ),
+        }
+        return {
+            name: (value, limit)
+            for name, (value, limit) in limits.items()
+            if limit is not None and value > limit
+        }
+
+
+def describe_exceeded(exceeded: dict[str, tuple[int, int]]) -> str:
+    """Describe the limits exceeded by a scene, see `SceneBudget.exceeded`
+
+    Args:
+        exceeded (dict[str, tuple[int, int]]): The exceeded stats
+
+    Returns:
+        str: A comma separated list of the stats, with their values and limits
+    """
+    return ", ".join(
+        f"{name} {value} > {limit}" for name, (value, limit) in exceeded.items()
+    )
@@ -1,22 +1,73 @@
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from logging import getLogger
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import numpy as np
-from isaaclab.assets import AssetBaseCfg
-from isaaclab.sim.spawners import PreviewSurfaceCfg
-from isaaclab.terrains import SubTerrainBaseCfg, TerrainGeneratorCfg
 
 # from pxr import Sdf, UsdShade
 from trimesh import Trimesh
+from trimesh.util import concatenate
 
 # from .materials import MaterialHandler
+from .lod import CollisionLOD
 from .mesh import DynamicMesh
 
+if TYPE_CHECKING:
+    from isaaclab.assets import AssetBaseCfg
+    from isaaclab.terrains import TerrainGeneratorCfg
+
+    from .analysis import TerrainAnalysis
+
 logger = getLogger(__name__)
 
+T = TypeVar("T")
+
 TERRAIN_NAME = "terrain"
 
 
+def chunk_mesh(
+    mesh: Trimesh, chunk_size: float
+) -> list[tuple[tuple[int, int], Trimesh]]:
+    """Split a mesh into square tiles of the horizontal plane
+
+    Each face goes to the tile containing its centroid, so the chunks don't
+    overlap, and faces crossing the tile borders aren't cut. The tiles start
+    at the lower corner of the bounds of the mesh.
+
+    Args:
+        mesh (Trimesh): The mesh to split
+        chunk_size (float): The size of the tiles in meters
+
+    Returns:
+        list[tuple[tuple[int, int], Trimesh]]: The index of each non-empty tile along x and y, and its chunk
+    """
+    faces = np.asarray(mesh.faces)
+    if len(faces) == 0:
+        return []
+    vertices = np.asarray(mesh.vertices)
+    centroids = vertices[faces].mean(axis=1)[:, :2]
+    corner = np.asarray(mesh.bounds)[0, :2]
+    tiles = np.floor((centroids - corner) / chunk_size).astype(np.int64)
+    rows = int(tiles[:, 1].max(initial=0)) + 1
+    keys = tiles[:, 0] * rows + tiles[:, 1]
+    order = np.argsort(keys, kind="stable")
+    unique, starts = np.unique(keys[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+
+    res: list[tuple[tuple[int, int], Trimesh]] = []
+    for key, start, end in zip(unique, starts, ends):
+        chunk_faces = faces[order[start:end]]
+        used, remapped = np.unique(chunk_faces, return_inverse=True)
+        chunk = Trimesh(
+            vertices=vertices[used],
+            faces=remapped.reshape(-1, 3),
+            process=False,
+        )
+        res.append(((int(key // rows), int(key % rows)), chunk))
+    return res
+
+
 @dataclass
 class TerrainInstance:
     """A specification for a terrain to be placed in a scene.
@@ -36,11 +87,99 @@ class TerrainInstance:
     """The size of the terrain in meters"""
     color: tuple[float, float, float]
     """The color of the terrain"""
-    material: str | None = None 
+    material: str | None = None
     """Path to the material mdl file"""
+    chunk_size: float | None = None
+    """If set, the meshes are spawned split into square chunks of this size
+    in meters, see `chunks`"""
+    collision_lod: CollisionLOD | None = None
+    """If set, each chunk collides against a simplified version of itself,
+    see `DynamicMesh.collision_lod`"""
+    _derived: dict[str, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __getstate__(self) -> dict[str, Any]:
+        # derived data can be recomputed, no need to send it around
+        state = self.__dict__.copy()
+        state["_derived"] = {}
+        return state
+
+    def memoize(self, key: str, compute: Callable[[], T]) -> T:
+        """Get data derived from the terrain, computing it on first use
+
+        Used for acceleration structures and analyses of the meshes, which
+        are assumed not to change afterwards.
+
+        Args:
+            key (str): The name of the data
+            compute (Callable[[], T]): Computes the data
+
+        Returns:
+            T: The data
+        """
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
+
+    def combined_mesh(self) -> Trimesh:
+        """Get all meshes of the terrain combined into a single one
+
+        Returns:
+            Trimesh: The combined mesh, computed once
+        """
+
+        def combine() -> Trimesh:
+            meshes = [mesh for mesh, _ in self.mesh]
+            return meshes[0] if len(meshes) == 1 else concatenate(meshes)
 
+        return self.memoize("combined_mesh", combine)
 
-    def to_cfg(self) -> TerrainGeneratorCfg:
+    def chunks(self) -> list[tuple[str, Trimesh, list[tuple[str, str]]]]:
+        """Get the meshes the way they are spawned, as prims of their own
+
+        Without `chunk_size`, these are the meshes of the terrain. Otherwise,
+        each mesh is split into chunks (see `chunk_mesh`), keeping its tags,
+        so that large terrains are cooked by PhysX chunk by chunk, and chunks
+        that don't change hit the cooking cache.
+
+        Returns:
+            list[tuple[str, Trimesh, list[tuple[str, str]]]]: The prim name, the mesh and the tags of each chunk, computed once
+        """
+
+        def split() -> list[tuple[str, Trimesh, list[tuple[str, str]]]]:
+            res: list[tuple[str, Trimesh, list[tuple[str, str]]]] = []
+            for i, (mesh, tags) in enumerate(self.mesh):
+                name = f"{TERRAIN_NAME}_{i}"
+                if self.chunk_size is None:
+                    res.append((name, mesh, tags))
+                    continue
+                for (x, y), chunk in chunk_mesh(mesh, self.chunk_size):
+                    res.append((f"{name}_{x}_{y}", chunk, tags))
+            logger.debug(f"Split terrain into {len(res)} chunks")
+            return res
+
+        return self.memoize(f"chunks_{self.chunk_size}", split)
+
+    def analysis(self, resolution: float = 0.25) -> "TerrainAnalysis":
+        """Get the analysis rasters of the terrain at the given resolution
+
+        The analysis is shared by everything placing assets on this terrain,
+        so the rasters are computed at most once per resolution.
+
+        Args:
+            resolution (float, optional): The size of the raster cells in meters. Defaults to 0.25.
+
+        Returns:
+            TerrainAnalysis: The analysis
+        """
+        from .analysis import TerrainAnalysis
+
+        return self.memoize(
+            f"analysis_{resolution}", lambda: TerrainAnalysis(self, resolution)
+        )
+
+    def to_cfg(self) -> "TerrainGeneratorCfg":
         """Create a TerrainGeneratorCfg object from a TerrainInstance object
 
         Please note that this method does not apply semantic tags to the terrain.
@@ -48,6 +187,8 @@ class TerrainInstance:
         Returns:
             TerrainGeneratorCfg: The TerrainGeneratorCfg object
         """
+        from isaaclab.terrains import SubTerrainBaseCfg, TerrainGeneratorCfg
+
         logger.debug("Creating terrain generator cfg")
         sub_terrain = SubTerrainBaseCfg()
         sub_terrain.function = lambda diff, cfg: (
@@ -62,21 +203,29 @@ class TerrainInstance:
 
         return terrain_cfg
 
-    def to_asset_cfg(self) -> list[AssetBaseCfg]:
+    def to_asset_cfg(self) -> "list[AssetBaseCfg]":
         """Create a asset Cfg object from a TerrainInstance object
 
+        Each of the `chunks` is spawned as a prim of its own.
+
         Returns:
             AssetBaseCfg: The AssetBaseCfg object
         """
+        from isaaclab.assets import AssetBaseCfg
+        from isaaclab.sim.spawners import PreviewSurfaceCfg
+
         logger.debug("Creating terrain asset cfg")
         res = []
-        for i, (mesh, tags) in enumerate(self.mesh):
+        for name, mesh, tags in self.chunks():
             spawner = DynamicMesh(
-                mesh, self.material, PreviewSurfaceCfg(diffuse_color=self.color)
+                mesh,
+                self.material,
+                PreviewSurfaceCfg(diffuse_color=self.color),
+                collision_lod=self.collision_lod,
             ).to_cfg()
             spawner.semantic_tags = tags
             cfg = AssetBaseCfg(
-                prim_path=f"/{TERRAIN_NAME}/{TERRAIN_NAME}_{i}",
+                prim_path=f"/{TERRAIN_NAME}/{name}",
                 spawn=spawner,
             )
             cfg.init_state = cfg.InitialStateCfg()
@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from trimesh import Trimesh
+
+from .terrain import TerrainInstance
+
+if TYPE_CHECKING:
+    from isaaclab.terrains import TerrainGeneratorCfg
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class TerrainPool:
+    """A pool of pre-generated terrains of the same size, each with a
+    difficulty, to be laid out as the tiles of an Isaac Lab terrain generator.
+
+    The tiles are filled with the meshes of the terrains as they are, so
+    nothing is generated by the terrain generator, and terrains loaded from a
+    `TerrainCache` stay memory-mapped until Isaac Lab combines them.
+    """
+
+    terrains: list[TerrainInstance]
+    """The terrains of the pool"""
+    difficulties: list[float]
+    """The difficulty of each terrain, between 0 and 1"""
+
+    def __post_init__(self):
+        if not self.terrains:
+            raise ValueError("At least one terrain is required")
+        if len(self.terrains) != len(self.difficulties):
+            raise ValueError(
+                f"Got {len(self.terrains)} terrains, "
+                f"but {len(self.difficulties)} difficulties"
+            )
+        sizes = {tuple(t.size) for t in self.terrains}
+        if len(sizes) > 1:
+            raise ValueError(
+                f"All terrains must be of the same size, got {sizes}"
+            )
+
+    @property
+    def size(self) -> tuple[float, float]:
+        """The size of the terrains, and thus of the tiles"""
+        return self.terrains[0].size
+
+    def levels(self, num_levels: int) -> list[list[int]]:
+        """Bucket the terrains into difficulty levels
+
+        Level `l` holds the terrains with difficulty within
+        `[l / num_levels, (l + 1) / num_levels)`. Empty levels borrow the
+        terrains of the closest non-empty level.
+
+        Args:
+            num_levels (int): The number of levels
+
+        Returns:
+            list[list[int]]: The indices of the terrains of each level
+        """
+        level = np.clip(
+            (np.asarray(self.difficulties) * num_levels).astype(np.intp),
+            0,
+            num_levels - 1,
+        )
+        buckets = [
+            np.flatnonzero(level == l).tolist() for l in range(num_levels)
+        ]
+        filled = np.array([l for l in range(num_levels) if buckets[l]])
+        return [
+            buckets[filled[np.abs(filled - l).argmin()]]
+            for l in range(num_levels)
+        ]
+
+    def tile_terrains(self, num_rows: int, num_cols: int) -> np.ndarray:
+        """Get the terrain placed on each tile in curriculum mode, see
+        `to_cfg`
+
+        Args:
+            num_rows (int): The number of rows, which are the difficulty levels
+            num_cols (int): The number of columns
+
+        Returns:
+            np.ndarray: The index of the terrain of each tile, of shape (num_rows, num_cols)
+        """
+        levels = self.levels(num_rows)
+        return np.array(
+            [
+                [levels[row][col % len(levels[row])] for col in range(num_cols)]
+                for row in range(num_rows)
+            ]
+        )
+
+    def _tile(
+        self, levels: list[list[int]], col: int, difficulty: float
+    ) -> tuple[list[Trimesh], np.ndarray]:
+        """The sub-terrain function of a column"""
+        row = min(int(difficulty * len(levels)), len(levels) - 1)
+        level = levels[max(row, 0)]
+        terrain = self.terrains[level[col % len(level)]]
+        return [mesh for mesh, _ in terrain.mesh], np.array(terrain.origin)
+
+    def to_cfg(
+        self,
+        num_rows: int,
+        num_cols: int,
+        curriculum: bool = True,
+        **kwargs: Any,
+    ) -> "TerrainGeneratorCfg":
+        """Create a TerrainGeneratorCfg tiling the terrains of the pool
+
+        Each column is a sub-terrain, and each row a difficulty level, see
+        `levels`. In curriculum mode, the tiles of a column cycle through the
+        terrains of each level, as returned by `tile_terrains`. Otherwise,
+        Isaac Lab picks the column and difficulty of each tile at random.
+        The origin of each tile is the origin of its terrain.
+
+        Please note that this method does not apply semantic tags to the
+        terrain.
+
+        Args:
+            num_rows (int): The number of rows of tiles
+            num_cols (int): The number of columns of tiles
+            curriculum (bool, optional): Whether the rows are ordered by difficulty. Defaults to True.
+            **kwargs (Any): Additional attributes of the TerrainGeneratorCfg, like `border_width`
+
+        Returns:
+            TerrainGeneratorCfg: The TerrainGeneratorCfg object
+        """
+        from isaaclab.terrains import SubTerrainBaseCfg, TerrainGeneratorCfg
+
+        logger.debug(
+            f"Tiling {len(self.terrains)} terrains into {num_rows}x{num_cols}"
+        )
+        levels = self.levels(num_rows)
+        sub_terrains: dict[str, SubTerrainBaseCfg] = {}
+        for col in range(num_cols):
+            sub_terrain = SubTerrainBaseCfg()
+            sub_terrain.function = lambda diff, cfg, col=col: self._tile(
+                levels, col, diff
+            )
+            sub_terrain.proportion = 1.0
+            sub_terrain.size = self.size
+            sub_terrains[f"column_{col}"] = sub_terrain
+
+        terrain_cfg = TerrainGeneratorCfg(**kwargs)
+        terrain_cfg.sub_terrains = sub_terrains
+        terrain_cfg.size = self.size
+        terrain_cfg.num_rows = num_rows
+        terrain_cfg.num_cols = num_cols
+        terrain_cfg.curriculum = curriculum
+        terrain_cfg.difficulty_range = (0.0, 1.0)
+        # the tiles are generated already
+        terrain_cfg.use_cache = False
+
+        return terrain_cfg